@@ -1,232 +1,743 @@
-from flask import Flask, render_template, request, jsonify, has_request_context
-from firebase_admin import firestore
-from utils import FirebaseUtils, MessageUtils, PostUtils, CacheUtils, FileUtils
+from flask import Flask, Request, render_template, request, has_request_context, make_response, g, send_file, abort
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.http import quote_etag
+from utils import FirebaseUtils, MessageUtils, PostUtils, CacheUtils, FileUtils, PageCache, RateLimiter
+from firestore_fake import FakeFirestoreClient
+from cache_backend import create_backend
+from media import MediaUtils
+from jobs import JobQueue
+from snapshot import SnapshotStore
+from twocut import TwocutCompositor
+from static_assets import StaticAssets, is_compressible
+from startup import Readiness, create_bytecode_cache, precompile_templates
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from pathlib import Path
-from logger import logger
-import os, toml, shutil
+from logger import logger, config_path
+import atexit, math, metrics, os, threading, toml
 
 load_dotenv()  # .env 파일에서 환경 변수 로드
 
-# 설정 파일 로드
-config_file = 'config.toml'
-config_path = Path(Path.cwd()) / config_file
-
-with open(config_path, 'r') as f:
+# 설정 파일 로드 (실행 위치와 무관하게 app.py 옆의 config.toml, 또는 WEDDINGGRAM_CONFIG)
+with open(config_path(), 'r') as f:
     config = toml.load(f)
 
+# 워커 시작 준비 단계 (create_app 에서 실행, GET /ready 로 확인)
+Startup = Readiness(['firebase', 'templates', 'collections', 'pages'])
+
+# 각 모듈 초기화
+CacheStore = CacheUtils(config['CACHE'], create_backend(config['CACHE']))
+# BACKEND = "fake" 이면 인메모리 Firestore 를 주입 (asgi.py 도 같은 데이터를 사용)
+FirestoreDB = FakeFirestoreClient(
+    config['FIRESTORE']['FAKE_LATENCY'], config['FIRESTORE']['FAKE_JITTER']
+) if config['FIRESTORE']['BACKEND'] == 'fake' else None
+Firebase = FirebaseUtils(CacheStore, config['GLOBAL']['FIREBASE_KEY_PATH'], db=FirestoreDB)
+FileHandler = FileUtils(config['UPLOAD'])
+GuestBook = MessageUtils(Firebase, config['GUESTBOOK'])
+# 방명록 삭제 비밀번호 대입 시도 제한 (IP 별)
+DeleteLimiter = RateLimiter(config['GUESTBOOK']['DELETE_RATE_LIMIT'], config['GUESTBOOK']['DELETE_RATE_WINDOW'])
+PostManger = PostUtils(Firebase, config['LIKE'])
+PageStore = PageCache(config['PAGE_CACHE'])
+Media = MediaUtils(config['DERIVATIVE'])
+Jobs = JobQueue(config['JOBS'])
+Twocut = TwocutCompositor(config['TWOCUT'], config['UPLOAD']['PATHS']['TWOCUT'])
+
+class UploadRequest(Request):
+    """multipart 파일 본문을 FileUtils 의 HashingSpool 에 바로 기록하는 Request"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return FileHandler.open_spool()
+
 # Flask 앱 초기화
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = os.getenv('FLASK_SECRET_KEY', os.urandom(24))
+# 본문을 읽기 전에 Content-Length 로, 읽는 중에는 누적 바이트로 크기 제한 (초과 시 413)
+app.config['MAX_CONTENT_LENGTH'] = FileHandler.max_upload_size() + FileHandler.CHUNK_SIZE
+# 컴파일한 템플릿을 파일로 저장해, 재시작 후에는 컴파일 없이 읽는다
+app.jinja_env.bytecode_cache = create_bytecode_cache(config['STARTUP']['BYTECODE_CACHE'], 'wsgi')
+# 리버스 프록시 뒤에서는 X-Forwarded-* 헤더로 클라이언트 IP 를 구한다 (request.remote_addr)
+trusted_proxies = config['GLOBAL'].get('TRUSTED_PROXIES', 0)
+if trusted_proxies:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies, x_host=trusted_proxies)
 
-# 각 모듈 초기화
-CacheStore = CacheUtils(config['CACHE'])
-Firebase = FirebaseUtils(CacheStore, config['GLOBAL']['FIREBASE_KEY_PATH'])
-FileHandler = FileUtils(config['UPLOAD'])
-GuestBook = MessageUtils(Firebase)
-PostManger = PostUtils(Firebase)
+# 파생 이미지가 새로 생기면 렌더링된 페이지를 다시 만들도록 비운다
+Media.on_change = PageStore.clear
+app.jinja_env.globals['picture'] = Media.picture
+app.jinja_env.globals['video'] = Media.video
 
-@app.route('/')
-def wedding_home():
-    try:
-        home_data = [post for post in Firebase.get_collection_data('wedding_post') if not post.get('explore')]
-        story_data = Firebase.get_collection_data('wedding_story')
+# static 파일: URL 에 내용 버전을 붙여 immutable 로 캐시하고, 미리 압축해둔 .br / .gz 를 보낸다
+Assets = StaticAssets(app.static_folder, config['STATIC'])
+app.url_defaults(Assets.url_defaults)
 
-        return render_template('home.html', posts=home_data, stories=story_data)
-    except Exception as e:
-        logger.error(f"❌ Error fetching request: {e}")
-        return f"Error: {str(e)}", 500
+def resolve_static_asset(filename, args, accept_encodings, has_range):
+    """
+    static 파일 경로와 응답 헤더 (app.py / asgi.py 공용)
 
-@app.route('/explore')
-def wedding_explore():
-    try:
-        explore_data = Firebase.get_collection_data('wedding_post')
-        explore_data = sorted(
-            (post for post in explore_data if post.get('explore')),
-            key=lambda post: post.get('order', float('inf'))
-        )
-        client_config = {
-            'STATIC_PATHS': config['STATIC']['PATHS'],
-            'VIDEO_EXTENSIONS': config['STATIC']['ALLOWED_EXTENSIONS']['VIDEO'],
-        }
-        return render_template('explore.html', explores=explore_data, config=client_config)
-    except Exception as e:
-        logger.error(f"❌ Error fetching request: {e}")
-        return f"Error: {str(e)}", 500
+    Returns:
+        tuple: (파일 경로, MIME 타입, 헤더 dict). 없는 파일이면 None
+    """
+    resolved = Assets.resolve(filename, args.get('v'), accept_encodings, has_range)
+    if resolved is None:
+        return None
+    path, encoding, mimetype, cache_control = resolved
+    headers = {'Cache-Control': cache_control}
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    if is_compressible(filename):
+        headers['Vary'] = 'Accept-Encoding'
+    return path, mimetype, headers
 
-@app.route('/twocut')
-def wedding_twocut():
-    try:
-        client_config = {
-            'ALLOWED_EXTENSIONS': config['STATIC']['ALLOWED_EXTENSIONS'],
-            'UPLOAD_MAX_SIZE': config['UPLOAD']['MAX_SIZE'],
-        }
-        return render_template('twocut.html', config=client_config)
-    except Exception as e:
-        logger.error(f"❌ Error fetching request: {e}")
-        return f"Error: {str(e)}", 500
+def send_static_asset(filename):
+    resolved = resolve_static_asset(filename, request.args, request.accept_encodings, request.range is not None)
+    if resolved is None:
+        abort(404)
+    path, mimetype, headers = resolved
+    # conditional=True: ETag/Last-Modified 재검증과 Range 요청(206) 처리
+    response = send_file(path, mimetype=mimetype, conditional=True)
+    response.headers.update(headers)
+    return response
 
-@app.route('/messages')
-def wedding_messages():
+app.view_functions['static'] = send_static_asset
+
+# 종료 시 아직 반영하지 않은 좋아요 증감분과 방명록 쓰기를 Firestore 에 반영
+atexit.register(CacheStore.close)  # 반영 완료를 다른 워커에 알린 뒤 마지막에 닫는다
+atexit.register(PostManger.close)
+atexit.register(GuestBook.close)
+atexit.register(Media.close)
+atexit.register(Twocut.close)
+atexit.register(Jobs.close)  # atexit 은 역순으로 실행되므로 작업 큐가 먼저 정리된다
+
+def publish_profile_image(filename):
+    """
+    업로드한 프로필 사진을 static 폴더에 공개하고 파생 이미지 생성을 작업 큐에 등록
+
+    공개(하드링크)는 응답 전에 한다. 응답으로 받은 방명록의 이미지 URL 이 바로 열려야 한다.
+
+    Returns:
+        tuple: (성공 여부, 파일 이름 또는 에러 메시지)
+    """
+    source_path = os.path.join(config['UPLOAD']['PATHS']['PROFILE'], filename)
     try:
-        # timestamp 필드를 기준으로 오름차순 정렬 (오래된 순)
-        messages_list = Firebase.get_collection_data(
-            'wedding_guestbook', 
-            sort_by='timestamp', 
-            ascending=True
-        )
+        FileHandler.publish_file(source_path, config['STATIC']['PATHS']['PROFILE'])
+    except OSError as e:
+        logger.error(f"❌ Error publishing profile image {filename}: {e}")
+        return False, '프로필 사진을 저장하지 못했습니다.'
+    Jobs.enqueue('profile_derivatives', filename=filename)
+    return True, filename
 
-        client_config = {
-            'ALLOWED_EXTENSIONS': config['STATIC']['ALLOWED_EXTENSIONS'],
-            'UPLOAD_MAX_SIZE': config['UPLOAD']['MAX_SIZE'],
-        }
-        return render_template('messages.html', messages=messages_list, config=client_config)
-    except Exception as e:
-        logger.error(f"❌ Error fetching request: {e}")
-        return f"Error: {str(e)}", 500
+# 업로드 후처리 작업: 요청 스레드 밖에서 실행
+def build_profile_derivatives(filename):
+    """프로필 사진의 파생 이미지 생성 (끝날 때까지 기다려, 실패하면 작업 큐가 기록하고 재시도한다)"""
+    future = Media.submit('profile_image', filename)
+    if future is not None:
+        future.result()
 
+Jobs.register('profile_derivatives', build_profile_derivatives)
+Jobs.register('archive_file', FileHandler.archive_file)
 
-@app.route('/like/<post_id>', methods=['POST'])
-def update_like(post_id):
+# 미리 계산해두는 뷰 (원본 컬렉션이 바뀔 때만 다시 생성)
+def build_home_posts(posts):
+    return (post for post in posts if not post.get('explore'))
+
+def build_explore_posts(posts):
+    return sorted(
+        (post for post in posts if post.get('explore')),
+        # 같은 순서값이면 문서 id 순 (Firestore 쿼리 페이지와 같은 순서)
+        key=lambda post: (post.get('order', float('inf')), post['id'])
+    )
+
+def build_guestbook_by_time(messages):
+    # timestamp 필드를 기준으로 오름차순 정렬 (오래된 순)
+    return sorted(messages, key=lambda message: (message.get('timestamp'), message['id']))
+
+CacheStore.register_view('home_posts', 'wedding_post', build_home_posts)
+# order_by / filters 는 캐시가 아직 없을 때(시작 직후) 같은 순서의 페이지를 Firestore 쿼리로 읽는 데 사용
+# (explore_posts 쿼리는 wedding_post 의 explore + order 복합 색인이 필요하다. README 참고)
+CacheStore.register_view('explore_posts', 'wedding_post', build_explore_posts,
+                         order_by='order', filters=[('explore', '==', True)])
+CacheStore.register_view('stories', 'wedding_story', tuple)
+CacheStore.register_view('guestbook_by_time', 'wedding_guestbook', build_guestbook_by_time,
+                         order_by='timestamp')
+
+# 요청별 지연 시간/Firestore 호출 계측 (GET /metrics 로 Prometheus 포맷 노출)
+if config['METRICS'].get('ENABLED'):
+    @app.before_request
+    def begin_request_metrics():
+        g.request_metrics = metrics.begin_request()
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.pop('request_metrics', None)
+        if stats is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.end_request(stats, route, request.method, response.status_code)
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return make_response(metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE})
+
+@app.before_request
+def ensure_started():
+    # create_app() 없이 불러온 경우(gunicorn app:app 등) 첫 요청에서 시작 준비
+    if not started:
+        create_app()
+    else:
+        start_background()
+        if not Startup.ready and preparing_pid != os.getpid():
+            restart_preparing()
+
+# app.py 와 asgi.py 가 함께 쓰는 요청 처리
+# 요청 값(args/form/files/json)을 받아 (본문 dict, 상태 코드[, 헤더]) 를 반환하고,
+# 프레임워크별 요청 읽기와 비동기 Firestore 읽기만 각 진입점에서 한다.
+
+def readiness_response():
+    """워커 준비 상태 응답 (준비 전에는 503)"""
+    status = Startup.status()
+    return {
+        'success': status['ready'],
+        'startup': status
+    }, 200 if status['ready'] else 503, {'Cache-Control': 'no-store'}
+
+def negotiate_page(page, if_none_match, accept_encodings):
+    """
+    캐시된 페이지의 응답 본문과 헤더 (If-None-Match 일치 시 304, Accept-Encoding 에 맞는 압축 본문)
+
+    Returns:
+        tuple: (본문, 상태 코드, 헤더 dict)
+    """
+    status, encoding, body = page.negotiate(if_none_match, accept_encodings)
+    headers = {
+        'ETag': quote_etag(page.etag(encoding)),
+        'Cache-Control': f"public, max-age={PageStore.max_age}, must-revalidate",
+        'Vary': 'Accept-Encoding',
+    }
+    if status == 200:
+        headers['Content-Type'] = 'text/html; charset=utf-8'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+    return body, status, headers
+
+def cached_page(route, view_names):
+    """
+    페이지가 사용하는 뷰들의 현재 버전과 그 버전으로 캐시된 페이지
+
+    Returns:
+        tuple: (뷰 버전 tuple, 캐시된 페이지 또는 None)
+    """
+    version = tuple(CacheStore.view_version(view_name) for view_name in view_names)
+    return version, PageStore.get(route, version)
+
+def store_page(route, view_names, version, body):
+    """렌더링한 페이지를 캐시하고 반환 (렌더링 중 데이터가 바뀌었으면 저장하지 않고 None)"""
+    if tuple(CacheStore.view_version(view_name) for view_name in view_names) != version:
+        return None
+    return PageStore.put(route, version, body)
+
+def page_error(e):
+    logger.error(f"❌ Error fetching request: {e}")
+    return f"Error: {str(e)}", 500
+
+def page_limit(args):
+    """요청의 limit 파라미터 (기본 PAGE_SIZE, 최대 MAX_PAGE_SIZE)"""
+    limit = args.get('limit', config['PAGINATION']['PAGE_SIZE'], type=int)
+    return max(1, min(limit, config['PAGINATION']['MAX_PAGE_SIZE']))
+
+def thumbnail_srcsets(posts):
+    """썸네일별 파생 이미지 srcset (explore.js 에서 <picture> 생성)"""
+    return {post['thumbnail']: Media.srcsets('post', post['thumbnail']) for post in posts if post.get('thumbnail')}
+
+def story_video_sources(stories):
+    """스토리 영상별 포스터/재생 URL (story.js 에서 <video> 생성)"""
+    return {
+        media: Media.video_sources('story', media)
+        for story in stories for media in story.get('story_media', []) if Media.is_video(media)
+    }
+
+def home_context(views):
+    return {
+        'posts': views['home_posts'], 'stories': views['stories'],
+        'story_videos': story_video_sources(views['stories']),
+    }
+
+def explore_context(views):
+    # 첫 페이지만 렌더링하고 나머지는 explore.js 가 /api/posts 로 불러온다
+    posts, next_cursor = CacheStore.get_view_page('explore_posts', limit=config['PAGINATION']['PAGE_SIZE'])
+    client_config = {
+        'STATIC_PATHS': config['STATIC']['PATHS'],
+        'VIDEO_EXTENSIONS': config['STATIC']['ALLOWED_EXTENSIONS']['VIDEO'],
+        'DERIVATIVES': thumbnail_srcsets(posts),
+        'NEXT_CURSOR': next_cursor,
+    }
+    return {'explores': list(posts), 'config': client_config}
+
+def twocut_context(views):
+    client_config = {
+        'ALLOWED_EXTENSIONS': config['STATIC']['ALLOWED_EXTENSIONS'],
+        'UPLOAD_MAX_SIZE': config['UPLOAD']['MAX_SIZE'],
+    }
+    return {'config': client_config}
+
+def messages_context(views):
+    # 첫 페이지만 렌더링하고 나머지는 message.js 가 /api/messages 로 불러온다
+    messages, next_cursor = CacheStore.get_view_page('guestbook_by_time', limit=config['PAGINATION']['PAGE_SIZE'])
+    client_config = {
+        'ALLOWED_EXTENSIONS': config['STATIC']['ALLOWED_EXTENSIONS'],
+        'UPLOAD_MAX_SIZE': config['UPLOAD']['MAX_SIZE'],
+        'NEXT_CURSOR': next_cursor,
+    }
+    return {'messages': messages, 'config': client_config}
+
+# 렌더링 캐시하는 페이지: 라우트 -> (템플릿, 사용하는 뷰, 템플릿 변수를 만드는 함수)
+PAGES = {
+    '/': ('home.html', ['home_posts', 'stories'], home_context),
+    '/explore': ('explore.html', ['explore_posts'], explore_context),
+    '/twocut': ('twocut.html', [], twocut_context),
+    '/messages': ('messages.html', ['guestbook_by_time'], messages_context),
+}
+
+# /api/posts?view= 로 조회할 수 있는 게시물 뷰
+POST_VIEWS = {'explore': 'explore_posts'}
+
+def unknown_view_response():
+    return {
+        'success': False,
+        'error': '알 수 없는 뷰입니다.'
+    }, 400
+
+def posts_response(posts, next_cursor):
+    return {
+        'success': True,
+        'posts': posts,
+        'next': next_cursor,
+        'derivatives': thumbnail_srcsets(posts)
+    }
+
+def posts_error(e):
+    logger.error(f"❌ Error fetching posts: {e}")
+    return {
+        'success': False,
+        'error': '게시물을 불러오는 중 오류가 발생했습니다.'
+    }, 500
+
+def like_response(post_id, data):
+    """좋아요 증가/감소 (data 의 action 파라미터로 결정)"""
     try:
-        # action 파라미터로 증가/감소 결정
-        data = request.get_json()
         is_adding = data.get('action') == 'add'
-        
+
         success, result = PostManger.update_like_count(post_id, is_adding)
 
         if success:
-            # 특정 문서의 캐시 업데이트
-            CacheStore.update_like_in_cache('wedding_post', post_id, result)
-            return jsonify({
+            return {
                 'success': True,
                 'likes': result
-            })
+            }
         else:
-            return jsonify({
+            return {
                 'success': False,
                 'error': result
-            }), 404 if result == '게시물을 찾을 수 없습니다.' else 500
-        
+            }, 404 if result == '게시물을 찾을 수 없습니다.' else 500
+
     except Exception as e:
         logger.error(f"❌ Error fetching request: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500
 
+def too_large_response():
+    return {
+        'success': False,
+        'error': '파일 크기가 너무 큽니다.'
+    }, 413
 
-@app.route('/api/messages', methods=['POST'])
-def save_message():
+# 방명록 API 로 내보내는 필드 (비밀번호 제외)
+MESSAGE_FIELDS = ('id', 'profile_image', 'name', 'comment')
+
+def messages_response(messages, next_cursor):
+    return {
+        'success': True,
+        'messages': [{key: message.get(key) for key in MESSAGE_FIELDS} for message in messages],
+        'next': next_cursor
+    }
+
+def messages_error(e):
+    logger.error(f"❌ Error fetching messages: {e}")
+    return {
+        'success': False,
+        'error': '메시지를 불러오는 중 오류가 발생했습니다.'
+    }, 500
+
+def check_upload_size(content_length, category):
+    """본문을 읽기 전에 Content-Length 로 크기 검사 (초과면 413 응답, 아니면 None)"""
+    success, error = FileHandler.check_content_length(content_length, category)
+    if not success:
+        return {
+            'success': False,
+            'error': error
+        }, 413
+    return None
+
+def store_upload(file, file_type, category):
+    """검사 후 업로드 폴더에 저장"""
+    success, result = FileHandler.validate_file(file, file_type, category)
+    if not success:
+        return False, result
+    return FileHandler.upload_file(file, category)
+
+def save_message_response(form, files):
+    """방명록 작성 (프로필 사진 저장/공개, 비밀번호 해시 등 블로킹 작업 포함)"""
     try:
-        # 프로필 사진 유효성 검사 
-        profile_image = request.files.get('profile_image')
+        # 프로필 사진 유효성 검사
+        profile_image = files.get('profile_image')
         if not profile_image or not profile_image.filename:
             filename = 'default.jpg'
         else:
-            success, result = FileHandler.validate_file(profile_image, 'IMAGE', 'PROFILE')
-
+            # 프로필 사진을 uploads 폴더에 저장하고 static 에 공개 (파생 이미지는 작업 큐에서)
+            success, result = store_upload(profile_image, 'IMAGE', 'PROFILE')
             if success:
-                # 프로필 사진을 uploads 폴더에 저장
-                success, result = FileHandler.upload_file(profile_image, 'PROFILE')
-                
-                if success:
-                    filename = result
-                    # static 폴더에 파일 복사
-                    source_path = os.path.join(config['UPLOAD']['PATHS']['PROFILE'], filename)
-                    dest_path = os.path.join(config['STATIC']['PATHS']['PROFILE'], filename)
-                    
-                    # 목적지 디렉토리가 없으면 생성
-                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                    
-                    # 파일 복사
-                    shutil.copy2(source_path, dest_path)
-            else:
-                return jsonify({
+                success, result = publish_profile_image(result)
+            if not success:
+                return {
                     'success': False,
                     'error': result
-                })
-        
-        # 메시지 저장
+                }
+            filename = result
+
+        # 캐시에 바로 저장하고 Firestore 반영은 write-behind 버퍼에서
         success, message_data = GuestBook.save_message(
-            name=request.form['name'],
-            comment=request.form['comment'],
-            password=request.form['password'],
+            name=form['name'],
+            comment=form['comment'],
+            password=form['password'],
             profile_image=filename
         )
-        
-        return jsonify({
+        if not success:
+            return {
+                'success': False,
+                'error': message_data
+            }
+
+        message_data.pop('password')
+
+        return {
             'success': True,
             'message': message_data
-        })
-        
+        }
+
     except Exception as e:
         logger.error(f"❌ Error fetching request: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': '처리 중 오류가 발생했습니다.'
-        })
+        }
 
+def check_delete_rate(client_ip):
+    """IP 별 삭제 시도 제한 (초과면 429 응답, 아니면 None)"""
+    allowed, retry_after = DeleteLimiter.hit(client_ip)
+    if not allowed:
+        return {
+            'success': False,
+            'error': '삭제 시도가 너무 많습니다. 잠시 후 다시 시도해주세요.'
+        }, 429, {'Retry-After': str(math.ceil(retry_after))}
+    return None
 
-@app.route('/api/messages/<message_id>', methods=['DELETE'])
-def delete_message(message_id):
+def delete_message_response(message_id, data):
+    """방명록 삭제 (비밀번호 해시 비교 포함)"""
     try:
-        password = request.json.get('password')
+        password = data.get('password')
         success, error = GuestBook.delete_message(message_id, password)
-        
+
         if success:
-            return jsonify({'success': True})
+            return {'success': True}
         else:
             status_code = {
                 '메시지를 찾을 수 없습니다.': 404,
                 '비밀번호가 일치하지 않습니다.': 403
             }.get(error, 500)
-            
-            return jsonify({
+
+            return {
                 'success': False,
                 'error': error
-            }), status_code
-            
+            }, status_code
+
     except Exception as e:
         logger.error(f"❌ Error fetching request: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500
 
-
-@app.route('/api/twocut', methods=['POST'])
-def upload_twocut_source():
+def twocut_upload_response(files):
+    """웨딩두컷 사진 업로드 (원본 보관은 작업 큐에서)"""
     try:
-        # 웨딩두컷 업로드 사진 유효성 검사
-        twocut_image = request.files.get('file')
+        success, result = store_upload(files.get('file'), 'IMAGE', 'TWOCUT')
+        if not success:
+            return {
+                'success': False,
+                'error': result
+            }
 
-        success, result = FileHandler.validate_file(
-            twocut_image, 
-            'IMAGE',
-            'TWOCUT'
-        )
+        job_id = Jobs.enqueue('archive_file', filename=result, upload_category='TWOCUT')
 
-        if success: 
-            # 웨딩두컷 업로드 사진 업로드
-            success, result = FileHandler.upload_file(twocut_image, 'TWOCUT')
+        return {
+            'success': True,
+            'filename': result,
+            'job_id': job_id,
+        }, 200
 
-        else:
-            return jsonify({
+    except Exception as e:
+        logger.error(f"❌ Error fetching request: {e}")
+        return {
+            'success': False,
+            'error': '처리 중 오류가 발생했습니다.'
+        }
+
+def compose_response(data):
+    """
+    업로드한 사진들을 크롭 영역대로 잘라 프레임에 합성 (합성이 끝날 때까지 기다린다)
+
+    요청: {"photos": [{"filename", "frame", "crop": {"x", "y", "width", "height"}}, ...], "format": "png" | "jpeg"}
+    """
+    try:
+        success, result = Twocut.compose(data.get('photos'), data.get('format'))
+        if not success:
+            return {
                 'success': False,
                 'error': result
-            })
+            }, 400
 
-        return jsonify({
+        return {
             'success': True,
-        }), 200
+            'filename': result,
+            'url': Twocut.url(result)
+        }
 
     except Exception as e:
         logger.error(f"❌ Error fetching request: {e}")
-        return jsonify({
+        return {
             'success': False,
             'error': '처리 중 오류가 발생했습니다.'
-        })
+        }
+
+def job_status_response(job_id):
+    status = Jobs.status(job_id)
+    if status is None:
+        return {
+            'success': False,
+            'error': '작업을 찾을 수 없습니다.'
+        }, 404
+    return {
+        'success': True,
+        'job': status
+    }
+
+# Flask 라우트 (asgi.py 는 같은 요청 처리를 Quart 로 제공)
+@app.route('/ready')
+def readiness():
+    """워커 준비 상태 (로드밸런서/오케스트레이터의 readiness probe 용, 준비 전에는 503)"""
+    return readiness_response()
+
+def render_cached_page(route):
+    """
+    렌더링된 페이지를 사용하는 뷰들의 버전별로 캐시해 응답
+
+    Args:
+        route (str): PAGES 의 라우트 (캐시 키로도 사용)
+    """
+    template, view_names, context = PAGES[route]
+    try:
+        for view_name in view_names:
+            Firebase.get_view(view_name)
+
+        version, page = cached_page(route, view_names)
+        if page is None:
+            views = {view_name: CacheStore.get_view(view_name) for view_name in view_names}
+            body = render_template(template, **context(views))
+            page = store_page(route, view_names, version, body)
+            if page is None:
+                # 렌더링 중 데이터가 바뀌었으면 저장하지 않고 이번 응답에만 사용
+                return body
+        return make_response(*negotiate_page(page, request.if_none_match, request.accept_encodings))
+    except Exception as e:
+        return page_error(e)
+
+@app.route('/')
+def wedding_home():
+    return render_cached_page('/')
+
+@app.route('/explore')
+def wedding_explore():
+    return render_cached_page('/explore')
+
+@app.route('/twocut')
+def wedding_twocut():
+    return render_cached_page('/twocut')
+
+@app.route('/messages')
+def wedding_messages():
+    return render_cached_page('/messages')
+
+@app.route('/api/posts')
+def get_posts():
+    """게시물 뷰 한 페이지 (?view=explore&after=<이전 페이지 마지막 id>&limit=N)"""
+    view_name = POST_VIEWS.get(request.args.get('view', 'explore'))
+    if view_name is None:
+        return unknown_view_response()
+
+    try:
+        return posts_response(*Firebase.get_page(view_name, request.args.get('after'), page_limit(request.args)))
+    except Exception as e:
+        return posts_error(e)
+
+@app.route('/like/<post_id>', methods=['POST'])
+def update_like(post_id):
+    return like_response(post_id, request.get_json(silent=True))
+
+@app.errorhandler(413)
+def request_entity_too_large(e):
+    return too_large_response()
+
+@app.route('/api/messages', methods=['GET'])
+def get_messages():
+    """방명록 한 페이지 (?after=<이전 페이지 마지막 id>&limit=N)"""
+    try:
+        return messages_response(*Firebase.get_page(
+            'guestbook_by_time', request.args.get('after'), page_limit(request.args)
+        ))
+    except Exception as e:
+        return messages_error(e)
+
+@app.route('/api/messages', methods=['POST'])
+def save_message():
+    # 본문을 읽기 전에 크기 검사
+    error = check_upload_size(request.content_length, 'PROFILE')
+    if error:
+        return error
+    return save_message_response(request.form, request.files)
+
+@app.route('/api/messages/<message_id>', methods=['DELETE'])
+def delete_message(message_id):
+    error = check_delete_rate(request.remote_addr)
+    if error:
+        return error
+    return delete_message_response(message_id, request.get_json(silent=True))
+
+@app.route('/api/twocut', methods=['POST'])
+def upload_twocut_source():
+    # 본문을 읽기 전에 크기 검사
+    error = check_upload_size(request.content_length, 'TWOCUT')
+    if error:
+        return error
+    return twocut_upload_response(request.files)
+
+@app.route('/api/twocut/compose', methods=['POST'])
+def compose_twocut():
+    return compose_response(request.get_json(silent=True) or {})
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    return job_status_response(job_id)
+
+
+# 시작 준비: 모듈을 불러오는 것만으로는 Firebase 초기화/캐시 적재를 하지 않는다
+started = False
+start_lock = threading.Lock()
+# 시작 준비 스레드를 실행한 프로세스
+preparing_pid = None
+
+def start_background():
+    """
+    이 프로세스의 작업 큐와 방명록/좋아요 flush 스레드 시작 (프로세스마다 한 번)
+
+    fork 로 만든 워커(gunicorn --preload)는 부모의 스레드를 물려받지 못하므로 첫 요청에서 새로 시작한다.
+    """
+    Jobs.start()
+    GuestBook.start()
+    PostManger.start()
+
+def connect_firebase():
+    """Firestore 클라이언트 생성 (리스너 모드면 리스너 등록까지)"""
+    Firebase.connect()
+    # 스냅샷 리스너 모드: 캐시를 Firestore 변경분으로 실시간 동기화
+    if config['CACHE'].get('LISTEN'):
+        Firebase.start_listeners(config['CACHE']['LISTEN_COLLECTIONS'])
+
+def warm_collections(collection_names):
+    """컬렉션들을 동시에 불러와 캐시를 채운다"""
+    if not collection_names:
+        return
+    with ThreadPoolExecutor(max_workers=len(collection_names)) as pool:
+        list(pool.map(Firebase.get_collection_data, collection_names))
+    missing = [name for name in collection_names if not CacheStore.has_cache(name)]
+    if missing:
+        raise RuntimeError(f"Could not load {', '.join(missing)}")
+
+def warm_pages(routes):
+    """페이지를 미리 렌더링해 페이지 캐시에 넣는다 (요청 훅/계측 없이 뷰 함수만 실행)"""
+    for route in routes:
+        with app.test_request_context(route):
+            response = app.view_functions[request.url_rule.endpoint]()
+        if isinstance(response, tuple):
+            raise RuntimeError(f"{route}: {response[0]}")
+
+def prepare():
+    """시작 준비 단계를 차례로 실행하고 준비 완료 표시 (백그라운드 스레드)"""
+    Startup.run('firebase', connect_firebase)
+    if config['STARTUP']['PRECOMPILE_TEMPLATES']:
+        Startup.run('templates', precompile_templates, app.jinja_env)
+    else:
+        Startup.skip('templates')
+    Startup.run('collections', warm_collections, config['STARTUP']['WARM_COLLECTIONS'])
+    Startup.run('pages', warm_pages, config['STARTUP']['WARM_PAGES'])
+    Startup.finish()
+
+def start_preparing():
+    global preparing_pid
+    preparing_pid = os.getpid()
+    threading.Thread(target=prepare, name='startup', daemon=True).start()
+
+def restart_preparing():
+    """
+    fork 로 만든 워커(gunicorn --preload)에는 부모의 시작 스레드가 없으니, 준비가 덜 끝났으면 다시 시작
+
+    fork 직후가 아니라 첫 요청에서 확인해, 요청을 받지 않는 프로세스 풀 워커에서는 실행하지 않는다.
+    """
+    with start_lock:
+        if Startup.ready or preparing_pid == os.getpid():
+            return
+        Startup.reset()
+        start_preparing()
+
+def create_app():
+    """
+    앱 팩토리: 시작 준비를 한 번만 실행하고 Flask 앱 반환
+
+    작업 큐 복구와 로컬 스냅샷 적재(로컬 파일 작업)를 마친 뒤, Firebase 연결/템플릿 컴파일/
+    컬렉션 캐시와 페이지 warm-up 은 백그라운드 스레드에서 실행한다.
+    [STARTUP] BLOCKING 이면 준비가 끝날 때까지 기다렸다가 반환한다.
+
+        gunicorn -w 4 'app:create_app()'
+    """
+    global started, Snapshots
+    with start_lock:
+        if started:
+            return app
+        started = True
+
+    start_background()
+
+    # 로컬 스냅샷: 재시작 직후에도 저장된 캐시로 바로 응답하고, Firestore 와는 백그라운드에서 맞춘다
+    if config['SNAPSHOT'].get('ENABLED'):
+        Snapshots = SnapshotStore(CacheStore, config['SNAPSHOT'])
+        restored = Snapshots.load()
+        if restored and not config['CACHE'].get('LISTEN'):
+            Firebase.reconcile_in_background(restored)
+        Snapshots.start()
+        atexit.register(Snapshots.close)
+
+    start_preparing()
+    if config['STARTUP']['BLOCKING']:
+        Startup.wait()
+    return app
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', debug=config['GLOBAL']['DEBUG'])
+    create_app().run(host='0.0.0.0', debug=config['GLOBAL']['DEBUG'])
@@ -0,0 +1,220 @@
+"""
+ASGI(비동기) 실행 진입점
+
+app.py 와 같은 라우트를 Quart 로 제공하고, Firestore 읽기는 AsyncClient 로 이벤트 루프를 막지 않는다.
+요청 처리(검사/응답 본문)와 캐시/페이지 캐시/방명록·좋아요 버퍼/작업 큐 등은 app.py 의 함수와 객체를 그대로 쓰고,
+여기서는 요청 본문 읽기와 블로킹 작업을 스레드로 넘기는 부분만 한다.
+
+    hypercorn asgi:app --bind 0.0.0.0:8000
+"""
+from quart import Quart, Response, request, render_template, g
+from utils import AsyncFirebaseUtils
+from firestore_fake import FakeAsyncFirestoreClient
+from logger import logger
+import media, metrics, twocut
+import app as wsgi
+from startup import create_bytecode_cache, precompile_templates
+import asyncio, flask, quart
+
+try:
+    from hypercorn.middleware import ProxyFixMiddleware
+except ImportError:  # hypercorn 이 아닌 ASGI 서버로 실행하는 경우
+    ProxyFixMiddleware = None
+
+# 작업 큐 복구/스냅샷 적재 후 Firebase 연결과 캐시 warm-up 은 app.py 의 시작 스레드에서
+wsgi.create_app()
+
+config = wsgi.config
+CacheStore = wsgi.CacheStore
+Media = wsgi.Media
+
+Firebase = AsyncFirebaseUtils(
+    CacheStore, config['GLOBAL']['FIREBASE_KEY_PATH'],
+    db=FakeAsyncFirestoreClient(wsgi.FirestoreDB) if wsgi.FirestoreDB is not None else None
+)
+
+def url_for(endpoint, **values):
+    """Quart 요청 안에서는 Quart 의 url_for, 그 밖에서는 Flask 의 url_for 로 URL 생성"""
+    if quart.has_app_context():
+        return quart.url_for(endpoint, **values)
+    return flask.url_for(endpoint, **values)
+
+# 같은 프로세스에서 app.py 의 Flask 앱도 그대로 동작하도록 요청 문맥에 따라 고른다
+media.url_for = url_for
+twocut.url_for = url_for
+
+app = Quart(__name__)
+app.config['MAX_CONTENT_LENGTH'] = wsgi.app.config['MAX_CONTENT_LENGTH']
+app.jinja_env.globals['picture'] = Media.picture
+app.jinja_env.globals['video'] = Media.video
+app.jinja_env.bytecode_cache = create_bytecode_cache(config['STARTUP']['BYTECODE_CACHE'], 'asgi')
+# app.py 의 ProxyFix 와 같이 신뢰하는 프록시 수만큼 X-Forwarded-* 헤더로 클라이언트 IP 를 구한다
+if wsgi.trusted_proxies:
+    if ProxyFixMiddleware is not None:
+        app.asgi_app = ProxyFixMiddleware(app.asgi_app, mode='legacy', trusted_hops=wsgi.trusted_proxies)
+    else:
+        logger.warning("⚠️ TRUSTED_PROXIES is set but hypercorn is not installed, ignoring X-Forwarded-For")
+app.url_defaults(wsgi.Assets.url_defaults)
+
+@app.before_serving
+async def compile_templates():
+    # 워커 프로세스마다 작업 큐와 방명록/좋아요 flush 스레드 시작
+    wsgi.start_background()
+    # Quart 의 템플릿은 비동기 렌더링용으로 따로 컴파일된다 (요청을 받기 전에 미리)
+    if config['STARTUP']['PRECOMPILE_TEMPLATES']:
+        await asyncio.to_thread(precompile_templates, app.jinja_env)
+
+async def send_static_asset(filename):
+    """wsgi.send_static_asset 과 같은 버전별 캐시 헤더 / 미리 압축한 파일 / Range 처리"""
+    resolved = wsgi.resolve_static_asset(filename, request.args, request.accept_encodings, request.range is not None)
+    if resolved is None:
+        quart.abort(404)
+    path, mimetype, headers = resolved
+    response = await quart.send_file(path, mimetype=mimetype, conditional=True)
+    response.headers.update(headers)
+    return response
+
+app.view_functions['static'] = send_static_asset
+
+
+if config['METRICS'].get('ENABLED'):
+    @app.before_request
+    async def begin_request_metrics():
+        g.request_metrics = metrics.begin_request()
+
+    @app.after_request
+    async def record_request_metrics(response):
+        stats = g.pop('request_metrics', None)
+        if stats is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.end_request(stats, route, request.method, response.status_code)
+        return response
+
+    @app.route('/metrics')
+    async def prometheus_metrics():
+        return Response(metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE})
+
+
+@app.route('/ready')
+async def readiness():
+    return wsgi.readiness_response()
+
+
+async def render_cached_page(route):
+    """
+    wsgi.render_cached_page 의 비동기 버전
+
+    페이지가 사용하는 컬렉션들의 캐시 확인/갱신을 asyncio.gather 로 동시에 수행한다.
+    """
+    template, view_names, context = wsgi.PAGES[route]
+    try:
+        if view_names:
+            await Firebase.get_views(view_names)
+
+        version, page = wsgi.cached_page(route, view_names)
+        if page is None:
+            views = {view_name: CacheStore.get_view(view_name) for view_name in view_names}
+            body = await render_template(template, **context(views))
+            # 압축은 CPU 작업이라 이벤트 루프 밖에서
+            page = await asyncio.to_thread(wsgi.store_page, route, view_names, version, body)
+            if page is None:
+                return body
+        return Response(*wsgi.negotiate_page(page, request.if_none_match, request.accept_encodings))
+    except Exception as e:
+        return wsgi.page_error(e)
+
+async def warm_collection(collection_name):
+    """동기 유틸(좋아요/방명록 삭제)이 Firestore 를 직접 읽지 않도록 캐시를 먼저 채운다"""
+    if not CacheStore.has_cache(collection_name):
+        await Firebase.get_collection_data(collection_name)
+
+@app.route('/')
+async def wedding_home():
+    return await render_cached_page('/')
+
+@app.route('/explore')
+async def wedding_explore():
+    return await render_cached_page('/explore')
+
+@app.route('/twocut')
+async def wedding_twocut():
+    return await render_cached_page('/twocut')
+
+@app.route('/messages')
+async def wedding_messages():
+    return await render_cached_page('/messages')
+
+@app.route('/api/posts')
+async def get_posts():
+    view_name = wsgi.POST_VIEWS.get(request.args.get('view', 'explore'))
+    if view_name is None:
+        return wsgi.unknown_view_response()
+
+    try:
+        return wsgi.posts_response(*await Firebase.get_page(
+            view_name, request.args.get('after'), wsgi.page_limit(request.args)
+        ))
+    except Exception as e:
+        return wsgi.posts_error(e)
+
+@app.route('/like/<post_id>', methods=['POST'])
+async def update_like(post_id):
+    data = await request.get_json(silent=True)
+    await warm_collection('wedding_post')
+    return wsgi.like_response(post_id, data)
+
+
+@app.errorhandler(413)
+async def request_entity_too_large(e):
+    return wsgi.too_large_response()
+
+
+@app.route('/api/messages', methods=['GET'])
+async def get_messages():
+    try:
+        return wsgi.messages_response(*await Firebase.get_page(
+            'guestbook_by_time', request.args.get('after'), wsgi.page_limit(request.args)
+        ))
+    except Exception as e:
+        return wsgi.messages_error(e)
+
+@app.route('/api/messages', methods=['POST'])
+async def save_message():
+    error = wsgi.check_upload_size(request.content_length, 'PROFILE')
+    if error:
+        return error
+
+    form = await request.form
+    files = await request.files
+    # 파일 검사/저장과 비밀번호 해시 계산은 스레드에서 (이벤트 루프를 막지 않도록)
+    return await asyncio.to_thread(wsgi.save_message_response, form, files)
+
+@app.route('/api/messages/<message_id>', methods=['DELETE'])
+async def delete_message(message_id):
+    error = wsgi.check_delete_rate(request.remote_addr)
+    if error:
+        return error
+
+    data = await request.get_json(silent=True)
+    await warm_collection('wedding_guestbook')
+    return await asyncio.to_thread(wsgi.delete_message_response, message_id, data)
+
+
+@app.route('/api/twocut', methods=['POST'])
+async def upload_twocut_source():
+    error = wsgi.check_upload_size(request.content_length, 'TWOCUT')
+    if error:
+        return error
+
+    files = await request.files
+    return await asyncio.to_thread(wsgi.twocut_upload_response, files)
+
+@app.route('/api/twocut/compose', methods=['POST'])
+async def compose_twocut():
+    data = await request.get_json(silent=True) or {}
+    # 합성은 프로세스 풀에서 실행되고, 기다리는 동안 이벤트 루프를 막지 않는다
+    return await asyncio.to_thread(wsgi.compose_response, data)
+
+@app.route('/api/jobs/<job_id>')
+async def job_status(job_id):
+    return wsgi.job_status_response(job_id)
@@ -0,0 +1,257 @@
+"""
+앱 전체 벤치마크: Firestore 없이 인메모리 fake(호출 지연 흉내)로 라우트별 처리량/지연/Firestore 호출 수 측정
+
+시나리오
+- pages:   /, /explore, /messages 를 컬렉션 크기별(기본 10 → 10,000 문서)로 요청
+- likes:   /like/<post_id> 동시 클릭
+- uploads: 방명록 프로필 사진 업로드(POST /api/messages)와 웨딩두컷 사진 업로드(POST /api/twocut) 동시 요청
+
+크기마다 새 프로세스에서 app.py 를 불러온다 (캐시/버퍼 상태가 이전 측정에 섞이지 않도록).
+Firestore 호출 수는 fake 클라이언트가 센 값을 요청 수로 나눈 것이며, 백그라운드 반영(좋아요/방명록 배치 커밋)도 포함한다.
+cold 는 빈 캐시에서 보낸 첫 요청의 지연 시간이다.
+
+    python benchmarks/bench_app.py --latency 0.02 -n 300 -c 16
+    python benchmarks/bench_app.py --scenario pages --sizes 10 1000 --json results.json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse, io, json, os, shutil, statistics, subprocess, sys, tempfile, threading, time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = ('pages', 'likes', 'uploads')
+PAGE_ROUTES = ('/', '/explore', '/messages')
+SIZES = [10, 100, 1000, 10000]
+
+
+def percentile(values, percent):
+    if not values:
+        return float('nan')
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1] if len(values) > 1 else values[0]
+
+
+def make_config(workdir, latency, jitter, startup=None):
+    """
+    저장소 config.toml 에 fake Firestore 와 임시 폴더용 설정을 덮어쓴 config.toml 작성
+
+    Args:
+        startup (dict): [STARTUP] 에 덮어쓸 값 (기본: warm-up 없이, cold 를 빈 캐시에서 측정)
+
+    Returns:
+        str: 작성한 config.toml 경로 (자식 프로세스의 WEDDINGGRAM_CONFIG)
+    """
+    import toml
+
+    config = toml.load(ROOT / 'config.toml')
+    config['FIRESTORE'].update({'BACKEND': 'fake', 'FAKE_LATENCY': latency, 'FAKE_JITTER': jitter})
+    config['CACHE'].update({'BACKEND': 'local', 'LISTEN': False})
+    config['SNAPSHOT']['ENABLED'] = False
+    config['STARTUP'].update(startup if startup is not None else {
+        'PRECOMPILE_TEMPLATES': False, 'WARM_COLLECTIONS': [], 'WARM_PAGES': [], 'BLOCKING': True,
+    })
+    config['LOGGING'].update({'CONSOLE': False, 'FILE': os.path.join(workdir, 'logs', 'app.log')})
+    config_path = os.path.join(workdir, 'config.toml')
+    with open(config_path, 'w') as f:
+        toml.dump(config, f)
+
+    # 웨딩두컷 프레임 등 ./static 기준 경로를 저장소의 파일로 연결
+    os.makedirs(os.path.join(workdir, 'static', 'media'), exist_ok=True)
+    os.symlink(ROOT / 'static' / 'icons', os.path.join(workdir, 'static', 'icons'))
+    return config_path
+
+
+def seed(db, size):
+    """게시물/방명록 size 개, 스토리 최대 20 개 (지연 없이 기록)"""
+    latency, jitter = db.latency, db.jitter
+    db.latency = db.jitter = 0.0
+    for i in range(size):
+        db.collection('wedding_post').document(f'post{i}').set({
+            'order': i, 'name': f'guest{i % 50}', 'profile_image': 'default.jpg',
+            'post_image': [f'{i}.jpg'], 'thumbnail': f'{i}.jpg', 'text': '축하합니다',
+            'like': 0, 'explore': i % 2 == 1,
+        })
+        db.collection('wedding_guestbook').document(f'msg{i}').set({
+            'id': f'msg{i}', 'name': f'guest{i}', 'comment': '결혼 축하해요!', 'password': 'password',
+            'profile_image': 'default.jpg', 'timestamp': i,
+        })
+    for i in range(min(size, 20)):
+        db.collection('wedding_story').document(f'story{i}').set({
+            'name': f'guest{i}', 'profile_image': 'default.jpg', 'story_media': [f'{i}.jpg'],
+        })
+    db.latency, db.jitter = latency, jitter
+    db.take_calls()
+
+
+def make_png(index):
+    """업로드마다 내용이 다른(중복 제거되지 않는) 작은 PNG"""
+    from PIL import Image
+
+    image = Image.new('RGB', (640, 480), (index % 256, (index // 256) % 256, 128))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def drive(app, requests, concurrency):
+    """
+    요청 목록을 concurrency 개 스레드로 보내고 지연 시간 측정
+
+    Args:
+        requests (list): (method, path, kwargs) 목록. kwargs 는 test_client.open 에 그대로 전달
+
+    Returns:
+        tuple: (지연 시간 list, 오류 수, 전체 소요 시간)
+    """
+    local = threading.local()
+
+    def send(request):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        method, path, kwargs = request
+        started = time.perf_counter()
+        response = local.client.open(path, method=method, **kwargs)
+        elapsed = time.perf_counter() - started
+        # 오류 응답은 JSON 본문의 success 로도 판단 (업로드 API 는 200 으로 실패를 알린다)
+        failed = response.status_code >= 400 or (response.is_json and response.get_json().get('success') is False)
+        return elapsed, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, requests))
+    return [elapsed for elapsed, _ in results], sum(1 for _, failed in results if failed), time.perf_counter() - started
+
+
+def measure(wsgi, name, size, requests, concurrency, cold_request=None, settle=None):
+    """시나리오 하나를 실행하고 결과 dict 반환 (cold_request 는 빈 캐시에서 먼저 한 번 보낸다)"""
+    db = wsgi.FirestoreDB
+    cold_ms = None
+    if cold_request is not None:
+        latencies, _, _ = drive(wsgi.app, [cold_request], 1)
+        cold_ms = latencies[0] * 1000
+    db.take_calls()
+
+    latencies, errors, elapsed = drive(wsgi.app, requests, concurrency)
+    if settle:
+        settle()  # 버퍼에 모인 쓰기를 반영해 그 호출도 센다
+    calls = db.take_calls()
+    return {
+        'scenario': name,
+        'docs': size,
+        'requests': len(requests),
+        'concurrency': concurrency,
+        'rps': len(requests) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'cold_ms': cold_ms,
+        'errors': errors,
+        'firestore_calls_per_request': sum(calls.values()) / len(requests),
+        'firestore_calls': dict(calls),
+    }
+
+
+def run_child(spec):
+    """새 프로세스에서 실행: 임시 작업 폴더에서 app.py 를 불러와 시나리오 측정"""
+    os.chdir(spec['workdir'])
+    sys.path.insert(0, str(ROOT))
+    import app as wsgi
+
+    size, count, concurrency = spec['size'], spec['requests'], spec['concurrency']
+    seed(wsgi.FirestoreDB, size)
+    wsgi.create_app()
+    results = []
+
+    if spec['scenario'] == 'pages':
+        for route in PAGE_ROUTES:
+            request = ('GET', route, {'headers': {'Accept-Encoding': 'gzip'}})
+            results.append(measure(wsgi, f'GET {route}', size, [request] * count, concurrency, cold_request=request))
+
+    elif spec['scenario'] == 'likes':
+        # 인기 게시물 몇 개에 클릭이 몰리는 상황 (증가 2 : 감소 1)
+        hot = min(size, 10)
+        requests = [
+            ('POST', f'/like/post{i % hot}', {'json': {'action': 'add' if i % 3 != 2 else 'remove'}})
+            for i in range(count)
+        ]
+        results.append(measure(wsgi, 'POST /like', size, requests, concurrency,
+                               settle=wsgi.PostManger.flush_likes))
+
+    elif spec['scenario'] == 'uploads':
+        images = [make_png(i) for i in range(count)]
+        profile = [
+            ('POST', '/api/messages', {'data': {
+                'name': f'guest{i}', 'comment': '축하합니다', 'password': 'password',
+                'profile_image': (io.BytesIO(images[i]), f'profile{i}.png'),
+            }, 'content_type': 'multipart/form-data'})
+            for i in range(0, count, 2)
+        ]
+        twocut = [
+            ('POST', '/api/twocut', {'data': {'file': (io.BytesIO(images[i]), f'twocut{i}.png')},
+                                     'content_type': 'multipart/form-data'})
+            for i in range(1, count, 2)
+        ]
+        results.append(measure(wsgi, 'POST /api/messages (profile)', size, profile, concurrency,
+                               settle=wsgi.GuestBook.flush_messages))
+        results.append(measure(wsgi, 'POST /api/twocut', size, twocut, concurrency))
+
+    print(json.dumps(results))
+
+
+def run_scenario(scenario, size, args):
+    """시나리오를 새 프로세스에서 실행하고 결과 list 반환"""
+    workdir = tempfile.mkdtemp(prefix='weddinggram_bench_')
+    try:
+        config_path = make_config(workdir, args.latency, args.jitter)
+        spec = {'workdir': workdir, 'scenario': scenario, 'size': size,
+                'requests': args.requests, 'concurrency': args.concurrency}
+        completed = subprocess.run(
+            [sys.executable, __file__, '--child', json.dumps(spec)],
+            capture_output=True, text=True, check=True, env={**os.environ, 'WEDDINGGRAM_CONFIG': config_path}
+        )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='실행할 시나리오 (여러 번 지정 가능)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='pages 시나리오의 컬렉션 문서 수')
+    parser.add_argument('--base-size', type=int, default=100, help='likes / uploads 시나리오의 컬렉션 문서 수')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='시나리오당 요청 수')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='동시 요청 수')
+    parser.add_argument('--latency', type=float, default=0.02, help='Firestore 호출당 지연 시간(초)')
+    parser.add_argument('--jitter', type=float, default=0.005, help='호출당 추가 무작위 지연 상한(초)')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+
+    print(f"firestore latency: {args.latency * 1000:.0f}ms (+0~{args.jitter * 1000:.0f}ms), "
+          f"requests: {args.requests}, concurrency: {args.concurrency}")
+    print(f"{'scenario':<30} | {'docs':>6} | {'req/s':>8} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | "
+          f"{'cold (ms)':>9} | {'fs calls/req':>12} | {'errors':>6}")
+    results = []
+    for scenario in args.scenario or SCENARIOS:
+        for size in (args.sizes if scenario == 'pages' else [args.base_size]):
+            for result in run_scenario(scenario, size, args):
+                cold = f"{result['cold_ms']:.1f}" if result['cold_ms'] is not None else '-'
+                print(
+                    f"{result['scenario']:<30} | {result['docs']:>6} | {result['rps']:>8.1f} | "
+                    f"{result['p50_ms']:>8.1f} | {result['p99_ms']:>8.1f} | {cold:>9} | "
+                    f"{result['firestore_calls_per_request']:>12.2f} | {result['errors']:>6}"
+                )
+                results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+좋아요 동시 클릭 부하 테스트: 증감분이 하나도 유실되지 않는지 확인
+
+    python benchmarks/bench_likes.py [클릭 수] [동시 스레드 수]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from firestore_fake import FakeFirestoreClient
+from utils import CacheUtils, FirebaseUtils, PostUtils
+
+
+def main(clicks=1000, workers=64):
+    db = FakeFirestoreClient()
+    for i in range(10):
+        db.collection('wedding_post').document(f'post{i}').set({'order': i, 'like': 100})
+
+    firebase = FirebaseUtils(CacheUtils({'EXPIRATION': 600}), None, db=db)
+    posts = PostUtils(firebase, {'FLUSH_INTERVAL': 0.05, 'FLUSH_THRESHOLD': 5})
+
+    # 게시물마다 증가 클릭 2번, 감소 클릭 1번 비율로 섞어서 보낸다
+    requests = [(f'post{i % 10}', i % 3 != 2) for i in range(clicks)]
+    expected = {f'post{i}': 100 for i in range(10)}
+    for post_id, is_adding in requests:
+        expected[post_id] += 1 if is_adding else -1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda args: posts.update_like_count(*args), requests))
+    elapsed = time.perf_counter() - started
+    posts.close()
+
+    failed = sum(1 for success, _ in results if not success)
+    stored = {doc.id: doc.to_dict()['like'] for doc in db.collection('wedding_post').stream()}
+    lost = {post_id: expected[post_id] - stored[post_id] for post_id in expected if expected[post_id] != stored[post_id]}
+
+    print(f"clicks: {clicks}, workers: {workers}, failed: {failed}")
+    print(f"throughput: {clicks / elapsed:,.0f} clicks/s")
+    print(f"lost likes: {lost or 'none'}")
+    return 1 if (failed or lost) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*map(int, sys.argv[1:3])))
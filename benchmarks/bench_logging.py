@@ -0,0 +1,75 @@
+"""
+요청 스레드에서 로그 한 줄을 남기는 비용 비교 (동기 FileHandler vs QueueHandler + QueueListener)
+
+요청마다 get_collection_data 가 남기는 Cache HIT 로그와 업로드 로그를 흉내내어,
+logger.info 호출이 요청 스레드를 붙잡는 시간만 측정한다 (파일 쓰기는 임시 폴더).
+
+    python benchmarks/bench_logging.py --records 20000 --threads 8
+"""
+import argparse, os, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+import logger as logging_setup
+
+
+def run(config, records, threads):
+    listener = logging_setup.configure_logging(config)
+
+    app = Flask(__name__)
+    per_thread = records // threads
+    durations = []
+
+    def worker():
+        with app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+            started = time.perf_counter()
+            for i in range(per_thread):
+                if i % 4:
+                    logging_setup.logger.info(f"✅ Cache HIT for wedding_post - Count match ({i})")
+                else:
+                    logging_setup.logger.info(f"✅ Saved file: {i:032x}.jpg\nto: ./uploads/profile/{i:032x}.jpg")
+            durations.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    drained = elapsed
+    if listener:
+        logging_setup.stop_listener()  # 큐에 남은 로그를 모두 쓸 때까지 기다린다
+        drained = time.perf_counter() - started
+
+    per_call_us = sum(durations) / (per_thread * threads) * 1e6
+    return per_call_us, elapsed, drained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 콘솔 출력은 측정에서 제외 (파일 핸들러만)
+        base = {**logging_setup.DEFAULT_CONFIG, 'FILE': os.path.join(tmp, 'app.log'), 'CONSOLE': False}
+        modes = [
+            ('sync FileHandler', {**base, 'QUEUE': False, 'RATE_LIMIT_PREFIXES': []}),
+            ('queued', {**base, 'QUEUE': True, 'RATE_LIMIT_PREFIXES': []}),
+            ('queued + rate limit', {**base, 'QUEUE': True}),
+        ]
+        print(f"{'mode':<22} | {'µs/call':>8} | {'threads done':>12} | {'log written':>11}")
+        for name, config in modes:
+            per_call_us, elapsed, drained = run(config, args.records, args.threads)
+            print(f"{name:<22} | {per_call_us:>8.1f} | {elapsed:>11.2f}s | {drained:>10.2f}s")
+        # 임시 폴더를 지우기 전에 파일 핸들러를 닫는다
+        for handler in list(logging_setup.logger.handlers):
+            logging_setup.logger.removeHandler(handler)
+            handler.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+로컬 스냅샷 저장/복원 시간 (시작 시 캐시를 채우는 데 걸리는 시간)
+
+    python benchmarks/bench_snapshot.py
+"""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import os, sys, tempfile, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from snapshot import SnapshotStore
+from utils import CacheUtils
+
+SIZES = [100, 1000, 5000, 20000]
+COLLECTIONS = ['wedding_post', 'wedding_story', 'wedding_guestbook']
+
+
+def make_docs(count):
+    base = datetime(2025, 5, 17, tzinfo=timezone.utc)
+    return [{
+        'id': f'doc{i:06d}',
+        'name': f'guest{i}',
+        'comment': '결혼 축하해요! ' * 3,
+        'profile_image': f'{i:032x}.jpg',
+        'post_image': [f'{i}_1.jpg', f'{i}_2.mp4'],
+        'like': i % 50,
+        'timestamp': base + timedelta(seconds=i),
+    } for i in range(count)]
+
+
+def main():
+    print(f"{'docs/col':>8} | {'save (ms)':>9} | {'load (ms)':>9} | {'size (KB)':>9}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            config = {'PATH': os.path.join(directory, 'snapshot.sqlite3'), 'INTERVAL': 60, 'COLLECTIONS': COLLECTIONS}
+
+            cache = CacheUtils({'EXPIRATION': 600})
+            for collection_name in COLLECTIONS:
+                cache.set_cache(collection_name, make_docs(size))
+            store = SnapshotStore(cache, config)
+            started = time.perf_counter()
+            store.save()
+            save_ms = (time.perf_counter() - started) * 1000
+            store.close()
+
+            # 재시작: 빈 캐시에 스냅샷 복원
+            restored = CacheUtils({'EXPIRATION': 600})
+            store = SnapshotStore(restored, config)
+            started = time.perf_counter()
+            store.load()
+            load_ms = (time.perf_counter() - started) * 1000
+            store.close()
+
+            size_kb = os.path.getsize(config['PATH']) / 1024
+            print(f"{size:>8} | {save_ms:>9.1f} | {load_ms:>9.1f} | {size_kb:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
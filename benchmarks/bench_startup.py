@@ -0,0 +1,131 @@
+"""
+시작 시간 벤치마크: 새 프로세스에서 app.py 를 불러와 준비 완료(GET /ready 200)까지의 시간과 페이지별 첫 요청 지연 측정
+
+모드
+- lazy:     템플릿 미리 컴파일/warm-up 없이 시작 (첫 요청이 Firestore 적재와 템플릿 컴파일을 기다린다)
+- warm:     create_app() 이 템플릿 컴파일과 컬렉션/페이지 warm-up 을 마친 뒤 요청 (바이트코드 캐시 비어 있음 = 배포 직후)
+- bytecode: warm 과 같지만 이전 실행이 저장한 템플릿 바이트코드 캐시를 사용 (재시작)
+
+import 는 app.py 를 불러오는 시간, ready 는 create_app() 부터 준비 완료까지의 시간이다.
+Firestore 는 bench_app.py 와 같은 fake 클라이언트(호출 지연 흉내)를 사용한다.
+
+    python benchmarks/bench_startup.py --latency 0.05 --docs 1000 --runs 5
+"""
+from bench_app import ROOT, make_config, seed
+import argparse, json, os, shutil, statistics, subprocess, sys, tempfile, time
+
+MODES = ('lazy', 'warm', 'bytecode')
+ROUTES = ('/', '/explore', '/messages', '/twocut')
+
+
+def startup_config(mode, bytecode_dir):
+    """모드별 [STARTUP] 설정"""
+    if mode == 'lazy':
+        return {'BYTECODE_CACHE': '', 'PRECOMPILE_TEMPLATES': False, 'WARM_COLLECTIONS': [], 'WARM_PAGES': [],
+                'BLOCKING': False}
+    return {'BYTECODE_CACHE': bytecode_dir, 'PRECOMPILE_TEMPLATES': True,
+            'WARM_COLLECTIONS': ['wedding_post', 'wedding_story', 'wedding_guestbook'],
+            'WARM_PAGES': list(ROUTES), 'BLOCKING': False}
+
+
+def run_child(spec):
+    """새 프로세스에서 실행: app.py 를 불러와 준비 완료까지 기다린 뒤 페이지별 첫 요청 지연 측정"""
+    os.chdir(spec['workdir'])
+    sys.path.insert(0, str(ROOT))
+
+    started = time.perf_counter()
+    import app as wsgi
+    import_ms = (time.perf_counter() - started) * 1000
+
+    seed(wsgi.FirestoreDB, spec['docs'])
+    started = time.perf_counter()
+    wsgi.create_app()
+    wsgi.Startup.wait()
+    ready_ms = (time.perf_counter() - started) * 1000
+
+    client = wsgi.app.test_client()
+    first = {}
+    for route in ROUTES:
+        started = time.perf_counter()
+        response = client.get(route, headers={'Accept-Encoding': 'gzip'})
+        first[route] = (time.perf_counter() - started) * 1000
+        assert response.status_code == 200, (route, response.status_code)
+
+    print(json.dumps({
+        'import_ms': import_ms,
+        'ready_ms': ready_ms,
+        'first_ms': first,
+        'steps': wsgi.Startup.status()['steps'],
+    }))
+
+
+def run_once(mode, args, bytecode_dir):
+    """모드 하나를 새 프로세스에서 한 번 실행하고 결과 dict 반환"""
+    workdir = tempfile.mkdtemp(prefix='weddinggram_startup_')
+    try:
+        config_path = make_config(workdir, args.latency, args.jitter, startup_config(mode, bytecode_dir))
+        spec = {'workdir': workdir, 'docs': args.docs}
+        completed = subprocess.run(
+            [sys.executable, __file__, '--child', json.dumps(spec)],
+            capture_output=True, text=True, check=True, env={**os.environ, 'WEDDINGGRAM_CONFIG': config_path}
+        )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', action='append', choices=MODES, help='실행할 모드 (여러 번 지정 가능)')
+    parser.add_argument('--docs', type=int, default=1000, help='게시물/방명록 문서 수')
+    parser.add_argument('--runs', type=int, default=3, help='모드별 반복 횟수 (중앙값 출력)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Firestore 호출당 지연 시간(초)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='호출당 추가 무작위 지연 상한(초)')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+
+    print(f"firestore latency: {args.latency * 1000:.0f}ms (+0~{args.jitter * 1000:.0f}ms), "
+          f"docs: {args.docs}, runs: {args.runs}")
+    print(f"{'mode':<9} | {'import (ms)':>11} | {'ready (ms)':>10} | "
+          + ' | '.join(f"{'first ' + route:>15}" for route in ROUTES))
+    results = {}
+    shared_bytecode = tempfile.mkdtemp(prefix='weddinggram_bytecode_')
+    try:
+        for mode in args.mode or MODES:
+            if mode == 'bytecode':
+                run_once(mode, args, shared_bytecode)  # 바이트코드 캐시를 채우는 실행 (측정 제외)
+            runs = []
+            for _ in range(args.runs):
+                # warm 은 매번 빈 바이트코드 캐시에서 시작
+                bytecode_dir = shared_bytecode if mode == 'bytecode' else tempfile.mkdtemp(prefix='weddinggram_bytecode_')
+                try:
+                    runs.append(run_once(mode, args, bytecode_dir))
+                finally:
+                    if bytecode_dir != shared_bytecode:
+                        shutil.rmtree(bytecode_dir, ignore_errors=True)
+            results[mode] = runs
+
+            median = lambda values: statistics.median(values)
+            print(
+                f"{mode:<9} | {median([run['import_ms'] for run in runs]):>11.1f} | "
+                f"{median([run['ready_ms'] for run in runs]):>10.1f} | "
+                + ' | '.join(f"{median([run['first_ms'][route] for run in runs]):>15.1f}" for route in ROUTES)
+            )
+    finally:
+        shutil.rmtree(shared_bytecode, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+웨딩두컷 서버 합성 처리량 (코어당 초당 합성 수)
+
+    python benchmarks/bench_twocut.py [합성 수]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os, sys, tempfile, time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image
+from twocut import compose_twocut, warm_worker
+import toml
+
+FRAMES = [str(ROOT / 'static' / 'icons' / 'frame1.png'), str(ROOT / 'static' / 'icons' / 'frame2.png')]
+
+
+def make_source(directory, index):
+    """휴대폰 사진 크기의 JPEG 원본"""
+    path = os.path.join(directory, f'source{index}.jpg')
+    Image.effect_mandelbrot((4032, 3024), (-2.0 + index * 0.1, -1.5, 1.0, 1.5), 100).convert('RGB').save(path, quality=90)
+    return path
+
+
+def run(workers, count, sources, output_dir, layout):
+    crop = (200, 150, 3200, 2400)
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(FRAMES,)) as executor:
+        # 워커 준비 (프로세스 생성과 프레임 디코딩은 측정에서 제외)
+        list(executor.map(time.sleep, [0.1] * workers))
+        started = time.perf_counter()
+        futures = [
+            executor.submit(
+                compose_twocut,
+                [(sources[i % len(sources)], crop, FRAMES[0]), (sources[(i + 1) % len(sources)], crop, FRAMES[1])],
+                os.path.join(output_dir, f'{workers}_{i}.png'), layout, 'png', 90
+            )
+            for i in range(count)
+        ]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - started
+
+
+def main(count=48):
+    layout = toml.load(ROOT / 'config.toml')['TWOCUT']['LAYOUT']
+    with tempfile.TemporaryDirectory() as directory:
+        sources = [make_source(directory, i) for i in range(4)]
+        print(f"{'workers':>7} | {'composites/s':>12} | {'per core':>8}")
+        cores = os.cpu_count()
+        for workers in sorted({1, cores} | {2 ** i for i in range(cores.bit_length()) if 2 ** i < cores}):
+            elapsed = run(workers, count, sources, directory, layout)
+            rate = count / elapsed
+            print(f"{workers:>7} | {rate:>12.1f} | {rate / workers:>8.1f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,69 @@
+"""
+요청당 데이터 준비 비용 비교: 매 요청 필터/정렬 vs 미리 계산된 뷰
+
+    python benchmarks/bench_views.py
+"""
+from pathlib import Path
+import random, sys, timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import CacheUtils
+
+SIZES = [10, 100, 1000, 5000, 10000]
+
+
+def make_posts(count):
+    return [{
+        'id': f'post{i}',
+        'order': random.randint(0, count),
+        'explore': i % 2 == 0,
+        'like': 0,
+        'post_image': [f'{i}.jpg'],
+    } for i in range(count)]
+
+
+def make_messages(count):
+    return [{'id': f'msg{i}', 'timestamp': random.random(), 'name': 'guest', 'comment': 'hi'} for i in range(count)]
+
+
+def per_request(posts, messages):
+    """기존 방식: 요청마다 필터 + 정렬"""
+    home = [post for post in posts if not post.get('explore')]
+    explore = sorted(
+        (post for post in posts if post.get('explore')),
+        key=lambda post: post.get('order', float('inf'))
+    )
+    guestbook = sorted(messages, key=lambda message: message.get('timestamp'))
+    return home, explore, guestbook
+
+
+def main():
+    print(f"{'docs':>6} | {'per-request (µs)':>16} | {'view (µs)':>9}")
+    for size in SIZES:
+        posts, messages = make_posts(size), make_messages(size)
+
+        cache = CacheUtils({'EXPIRATION': 600})
+        cache.set_cache('wedding_post', posts)
+        cache.set_cache('wedding_guestbook', messages)
+        cache.register_view('home_posts', 'wedding_post',
+                            lambda docs: (post for post in docs if not post.get('explore')))
+        cache.register_view('explore_posts', 'wedding_post',
+                            lambda docs: sorted((post for post in docs if post.get('explore')),
+                                                key=lambda post: post.get('order', float('inf'))))
+        cache.register_view('guestbook_by_time', 'wedding_guestbook',
+                            lambda docs: sorted(docs, key=lambda message: message.get('timestamp')))
+
+        def from_views():
+            return (cache.get_view('home_posts'), cache.get_view('explore_posts'),
+                    cache.get_view('guestbook_by_time'))
+
+        from_views()  # 첫 생성 비용은 컬렉션 변경 시 한 번만 발생
+        number = max(10, 20000 // size)
+        before = timeit.timeit(lambda: per_request(posts, messages), number=number) / number * 1e6
+        after = timeit.timeit(from_views, number=number) / number * 1e6
+        print(f"{size:>6} | {before:>16.1f} | {after:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
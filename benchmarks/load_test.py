@@ -0,0 +1,76 @@
+"""
+서버 부하 테스트: 초당 요청 수와 지연 시간(p50/p99) 비교
+
+실행 중인 서버들에 같은 부하를 걸어 결과를 나란히 출력한다. 예) 스레드 서버와 ASGI 서버 비교
+
+    python app.py                                   # 스레드 서버 (:5000)
+    hypercorn asgi:app --bind 0.0.0.0:8000          # ASGI 서버 (:8000)
+    python benchmarks/load_test.py http://localhost:5000 http://localhost:8000 -c 64 -d 20
+"""
+import argparse, asyncio, statistics, time
+
+import httpx
+
+PATHS = ['/', '/explore', '/messages', '/api/messages?limit=24', '/api/posts?view=explore&limit=24']
+
+
+async def worker(client, base_url, paths, deadline, latencies, errors, offset):
+    index = offset
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(base_url + path, headers={'Accept-Encoding': 'gzip'})
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url, paths, concurrency, duration):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        # 캐시/커넥션 예열
+        for path in paths:
+            await client.get(base_url + path)
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(client, base_url, paths, deadline, latencies, errors, offset) for offset in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def percentile(values, percent):
+    if not values:
+        return float('nan')
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base_urls', nargs='+', help='비교할 서버 주소 (예: http://localhost:5000)')
+    parser.add_argument('-c', '--concurrency', type=int, default=32, help='동시 요청 수')
+    parser.add_argument('-d', '--duration', type=float, default=10, help='서버당 측정 시간(초)')
+    parser.add_argument('-p', '--path', action='append', help='요청할 경로 (여러 번 지정 가능)')
+    args = parser.parse_args()
+
+    paths = args.path or PATHS
+    print(f"{'server':<28} | {'req/s':>8} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'errors':>6}")
+    for base_url in args.base_urls:
+        latencies, errors, elapsed = asyncio.run(run(base_url.rstrip('/'), paths, args.concurrency, args.duration))
+        print(
+            f"{base_url:<28} | {len(latencies) / elapsed:>8.1f} | "
+            f"{percentile(latencies, 50) * 1000:>8.1f} | {percentile(latencies, 99) * 1000:>8.1f} | {len(errors):>6}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+from snapshot import encode_docs, decode_docs
+from logger import logger
+import os, socket, sqlite3, threading, time, uuid
+
+
+class CacheBackend:
+    """
+    CacheUtils 가 워커 사이에 캐시를 공유하는 통로 (기본: 프로세스 안에서만 사용, 공유 없음)
+
+    - store / load: Firestore 에서 읽은 컬렉션 전체를 다른 워커와 공유
+    - invalidate: 쓰기가 Firestore 에 반영되었으니, 그 전에 읽기 시작한 공유 컬렉션은 쓰지 않도록 표시
+    - publish / subscribe: 캐시에 바로 반영한 쓰기(방명록 저장/삭제, 좋아요 증감)를 다른 워커에 전달
+
+    변경 메시지는 (컬렉션 이름, 종류, 문서 id, payload dict) 튜플이다.
+    """
+    shared = False
+
+    def store(self, collection_name, docs, fetched_at):
+        pass
+
+    def load(self, collection_name):
+        """Returns: (읽기 시작한 시각 epoch 초, 문서 list) 또는 None"""
+        return None
+
+    def invalidate(self, collection_name):
+        pass
+
+    def publish(self, changes):
+        pass
+
+    def subscribe(self, callback):
+        """다른 워커의 변경 메시지 list 를 받을 함수 등록"""
+        pass
+
+    def start(self):
+        """현재 프로세스에서 공유를 시작 (처음 쓸 때 호출된다)"""
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    같은 서버의 워커 프로세스들이 SQLite(WAL) 파일 하나로 캐시를 공유하는 백엔드
+
+    - collections: 컬렉션당 한 행 (가장 최근에 Firestore 에서 읽은 문서, 압축된 JSON).
+      stale_before 이전에 읽기 시작한 결과는 그 뒤에 반영된 쓰기가 빠져 있으므로 load 하지 않는다.
+    - changes: 변경 메시지 로그. 각 워커는 poll_interval 마다 자기 것이 아닌 새 메시지를 읽어 적용하고,
+      retention 초가 지난 메시지는 지운다.
+
+    연결과 폴링 스레드는 프로세스에서 처음 쓸 때 만든다. gunicorn --preload 나 프로세스 풀처럼 fork 한
+    자식은 부모의 연결을 쓰지 않고, 캐시를 실제로 쓰는 프로세스만 자기 연결/폴링 스레드를 갖는다.
+    """
+    shared = True
+
+    def __init__(self, config):
+        self.path = config['SHARED_PATH']
+        self.poll_interval = config['SYNC_INTERVAL']
+        self.retention = config['CHANGE_RETENTION']
+        self.callback = None
+        self.pid = None
+        self.conn = None
+        self.thread = None
+        self._start_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    def _reset(self):
+        """현재 프로세스용 연결/식별자/폴링 상태를 새로 만든다"""
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS collections ('
+                'collection TEXT PRIMARY KEY, fetched_at REAL NOT NULL, stale_before REAL NOT NULL DEFAULT 0, '
+                'data BLOB)'
+            )
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS changes ('
+                'seq INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, created_at REAL NOT NULL, '
+                'collection TEXT NOT NULL, op TEXT NOT NULL, doc_id TEXT NOT NULL, payload BLOB NOT NULL)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS changes_created_at ON changes (created_at)')
+        # 시작 전의 메시지는 건너뛴다 (그 내용은 Firestore/공유 컬렉션에서 읽는다)
+        self.last_seq = self.conn.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+
+    def start(self):
+        """현재 프로세스의 연결이 없으면 만들고, 구독 중이면 폴링 스레드를 시작 (fork 로 물려받은 것은 버린다)"""
+        if self.pid == os.getpid():
+            return
+        with self._start_lock:
+            if self.pid == os.getpid():
+                return
+            self._reset()
+            self.pid = os.getpid()
+            if self.callback is not None:
+                self._start()
+
+    def store(self, collection_name, docs, fetched_at):
+        self.start()
+        blob = encode_docs(docs)
+        with self.lock, self.conn:
+            # 더 최근에 읽은 결과를 덮어쓰지 않는다
+            self.conn.execute(
+                'INSERT INTO collections (collection, fetched_at, data) VALUES (?, ?, ?) '
+                'ON CONFLICT (collection) DO UPDATE SET fetched_at = excluded.fetched_at, data = excluded.data '
+                'WHERE excluded.fetched_at > collections.fetched_at',
+                (collection_name, fetched_at, blob)
+            )
+
+    def load(self, collection_name):
+        self.start()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT fetched_at, data FROM collections '
+                'WHERE collection = ? AND data IS NOT NULL AND fetched_at > stale_before',
+                (collection_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], decode_docs(row[1])
+
+    def invalidate(self, collection_name):
+        self.start()
+        with self.lock, self.conn:
+            # 아직 공유된 결과가 없어도 표시해 두어, 지금 읽는 중인 결과가 나중에 저장되어도 쓰이지 않게 한다
+            self.conn.execute(
+                'INSERT INTO collections (collection, fetched_at, stale_before, data) VALUES (?, 0, ?, NULL) '
+                'ON CONFLICT (collection) DO UPDATE SET stale_before = excluded.stale_before',
+                (collection_name, time.time())
+            )
+
+    def publish(self, changes):
+        self.start()
+        now = time.time()
+        rows = [
+            (self.origin, now, collection_name, op, doc_id, encode_docs([payload]))
+            for collection_name, op, doc_id, payload in changes
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO changes (origin, created_at, collection, op, doc_id, payload) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def poll(self):
+        """
+        다른 워커가 보낸 새 변경 메시지
+
+        Returns:
+            list: (컬렉션 이름, 종류, 문서 id, payload) 목록
+        """
+        self.start()
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT seq, origin, collection, op, doc_id, payload FROM changes WHERE seq > ? ORDER BY seq',
+                (self.last_seq,)
+            ).fetchall()
+        if not rows:
+            return []
+        self.last_seq = rows[-1][0]
+        return [
+            (collection_name, op, doc_id, decode_docs(payload)[0])
+            for _, origin, collection_name, op, doc_id, payload in rows if origin != self.origin
+        ]
+
+    def prune(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM changes WHERE created_at < ?', (time.time() - self.retention,))
+
+    def _poll_loop(self):
+        last_pruned = time.monotonic()
+        while not self.stopped.wait(self.poll_interval):
+            try:
+                changes = self.poll()
+                if changes:
+                    self.callback(changes)
+                if time.monotonic() - last_pruned > self.retention:
+                    self.prune()
+                    last_pruned = time.monotonic()
+            except Exception as e:
+                logger.error(f"❌ Error syncing shared cache: {e}")
+
+    def _start(self):
+        self.thread = threading.Thread(target=self._poll_loop, name='cache-sync', daemon=True)
+        self.thread.start()
+
+    def subscribe(self, callback):
+        self.callback = callback
+        if self.pid == os.getpid() and self.thread is None:
+            self._start()
+
+    def close(self):
+        if self.pid != os.getpid():
+            return  # 이 프로세스에서 시작하지 않았다
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        with self.lock:
+            self.conn.close()
+        self.pid = None
+
+
+def create_backend(config):
+    """[CACHE] BACKEND 설정에 맞는 캐시 백엔드 ("local" 또는 "sqlite")"""
+    backend = config.get('BACKEND', 'local')
+    if backend == 'sqlite':
+        return SQLiteCacheBackend(config)
+    if backend != 'local':
+        raise ValueError(f"Unknown cache backend: {backend}")
+    return CacheBackend()
@@ -0,0 +1,412 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from enum import Enum
+import asyncio, random, threading, time
+import uuid
+
+try:
+    from google.api_core.exceptions import NotFound
+except ImportError:  # firebase_admin(google-api-core) 없이 fake 만 쓰는 경우
+    class NotFound(Exception):
+        """없는 문서를 update 할 때 실제 클라이언트가 던지는 google.api_core.exceptions.NotFound 대용"""
+
+# 비동기 래퍼가 지연을 asyncio.sleep 으로 이미 기다렸는지 여부 (동기 구현에서 다시 sleep 하지 않도록)
+_in_async_call = ContextVar('fake_async_call', default=False)
+
+
+class ChangeType(Enum):
+    """Firestore DocumentChange.type 과 같은 이름을 사용하는 변경 유형"""
+    ADDED = 1
+    MODIFIED = 2
+    REMOVED = 3
+
+
+def _is_sentinel(value, name):
+    """firestore 센티널/트랜스폼 객체를 클래스 이름으로 판별 (firebase_admin 의존성 없이)"""
+    return type(value).__name__ == name
+
+
+def _resolve_value(value, current):
+    """SERVER_TIMESTAMP 등 센티널 값을 실제 값으로 변환"""
+    if _is_sentinel(value, 'Sentinel'):
+        return datetime.now(timezone.utc)
+    if _is_sentinel(value, 'Increment'):
+        return (current or 0) + value.value
+    return value
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, doc_id, data, reference):
+        self.id = doc_id
+        self._data = dict(data) if data is not None else None
+        self.reference = reference
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentChange:
+    def __init__(self, change_type, document):
+        self.type = change_type
+        self.document = document
+
+
+class FakeAggregationResult:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeAggregationQuery:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def get(self):
+        self._collection._client._rpc('count')
+        return [[FakeAggregationResult(len(self._collection._docs))]]
+
+
+class FakeQuery:
+    """where / order_by / start_after / limit 를 지원하는 쿼리 (실행 시점에 필터/정렬)"""
+    OPERATORS = {
+        '==': lambda a, b: a == b,
+        '!=': lambda a, b: a != b,
+        '<': lambda a, b: a < b,
+        '<=': lambda a, b: a <= b,
+        '>': lambda a, b: a > b,
+        '>=': lambda a, b: a >= b,
+    }
+
+    def __init__(self, collection, filters=(), orders=(), cursor=None, limit_count=None):
+        self._collection = collection
+        self._filters = filters
+        self._orders = orders
+        self._cursor = cursor
+        self._limit = limit_count
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, cursor=self._cursor, limit_count=self._limit)
+        state.update(changes)
+        return FakeQuery(self._collection, **state)
+
+    def where(self, field=None, op=None, value=None, *, filter=None):
+        if filter is not None:  # FieldFilter
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field):
+        return self._copy(orders=self._orders + (field,))
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot)
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def _sort_key(self, doc):
+        # 실제 Firestore 처럼 같은 값이면 문서 id 순
+        data = doc.to_dict()
+        return tuple(data[field] for field in self._orders) + (doc.id,)
+
+    def stream(self):
+        self._collection._client._rpc('stream')
+        docs = [
+            doc for doc in self._collection._snapshot()
+            if all(field in doc.to_dict() for field in self._orders)
+            and all(self.OPERATORS[op](doc.to_dict().get(field), value) for field, op, value in self._filters)
+        ]
+        docs.sort(key=self._sort_key)
+        if self._cursor is not None:
+            cursor_key = self._sort_key(self._cursor)
+            docs = [doc for doc in docs if self._sort_key(doc) > cursor_key]
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        return iter(docs)
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeWatch:
+    def __init__(self, collection, callback):
+        self._collection = collection
+        self._callback = callback
+
+    def unsubscribe(self):
+        self._collection._unsubscribe(self)
+
+
+class FakeDocumentReference:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        self._collection._client._rpc('get')
+        return FakeDocumentSnapshot(self.id, self._collection._docs.get(self.id), self)
+
+    def set(self, data, merge=False):
+        self._collection._client._rpc('set')
+        self._collection._write(self.id, data, merge=merge)
+
+    def update(self, data):
+        self._collection._client._rpc('update')
+        if self.id not in self._collection._docs:
+            raise NotFound(f"No document to update: {self.id}")
+        self._collection._write(self.id, data, merge=True)
+
+    def delete(self):
+        self._collection._client._rpc('delete')
+        self._collection._remove(self.id)
+
+
+class FakeCollectionReference:
+    def __init__(self, client, name):
+        self._client = client
+        self.id = name
+        self._docs = {}
+        self._watches = []
+
+    def document(self, doc_id=None):
+        return FakeDocumentReference(self, doc_id or uuid.uuid4().hex[:20])
+
+    def stream(self):
+        self._client._rpc('stream')
+        return iter(self._snapshot())
+
+    def get(self):
+        return list(self.stream())
+
+    def count(self):
+        return FakeAggregationQuery(self)
+
+    def where(self, *args, **kwargs):
+        return FakeQuery(self).where(*args, **kwargs)
+
+    def order_by(self, field):
+        return FakeQuery(self).order_by(field)
+
+    def on_snapshot(self, callback):
+        """등록 즉시 현재 문서 전체를 ADDED 로 전달 (실제 Watch 의 초기 스냅샷과 동일)"""
+        watch = FakeWatch(self, callback)
+        with self._client._lock:
+            self._watches.append(watch)
+            docs = self._snapshot()
+        changes = [FakeDocumentChange(ChangeType.ADDED, doc) for doc in docs]
+        callback(docs, changes, datetime.now(timezone.utc))
+        return watch
+
+    def _snapshot(self):
+        return [FakeDocumentSnapshot(doc_id, data, self.document(doc_id)) for doc_id, data in self._docs.items()]
+
+    def _unsubscribe(self, watch):
+        with self._client._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _write(self, doc_id, data, merge):
+        with self._client._lock:
+            current = self._docs.get(doc_id)
+            base = dict(current) if (merge and current) else {}
+            for key, value in data.items():
+                base[key] = _resolve_value(value, base.get(key))
+            self._docs[doc_id] = base
+            change_type = ChangeType.MODIFIED if current is not None else ChangeType.ADDED
+            self._notify(change_type, doc_id, base)
+
+    def _remove(self, doc_id):
+        with self._client._lock:
+            data = self._docs.pop(doc_id, None)
+            if data is not None:
+                self._notify(ChangeType.REMOVED, doc_id, data)
+
+    def _notify(self, change_type, doc_id, data):
+        if not self._watches:
+            return
+        docs = self._snapshot()
+        change = FakeDocumentChange(change_type, FakeDocumentSnapshot(doc_id, data, self.document(doc_id)))
+        for watch in list(self._watches):
+            watch._callback(docs, [change], datetime.now(timezone.utc))
+
+
+class FakeWriteBatch:
+    """commit() 시점에 모아둔 작업을 한 번에 적용"""
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, reference, data, merge=False):
+        self._ops.append(('merge' if merge else 'set', reference, data))
+
+    def update(self, reference, data):
+        self._ops.append(('update', reference, data))
+
+    def delete(self, reference):
+        self._ops.append(('delete', reference, None))
+
+    def commit(self):
+        self._client._rpc('commit')
+        with self._client._lock:
+            # 실제 Firestore 처럼 하나라도 실패하면 전체를 적용하지 않는다
+            for kind, reference, _ in self._ops:
+                if kind == 'update' and reference.id not in reference._collection._docs:
+                    raise NotFound(f"No document to update: {reference.id}")
+            for kind, reference, data in self._ops:
+                if kind == 'delete':
+                    reference._collection._remove(reference.id)
+                else:
+                    reference._collection._write(reference.id, data, merge=kind in ('update', 'merge'))
+        self._ops = []
+
+
+class FakeFirestoreClient:
+    """
+    테스트/벤치마크용 인메모리 Firestore 클라이언트
+
+    FirebaseUtils 가 사용하는 collection / document / stream / count / on_snapshot / 쿼리
+    API 만 흉내낸다. FirebaseUtils(cachestore, key_path, db=FakeFirestoreClient()) 로 주입.
+
+    Args:
+        latency (float): 네트워크 왕복을 흉내내어 호출(stream / get / count / set / update /
+            delete / commit)마다 기다릴 시간 (초)
+        jitter (float): 호출마다 0 ~ jitter 초를 추가로 더 기다린다
+
+    호출 수는 calls 에 종류별로 누적된다 (take_calls 로 읽고 초기화).
+    """
+    def __init__(self, latency=0.0, jitter=0.0):
+        self._lock = threading.RLock()
+        self._collections = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self._calls_lock = threading.Lock()
+
+    def _delay(self):
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _rpc(self, op):
+        """Firestore 호출 한 번: 호출 수를 세고 설정된 지연만큼 기다린다"""
+        with self._calls_lock:
+            self.calls[op] += 1
+        if not _in_async_call.get():
+            delay = self._delay()
+            if delay:
+                time.sleep(delay)
+
+    def take_calls(self):
+        """
+        지금까지의 호출 수를 반환하고 0 으로 초기화
+
+        Returns:
+            Counter: 호출 종류 -> 횟수
+        """
+        with self._calls_lock:
+            calls, self.calls = self.calls, Counter()
+        return calls
+
+    def collection(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FakeCollectionReference(self, name)
+            return self._collections[name]
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+
+async def _async_rpc(client, call):
+    """지연은 asyncio.sleep 으로 기다린 뒤 동기 구현을 실행 (이벤트 루프를 막지 않는다)"""
+    delay = client._delay()
+    if delay:
+        await asyncio.sleep(delay)
+    token = _in_async_call.set(True)
+    try:
+        return call()
+    finally:
+        _in_async_call.reset(token)
+
+
+class FakeAsyncQuery:
+    """FakeQuery 를 AsyncClient 와 같은 코루틴/비동기 이터레이터 API 로 감싼다"""
+    def __init__(self, query):
+        self._query = query
+        self._client = query._collection._client
+
+    def where(self, *args, **kwargs):
+        return FakeAsyncQuery(self._query.where(*args, **kwargs))
+
+    def order_by(self, field):
+        return FakeAsyncQuery(self._query.order_by(field))
+
+    def start_after(self, snapshot):
+        return FakeAsyncQuery(self._query.start_after(snapshot))
+
+    def limit(self, count):
+        return FakeAsyncQuery(self._query.limit(count))
+
+    async def stream(self):
+        for doc in await _async_rpc(self._client, lambda: list(self._query.stream())):
+            yield doc
+
+    async def get(self):
+        return await _async_rpc(self._client, self._query.get)
+
+
+class FakeAsyncAggregationQuery:
+    def __init__(self, query):
+        self._query = query
+
+    async def get(self):
+        return await _async_rpc(self._query._collection._client, self._query.get)
+
+
+class FakeAsyncDocumentReference:
+    def __init__(self, reference):
+        self._reference = reference
+        self._client = reference._collection._client
+        self.id = reference.id
+
+    async def get(self):
+        return await _async_rpc(self._client, self._reference.get)
+
+    async def set(self, data, merge=False):
+        await _async_rpc(self._client, lambda: self._reference.set(data, merge=merge))
+
+    async def update(self, data):
+        await _async_rpc(self._client, lambda: self._reference.update(data))
+
+    async def delete(self):
+        await _async_rpc(self._client, self._reference.delete)
+
+
+class FakeAsyncCollectionReference(FakeAsyncQuery):
+    def __init__(self, collection):
+        super().__init__(FakeQuery(collection))
+        self._collection = collection
+        self.id = collection.id
+
+    def document(self, doc_id=None):
+        return FakeAsyncDocumentReference(self._collection.document(doc_id))
+
+    def count(self):
+        return FakeAsyncAggregationQuery(self._collection.count())
+
+
+class FakeAsyncFirestoreClient:
+    """
+    FakeFirestoreClient 와 데이터를 공유하는 AsyncClient 대용
+
+    AsyncFirebaseUtils(cachestore, key_path, db=FakeAsyncFirestoreClient(sync_client)) 로 주입.
+    """
+    def __init__(self, client=None):
+        self._client = client or FakeFirestoreClient()
+
+    def collection(self, name):
+        return FakeAsyncCollectionReference(self._client.collection(name))
+
+    def batch(self):
+        return self._client.batch()
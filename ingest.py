@@ -0,0 +1,325 @@
+"""
+갤러리 폴더의 사진/영상을 static 폴더에 복사하고 wedding_post / wedding_story 문서를 만드는 도구
+
+    python ingest.py ./gallery                 # 복사 + Firestore 반영
+    python ingest.py ./gallery --dry-run       # 바뀔 내용만 출력
+    python ingest.py ./gallery --derivatives   # 반영 후 파생 이미지/영상 포스터까지 생성
+
+폴더 구조
+
+    gallery/
+      posts/
+        001-john/          게시물 하나 = 폴더 하나. 앞의 숫자가 order (없으면 폴더 이름 순서)
+          meta.toml        (선택) name, text, explore, is_large, thumbnail, profile_image
+          profile.jpg      (선택) 작성자 프로필 사진
+          1.jpg 2.mp4 ...  게시물 미디어 (파일 이름 순서)
+      stories/
+        john/
+          meta.toml        (선택) name, profile_image
+          profile.jpg      (선택)
+          a.jpg b.mp4 ...
+
+파일은 내용 해시 이름으로 복사되므로 같은 사진이 여러 게시물에 있어도 한 번만 복사된다.
+처리 결과는 [INGEST] MANIFEST 에 기록되어, 다시 실행하면 바뀐 파일/문서만 처리한다.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from media import file_digest
+from logger import logger
+import hashlib, json, metrics, os, re, shutil, tempfile, threading, time, toml
+
+# 게시물 / 스토리 폴더 -> (Firestore 컬렉션, 미디어 필드, static 경로 키)
+KINDS = {
+    'posts': ('wedding_post', 'post_image', 'POST'),
+    'stories': ('wedding_story', 'story_media', 'STORY'),
+}
+META_FILE = 'meta.toml'
+PROFILE_STEM = 'profile'
+ORDER_PREFIX = re.compile(r'^(\d+)[-_. ]*(.*)$')
+
+
+class GalleryIngestor:
+    # Firestore WriteBatch 한 번에 넣을 수 있는 최대 작업 수
+    BATCH_LIMIT = 500
+
+    def __init__(self, firebase, config):
+        """
+        Args:
+            firebase (FirebaseUtils): 문서를 쓸 Firestore (db.batch 사용)
+            config (dict): 전체 설정 (STATIC.PATHS, STATIC.ALLOWED_EXTENSIONS, INGEST 사용)
+        """
+        self.firebase = firebase
+        self.static_paths = config['STATIC']['PATHS']
+        self.extensions = {
+            f".{ext.lower()}" for exts in config['STATIC']['ALLOWED_EXTENSIONS'].values() for ext in exts
+        }
+        self.manifest_path = config['INGEST']['MANIFEST']
+        self.workers = config['INGEST']['WORKERS'] or min(32, (os.cpu_count() or 1) * 4)
+        self.manifest = self._load_manifest()
+        self.lock = threading.Lock()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        # files: 원본 상대 경로 -> {size, mtime_ns, hash} / docs: 폴더 키 -> {collection, id, fingerprint}
+        manifest.setdefault('files', {})
+        manifest.setdefault('docs', {})
+        return manifest
+
+    def _save_manifest(self):
+        """manifest 를 임시 파일에 쓴 뒤 교체 (중간에 멈춰도 마지막으로 끝난 단계까지는 남는다)"""
+        directory = os.path.dirname(self.manifest_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            data = json.dumps(self.manifest, ensure_ascii=False, indent=1)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.ingest_')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.manifest_path)
+
+    def scan(self, source):
+        """
+        갤러리 폴더의 게시물/스토리 목록
+
+        Returns:
+            list: {'kind', 'key', 'name', 'order', 'meta', 'media', 'profile'} 목록.
+                media / profile 은 source 기준 상대 경로
+        """
+        entries = []
+        for kind in KINDS:
+            kind_dir = os.path.join(source, kind)
+            if not os.path.isdir(kind_dir):
+                continue
+            folders = sorted(name for name in os.listdir(kind_dir) if os.path.isdir(os.path.join(kind_dir, name)))
+            for position, folder in enumerate(folders, start=1):
+                folder_path = os.path.join(kind_dir, folder)
+                meta = {}
+                if os.path.exists(os.path.join(folder_path, META_FILE)):
+                    with open(os.path.join(folder_path, META_FILE), 'r', encoding='utf-8') as f:
+                        meta = toml.load(f)
+
+                match = ORDER_PREFIX.match(folder)
+                order, name = (int(match.group(1)), match.group(2) or folder) if match else (position, folder)
+                media, profile = [], None
+                for filename in sorted(os.listdir(folder_path)):
+                    stem, ext = os.path.splitext(filename)
+                    if ext.lower() not in self.extensions:
+                        continue
+                    rel_path = f"{kind}/{folder}/{filename}"
+                    if stem.lower() == PROFILE_STEM:
+                        profile = rel_path
+                    else:
+                        media.append(rel_path)
+
+                if not media:
+                    logger.warning(f"⚠️ Skipping {kind}/{folder}: no media files")
+                    continue
+                entries.append({
+                    'kind': kind, 'key': f"{kind}/{folder}", 'name': meta.get('name', name),
+                    'order': meta.get('order', order), 'meta': meta, 'media': media, 'profile': profile,
+                })
+        return entries
+
+    def _hash(self, source, rel_path):
+        """원본 파일의 내용 해시 (크기/수정 시각이 manifest 와 같으면 다시 읽지 않는다)"""
+        stat = os.stat(os.path.join(source, rel_path))
+        known = self.manifest['files'].get(rel_path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['hash'], False
+        digest = file_digest(os.path.join(source, rel_path))
+        with self.lock:
+            self.manifest['files'][rel_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+        return digest, True
+
+    @staticmethod
+    def _copy(source_path, dest_path):
+        """
+        임시 파일에 복사한 뒤 이동 (반쯤 복사된 파일이 공개되지 않도록)
+
+        Returns:
+            bool: 새로 복사했으면 True (같은 내용의 파일이 이미 있으면 False)
+        """
+        if os.path.exists(dest_path) and os.path.getsize(dest_path) == os.path.getsize(source_path):
+            return False
+        directory = os.path.dirname(dest_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.ingest_')
+        os.close(fd)
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+        return True
+
+    def _static_dir(self, rel_path, kind):
+        """원본 파일이 복사될 static 폴더 (프로필 사진은 PROFILE)"""
+        if os.path.splitext(os.path.basename(rel_path))[0].lower() == PROFILE_STEM:
+            return self.static_paths['PROFILE']
+        return self.static_paths[KINDS[kind][2]]
+
+    def publish_files(self, source, entries, dry_run=False):
+        """
+        모든 원본을 병렬로 해시하고, 내용 해시 이름으로 static 폴더에 복사
+
+        Returns:
+            dict: 원본 상대 경로 -> static 파일명
+        """
+        jobs = [(entry['kind'], rel_path) for entry in entries for rel_path in entry['media'] + [entry['profile']] if rel_path]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            hashed = list(pool.map(lambda job: self._hash(source, job[1]), jobs))
+
+            names, copies = {}, {}
+            for (kind, rel_path), (digest, _) in zip(jobs, hashed):
+                filename = f"{digest[:32]}{os.path.splitext(rel_path)[1].lower()}"
+                names[rel_path] = filename
+                # 같은 내용의 파일은 한 번만 복사
+                copies.setdefault(os.path.join(self._static_dir(rel_path, kind), filename), rel_path)
+
+            if dry_run:
+                copied = sum(1 for dest_path in copies if not os.path.exists(dest_path))
+            else:
+                copied = sum(pool.map(
+                    lambda item: self._copy(os.path.join(source, item[1]), item[0]), copies.items()
+                ))
+
+        rehashed = sum(1 for _, changed in hashed if changed)
+        logger.info(
+            f"📁 {len(jobs)} file(s): {rehashed} hashed, {len(jobs) - len(copies)} duplicate(s), "
+            f"{copied} {'to copy' if dry_run else 'copied'}"
+        )
+        if not dry_run:
+            self._save_manifest()
+        return names
+
+    @staticmethod
+    def _doc_id(key):
+        """폴더 키로 정해지는 문서 id (다시 실행해도 같은 문서를 갱신한다)"""
+        return f"ingest-{hashlib.sha256(key.encode()).hexdigest()[:20]}"
+
+    def build_document(self, entry, names):
+        """폴더 하나의 Firestore 문서 내용"""
+        meta = entry['meta']
+        media = [names[rel_path] for rel_path in entry['media']]
+        profile_image = names[entry['profile']] if entry['profile'] else meta.get('profile_image', 'default.jpg')
+        if entry['kind'] == 'stories':
+            return {'name': entry['name'], 'profile_image': profile_image, 'story_media': media}
+
+        doc = {
+            'order': entry['order'],
+            'name': entry['name'],
+            'profile_image': profile_image,
+            'post_image': media,
+            'text': meta.get('text', ''),
+            'explore': bool(meta.get('explore', False)),
+            'is_large': bool(meta.get('is_large', False)),
+        }
+        thumbnail = names.get(f"{entry['key']}/{meta['thumbnail']}") if meta.get('thumbnail') else None
+        if meta.get('thumbnail') and thumbnail is None:
+            logger.warning(f"⚠️ Thumbnail {meta['thumbnail']} is not in {entry['key']} - using the first media file")
+        if thumbnail or doc['explore']:
+            doc['thumbnail'] = thumbnail or media[0]
+        return doc
+
+    def write_documents(self, entries, names, dry_run=False):
+        """
+        바뀐 문서만 WriteBatch 로 반영 (배치마다 manifest 를 저장해 중단되어도 이어서 실행)
+
+        처음 만드는 게시물만 like 를 0 으로 두고, 이미 만든 문서는 merge 로 덮어써 좋아요 수를 유지한다.
+
+        Returns:
+            int: 반영한(dry_run 이면 반영할) 문서 수
+        """
+        writes = []
+        for entry in entries:
+            collection_name = KINDS[entry['kind']][0]
+            doc = self.build_document(entry, names)
+            fingerprint = hashlib.sha256(json.dumps(doc, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+            known = self.manifest['docs'].get(entry['key'])
+            if known and known['fingerprint'] == fingerprint:
+                continue
+            if known is None and collection_name == 'wedding_post':
+                doc['like'] = 0
+            writes.append((entry['key'], collection_name, self._doc_id(entry['key']), doc, fingerprint))
+
+        if dry_run:
+            for key, collection_name, doc_id, _, _ in writes:
+                logger.info(f"📝 Would write {collection_name}/{doc_id} ({key})")
+            return len(writes)
+
+        for collection_name, _, _ in KINDS.values():
+            pending = [write for write in writes if write[1] == collection_name]
+            for start in range(0, len(pending), self.BATCH_LIMIT):
+                chunk = pending[start:start + self.BATCH_LIMIT]
+                batch = self.firebase.db.batch()
+                for _, _, doc_id, doc, _ in chunk:
+                    batch.set(self.firebase.db.collection(collection_name).document(doc_id), doc, merge=True)
+                with metrics.firestore_batch(collection_name, {'set': len(chunk)}):
+                    batch.commit()
+
+                with self.lock:
+                    for key, _, doc_id, _, fingerprint in chunk:
+                        self.manifest['docs'][key] = {'collection': collection_name, 'id': doc_id, 'fingerprint': fingerprint}
+                self._save_manifest()
+                logger.info(f"💾 Wrote {len(chunk)} {collection_name} document(s)")
+        return len(writes)
+
+    def run(self, source, dry_run=False):
+        """
+        Returns:
+            tuple: (폴더 목록, 원본 상대 경로 -> static 파일명, 반영한 문서 수)
+        """
+        entries = self.scan(source)
+        names = self.publish_files(source, entries, dry_run)
+        written = self.write_documents(entries, names, dry_run)
+
+        current = {entry['key'] for entry in entries}
+        for key, known in self.manifest['docs'].items():
+            if key not in current:
+                logger.warning(f"⚠️ {key} is no longer in the gallery - {known['collection']}/{known['id']} was left as is")
+        return entries, names, written
+
+
+if __name__ == '__main__':
+    from firestore_fake import FakeFirestoreClient
+    from logger import config_path
+    from utils import CacheUtils, FirebaseUtils
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='갤러리 폴더 (posts/, stories/ 하위 폴더)')
+    parser.add_argument('--dry-run', action='store_true', help='복사/쓰기 없이 바뀔 내용만 출력')
+    parser.add_argument('--derivatives', action='store_true', help='파생 이미지와 영상 포스터/재생용 파일도 생성')
+    parser.add_argument('--workers', type=int, help='해시/복사 스레드 수 (기본: [INGEST] WORKERS)')
+    args = parser.parse_args()
+
+    config = toml.load(config_path())
+    if args.workers:
+        config['INGEST']['WORKERS'] = args.workers
+    fake = config['FIRESTORE']['BACKEND'] == 'fake'
+    if fake and not args.dry_run:
+        # 인메모리 Firestore 에 쓴 문서는 사라지는데 manifest 에는 반영한 것으로 남아, 다음 실행이 건너뛴다
+        parser.error('[FIRESTORE] BACKEND = "fake" 에서는 --dry-run 으로만 실행할 수 있습니다.')
+    db = FakeFirestoreClient() if fake else None
+    firebase = FirebaseUtils(CacheUtils(config['CACHE']), config['GLOBAL']['FIREBASE_KEY_PATH'], db=db)
+    ingestor = GalleryIngestor(firebase, config)
+
+    started = time.perf_counter()
+    entries, names, written = ingestor.run(args.source, args.dry_run)
+    logger.info(
+        f"✅ {'Checked' if args.dry_run else 'Ingested'} {len(entries)} folder(s), "
+        f"{written} document(s) {'to write' if args.dry_run else 'written'} in {time.perf_counter() - started:.1f}s"
+    )
+
+    if args.derivatives and not args.dry_run:
+        from media import MediaUtils
+
+        media = MediaUtils(config['DERIVATIVE'])
+        items = [
+            ('profile_image' if os.path.splitext(os.path.basename(rel_path))[0].lower() == PROFILE_STEM
+             else 'post' if rel_path.startswith('posts/') else 'story', filename)
+            for rel_path, filename in names.items()
+        ]
+        count = media.generate(items)
+        media.close()
+        logger.info(f"✅ Generated derivatives for {count} file(s)")
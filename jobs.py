@@ -0,0 +1,213 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from journal import ProcessJournal
+from logger import logger
+from collections import deque
+import os, threading, uuid
+
+# 더 이상 실행하지 않는 작업 상태
+FINISHED_STATUSES = ('done', 'failed')
+
+
+class JobQueue:
+    """
+    업로드 후처리용 로컬 작업 큐
+
+    - 작업은 이름으로 등록된 핸들러를 bounded 스레드 풀에서 실행한다.
+    - 상태 변화는 프로세스별 append-only 저널(JSON Lines, journal.ProcessJournal)에 기록해,
+      재시작 시 (끝난 워커의 저널까지) 끝나지 않은 작업을 다시 실행한다.
+    - 핸들러가 예외를 던지거나 (False, 에러) 를 반환하면 지수 백오프로 재시도한다.
+    - 끝난 작업은 최근 KEEP_FINISHED 개만 상태 조회용으로 메모리에 남기고,
+      끝난 작업이 COMPACT_THRESHOLD 개 쌓일 때마다 저널을 끝나지 않은 작업만으로 다시 쓴다.
+    """
+    def __init__(self, config):
+        self.max_retries = config['MAX_RETRIES']
+        self.retry_delay = config['RETRY_DELAY']
+        self.keep_finished = config.get('KEEP_FINISHED', 1000)
+        self.compact_threshold = config.get('COMPACT_THRESHOLD', 500)
+        self.workers = config['WORKERS']
+        self.journal = ProcessJournal(config['JOURNAL'])
+        self.handlers = {}
+        self.jobs = {}
+        # 끝난 작업 id (끝난 순서) / 마지막 압축 이후 끝난 작업 수
+        self.finished = deque()
+        self.finished_since_compact = 0
+        self.timers = set()
+        self.lock = threading.Lock()
+        self.closed = False
+        # 스레드 풀을 만들고 저널을 복구한 프로세스 (처음 쓸 때 start)
+        self.pid = None
+        self.executor = None
+        self.start_lock = threading.Lock()
+
+    def register(self, name, handler):
+        """작업 이름에 핸들러 등록 (payload 는 키워드 인자로 전달된다)"""
+        self.handlers[name] = handler
+
+    def _write_journal(self, job):
+        with self.lock:
+            self.journal.append(job)
+
+    def _update(self, job, **changes):
+        job.update(changes, updated_at=datetime.now().isoformat())
+        with self.lock:
+            self.journal.append(job)
+            if job['status'] in FINISHED_STATUSES:
+                self._finish(job)
+
+    def _finish(self, job):
+        """락을 잡은 상태에서 호출. 오래된 끝난 작업을 메모리에서 빼고, 쌓이면 저널을 압축"""
+        self.finished.append(job['id'])
+        while len(self.finished) > self.keep_finished:
+            self.jobs.pop(self.finished.popleft(), None)
+
+        self.finished_since_compact += 1
+        if self.finished_since_compact >= self.compact_threshold:
+            self._compact()
+
+    def _compact(self):
+        """락을 잡은 상태에서 호출. 저널을 끝나지 않은 작업의 마지막 상태만으로 다시 쓴다"""
+        unfinished = [job for job in self.jobs.values() if job['status'] not in FINISHED_STATUSES]
+        try:
+            self.journal.rewrite(unfinished)
+        except OSError as e:
+            logger.error(f"❌ Error compacting job journal: {e}")
+            return
+        self.finished_since_compact = 0
+        logger.debug(f"🧹 Compacted job journal ({len(unfinished)} unfinished job(s))")
+
+    def start(self):
+        """
+        이 프로세스에서 처음 쓸 때 스레드 풀을 만들고 끝난 프로세스들의 작업을 복구 (핸들러를 모두 등록한 뒤)
+
+        fork 한 자식(gunicorn --preload 워커)에는 부모의 스레드 풀/타이머 스레드가 없으므로 새로 만든다.
+        부모의 작업은 부모의 저널에 있으니 자식의 작업 목록은 비우고 시작한다.
+        """
+        if self.pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.pid == os.getpid():
+                return
+            self.lock = threading.Lock()
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            self.jobs = {}
+            self.finished = deque()
+            self.finished_since_compact = 0
+            self.timers = set()
+            self.closed = False
+            self._recover()
+            self.pid = os.getpid()
+
+    def _recover(self):
+        """
+        끝난 프로세스들의 저널에서 끝나지 않은 작업을 가져와 다시 큐에 넣는다
+
+        가져온 작업은 자기 저널에 옮겨 적은 뒤 원래 저널을 지운다.
+
+        Returns:
+            int: 다시 실행하는 작업 수
+        """
+        pending = {}
+        for records in self.journal.sweep():
+            remaining = {}
+            for job in records:
+                if job['status'] in FINISHED_STATUSES:
+                    remaining.pop(job['id'], None)
+                else:
+                    remaining[job['id']] = job
+            for job in remaining.values():
+                job['status'] = 'queued'
+                self._write_journal(job)
+            pending.update(remaining)
+
+        for job in pending.values():
+            with self.lock:
+                self.jobs[job['id']] = job
+            self.executor.submit(self._run, job)
+        if pending:
+            logger.info(f"♻️ Recovered {len(pending)} unfinished job(s)")
+        return len(pending)
+
+    def enqueue(self, job_name, /, **payload):
+        """
+        작업 등록
+
+        Returns:
+            str: 작업 ID (status() 로 상태 조회)
+        """
+        if job_name not in self.handlers:
+            raise KeyError(f"Unknown job: {job_name}")
+        self.start()
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'name': job_name,
+            'payload': payload,
+            'status': 'queued',
+            'attempts': 0,
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+        }
+        with self.lock:
+            # 압축이 저널을 다시 쓰는 동안 목록이 바뀌지 않도록 같은 락에서 등록
+            self.jobs[job['id']] = job
+            self.journal.append(job)
+        self.executor.submit(self._run, job)
+        return job['id']
+
+    def _run(self, job):
+        self._update(job, status='running', attempts=job['attempts'] + 1)
+        try:
+            result = self.handlers[job['name']](**job['payload'])
+            if isinstance(result, tuple) and result and result[0] is False:
+                raise RuntimeError(result[1])
+            self._update(job, status='done', error=None)
+            logger.debug(f"✅ Job {job['name']} {job['id']} done")
+
+        except Exception as e:
+            if job['attempts'] <= self.max_retries:
+                delay = self.retry_delay * 2 ** (job['attempts'] - 1)
+                self._update(job, status='retrying', error=str(e))
+                logger.warning(f"⚠️ Job {job['name']} {job['id']} failed ({e}), retrying in {delay:.1f}s")
+                if not self.closed:
+                    self._schedule_retry(job, delay)
+            else:
+                self._update(job, status='failed', error=str(e))
+                logger.error(f"❌ Job {job['name']} {job['id']} failed: {e}")
+
+    def _schedule_retry(self, job, delay):
+        def retry():
+            with self.lock:
+                self.timers.discard(timer)
+            if not self.closed:
+                self.executor.submit(self._run, job)
+
+        timer = threading.Timer(delay, retry)
+        timer.daemon = True
+        with self.lock:
+            self.timers.add(timer)
+        timer.start()
+
+    def status(self, job_id):
+        """작업 상태 조회 (없거나 메모리에서 빠진 오래된 작업이면 None)"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {key: job[key] for key in ('id', 'name', 'status', 'attempts', 'error', 'created_at', 'updated_at') if key in job}
+
+    def close(self):
+        """
+        실행 중인 작업이 끝날 때까지 기다린 뒤 종료
+
+        재시도 대기 중인 작업은 저널에 남아 다음 시작 시 다시 실행된다.
+        """
+        if self.pid != os.getpid():
+            return  # 이 프로세스에서 시작하지 않았다
+        self.closed = True
+        with self.lock:
+            timers, self.timers = list(self.timers), set()
+        for timer in timers:
+            timer.cancel()
+        self.executor.shutdown(wait=True)
+        self.journal.close()
+        self.pid = None
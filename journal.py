@@ -0,0 +1,116 @@
+from logger import logger
+import json, os, re, uuid
+
+try:
+    import fcntl
+except ImportError:  # fcntl 이 없는 플랫폼(Windows)에서는 잠금 없이 (단일 프로세스 실행만 안전)
+    fcntl = None
+
+
+class ProcessJournal:
+    """
+    프로세스별 append-only JSON Lines 파일
+
+    여러 워커 프로세스가 같은 경로 설정을 써도 서로의 파일을 건드리지 않는다.
+    - 각 프로세스는 `<path>.<pid>-<토큰>` 에만 쓰고, 살아 있는 동안 flock 으로 잠가 둔다.
+      (컨테이너 재시작 등으로 pid 가 재사용되어도 이전 프로세스의 파일과 겹치지 않도록 토큰을 붙인다)
+    - sweep() 은 잠겨 있지 않은 (주인 프로세스가 끝난) 다른 파일과 예전 단일 파일 `<path>` 를 읽고 지운다.
+    - 압축(rewrite)은 자기 파일에만 한다.
+    fork 한 자식은 처음 쓸 때 자기 파일을 새로 연다.
+    """
+    def __init__(self, path):
+        self.base_path = path
+        self.directory = os.path.dirname(path) or '.'
+        self.pattern = re.compile(rf"{re.escape(os.path.basename(path))}(\.\d+-[0-9a-f]{{8}})?$")
+        self.path = None
+        self.file = None
+        self.pid = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _lock(f, blocking=True):
+        """파일 잠금 (다른 프로세스가 잡고 있으면 False)"""
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _open(self):
+        """현재 프로세스의 파일을 열고 잠근다 (fork 로 물려받은 부모의 파일은 닫기만 한다)"""
+        if self.pid == os.getpid():
+            return
+        if self.file is not None:
+            self.file.close()  # 부모의 잠금은 부모가 계속 갖고 있다
+        self.path = f"{self.base_path}.{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self._lock(self.file)
+        self.pid = os.getpid()
+
+    def append(self, record):
+        """기록 한 줄 추가 (호출한 쪽이 스레드 락을 잡은 상태에서)"""
+        self._open()
+        self.file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self.file.flush()
+
+    def rewrite(self, records):
+        """
+        자기 파일을 records 만으로 교체 (압축)
+
+        임시 파일을 먼저 잠근 뒤 교체하므로, 다른 프로세스의 sweep 이 새 파일을 가져가지 않는다.
+        """
+        self._open()
+        tmp_path = f"{self.path}.tmp"
+        f = open(tmp_path, 'w', encoding='utf-8')
+        self._lock(f)
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        f.flush()
+        os.replace(tmp_path, self.path)
+        self.file.close()
+        self.file = f
+
+    def sweep(self):
+        """
+        주인 프로세스가 끝난 파일들의 기록을 파일 단위로 내보내고, 호출한 쪽의 처리가 끝나면 그 파일을 지운다
+
+        호출한 쪽은 다음 파일로 넘어가기 전에 남길 기록을 자기 파일에 옮겨 적는다.
+
+        Yields:
+            list: 파일 하나의 기록 (쓰다 만 마지막 줄은 제외)
+        """
+        for filename in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, filename)
+            if not self.pattern.match(filename) or path == self.path:
+                continue
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            with f:
+                if not self._lock(f, blocking=False):
+                    continue  # 살아 있는 워커의 파일
+                try:
+                    if os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                        continue  # 잠금을 기다리는 사이 다른 워커가 처리해 교체/삭제한 파일
+                except FileNotFoundError:
+                    continue
+
+                records = []
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # 마지막 줄이 쓰다 만 경우
+                yield records
+                os.remove(path)
+                if records:
+                    logger.debug(f"🧹 Adopted {len(records)} record(s) from {filename}")
+
+    def close(self):
+        if self.file is not None and self.pid == os.getpid():
+            self.file.close()
+            self.file = None
+            self.pid = None
@@ -1,47 +1,206 @@
 import logging
-import logging.config
+import logging.handlers
 from flask import request, has_request_context
+from pathlib import Path
+import atexit, json, os, queue, re, threading, time, toml
 
-logging_config = {
-    "version": 1,
-    "formatters": {
-        "default": {
-            "format": "[%(asctime)s][%(ip)s] (%(funcName)s) %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S"
-        }
-    },
-    "handlers": {
-        "file": {
-            "level": "DEBUG",
-            "class": "logging.FileHandler",
-            "filename": "logs/app.log",
-            "formatter": "default",
-            "encoding": "utf-8"
-        },
-        "stream": {
-            "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "default"
-        }
-    },
-    "root": {
-        "level": "DEBUG",
-        "handlers": ["file", "stream"]
-    }
+DEFAULT_CONFIG = {
+    'LEVEL': 'DEBUG',
+    'FILE': 'logs/app.log',
+    'FORMAT': 'text',
+    'CONSOLE': True,
+    'QUEUE': True,
+    'MAX_BYTES': 10485760,
+    'BACKUP_COUNT': 5,
+    'WHEN': '',
+    'RATE_LIMIT_INTERVAL': 10,
+    'RATE_LIMIT_PREFIXES': ['✅ Cache HIT'],
 }
 
-# logger 초기화
-logging.config.dictConfig(logging_config)
-    
+TEXT_FORMAT = "[%(asctime)s][%(ip)s] (%(funcName)s) %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
 # RequestFilter 클래스 정의
 class RequestFilter(logging.Filter):
     def filter(self, record):
         record.ip = request.remote_addr if has_request_context() else 'N/A'
         return True
 
-# 로거 생성 및 필터 추가
+
+class RateLimitFilter(logging.Filter):
+    """
+    반복되는 로그(예: Cache HIT)를 같은 내용(숫자 제외)당 interval 초에 한 번만 통과시킨다
+
+    통과하는 레코드에는 그 사이 생략된 개수를 덧붙인다.
+    """
+    DIGITS = re.compile(r'\d+')
+
+    def __init__(self, prefixes, interval):
+        super().__init__()
+        self.prefixes = tuple(prefixes)
+        self.interval = interval
+        # 키 -> [마지막으로 통과한 시각, 생략된 개수]
+        self.seen = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if not self.prefixes or not isinstance(record.msg, str) or not record.msg.startswith(self.prefixes):
+            return True
+
+        key = self.DIGITS.sub('#', record.getMessage())
+        now = time.monotonic()
+        with self.lock:
+            state = self.seen.get(key)
+            if state is not None and now - state[0] < self.interval:
+                state[1] += 1
+                return False
+            suppressed = state[1] if state is not None else 0
+            self.seen[key] = [now, 0]
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} similar in {self.interval}s)"
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 출력 (로그 수집기용)"""
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, DATE_FORMAT),
+            'level': record.levelname,
+            'ip': getattr(record, 'ip', 'N/A'),
+            'func': record.funcName,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    레코드를 포맷하지 않고 큐에 넣는 QueueHandler
+
+    기본 QueueHandler.prepare 는 호출한 스레드에서 format() 을 실행하므로, 메시지 인자만 합치고
+    포맷/파일 쓰기는 QueueListener 스레드에서 하도록 한다.
+    """
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def config_path():
+    """설정 파일 경로 (WEDDINGGRAM_CONFIG 환경 변수, 없으면 이 파일 옆의 config.toml - 실행 위치와 무관)"""
+    return Path(os.getenv('WEDDINGGRAM_CONFIG') or Path(__file__).resolve().parent / 'config.toml')
+
+
+def load_config():
+    """config.toml 의 [LOGGING] (없으면 기본값)"""
+    try:
+        with open(config_path(), 'r') as f:
+            return {**DEFAULT_CONFIG, **toml.load(f).get('LOGGING', {})}
+    except (OSError, toml.TomlDecodeError):
+        return dict(DEFAULT_CONFIG)
+
+
+def build_handlers(config):
+    """파일(크기 또는 시간 기준 순환) + 콘솔(CONSOLE 이 켜져 있으면) 핸들러"""
+    formatter = JsonFormatter() if config['FORMAT'] == 'json' else logging.Formatter(TEXT_FORMAT, DATE_FORMAT)
+    os.makedirs(os.path.dirname(config['FILE']) or '.', exist_ok=True)
+    if config['WHEN']:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            config['FILE'], when=config['WHEN'], backupCount=config['BACKUP_COUNT'], encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            config['FILE'], maxBytes=config['MAX_BYTES'], backupCount=config['BACKUP_COUNT'], encoding='utf-8'
+        )
+    handlers = [file_handler, logging.StreamHandler()] if config['CONSOLE'] else [file_handler]
+    for handler in handlers:
+        handler.setLevel(config['LEVEL'])
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def configure_logging(config):
+    """
+    루트 로거 설정
+
+    QUEUE 가 켜져 있으면 요청 스레드는 레코드를 큐에 넣기만 하고, 포맷과 파일/콘솔 쓰기는
+    QueueListener 스레드가 처리한다. 요청 IP 와 반복 로그 제한은 큐에 넣기 전에 적용한다.
+
+    Returns:
+        QueueListener 또는 None (QUEUE 가 꺼져 있으면 None)
+    """
+    global listener
+    if listener is not None:
+        listener.stop()  # 이전 설정의 큐를 모두 비운 뒤 교체
+        listener = None
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(config['LEVEL'])
+
+    handlers = build_handlers(config)
+
+    if config['QUEUE']:
+        listener = logging.handlers.QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+        handlers = [DeferredQueueHandler(listener.queue)]
+        listener.start()
+
+    # 하위 로거에서 전파된 레코드에도 ip 가 채워지도록 핸들러에 추가 (제한 상태는 핸들러마다 따로)
+    for handler in handlers:
+        handler.addFilter(RequestFilter())
+        handler.addFilter(RateLimitFilter(config['RATE_LIMIT_PREFIXES'], config['RATE_LIMIT_INTERVAL']))
+        root.addHandler(handler)
+    return listener
+
+
+def stop_listener():
+    """큐에 남은 로그를 모두 쓴 뒤 QueueListener 를 멈춘다"""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def restart_listener():
+    """
+    fork 한 자식에서 QueueListener 를 새로 시작 (os.register_at_fork 에서 호출)
+
+    자식에는 부모의 리스너 스레드가 없어 큐에 넣은 로그가 쓰이지 않는다.
+    부모가 아직 쓰지 않은 레코드가 섞이지 않도록 새 큐를 만든다.
+    """
+    global listener
+    if listener is None:
+        return
+    listener = logging.handlers.QueueListener(
+        queue.SimpleQueue(), *listener.handlers, respect_handler_level=listener.respect_handler_level
+    )
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DeferredQueueHandler):
+            handler.queue = listener.queue
+    listener.start()
+
+
+# logger 초기화 (종료 시 큐에 남은 로그를 모두 쓴다)
+listener = None
+configure_logging(load_config())
+atexit.register(stop_listener)
+os.register_at_fork(after_in_child=restart_listener)
+
 logger = logging.getLogger()
-logger.addFilter(RequestFilter())
 
 # werkzeug 로거 완전 비활성화
-logging.getLogger("werkzeug").disabled = True
\ No newline at end of file
+logging.getLogger("werkzeug").disabled = True
@@ -0,0 +1,414 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+from flask import url_for
+from markupsafe import Markup, escape
+from logger import logger
+import hashlib, json, os, shutil, subprocess, tempfile, threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 가 없으면 파생 이미지 없이 원본만 사용
+    Image = None
+
+# 파생 이미지를 만들 원본 확장자
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# 포스터/재생용 파일을 만들 영상 확장자 (faststart 리먹싱은 MP4 계열만 가능)
+VIDEO_EXTENSIONS = ('.mp4', '.m4v', '.mov', '.webm', '.ogg')
+FASTSTART_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+
+# srcset / <source type> 에 사용할 포맷별 확장자와 MIME 타입
+FORMAT_INFO = {
+    'avif': ('avif', 'image/avif'),
+    'webp': ('webp', 'image/webp'),
+    'jpeg': ('jpg', 'image/jpeg'),
+}
+
+
+def file_digest(path):
+    """파일 내용의 sha256 (파생 이미지 캐시 키)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_derivatives(source_path, digest, output_dir, widths, formats, quality):
+    """
+    원본 이미지 하나로 크기별/포맷별 파생 이미지를 생성 (프로세스 풀에서 실행)
+
+    Returns:
+        dict: 포맷 -> [[너비, 파일명], ...] (원본보다 큰 너비는 만들지 않는다)
+    """
+    variants = {}
+    with Image.open(source_path) as image:
+        if getattr(image, 'is_animated', False):
+            return variants  # 움직이는 GIF 는 원본 그대로 사용
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+
+        targets = [width for width in widths if width < image.width] or [image.width]
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+
+            for fmt in formats:
+                extension, _ = FORMAT_INFO[fmt]
+                filename = f"{digest[:32]}_{width}.{extension}"
+                path = os.path.join(output_dir, filename)
+                if not os.path.exists(path):
+                    converted = resized.convert('RGBA' if has_alpha and fmt != 'jpeg' else 'RGB')
+                    try:
+                        converted.save(path, fmt.upper(), quality=quality)
+                    except (KeyError, OSError, ValueError):
+                        continue  # 이 Pillow 빌드가 지원하지 않는 포맷 (예: AVIF)
+                variants.setdefault(fmt, []).append([width, filename])
+    return variants
+
+
+def run_ffmpeg(ffmpeg, args, output_path):
+    """
+    ffmpeg 를 실행해 output_path 를 만든다 (임시 파일에 쓴 뒤 교체)
+
+    Returns:
+        bool: 성공 여부
+    """
+    directory, name = os.path.split(output_path)
+    tmp_path = os.path.join(directory, f".tmp_{name}")
+    result = subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', *args, tmp_path],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    if result.returncode != 0 or not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, output_path)
+    return True
+
+
+def build_video_derivatives(source_path, digest, output_dir, ffmpeg, options):
+    """
+    영상 하나로 포스터 이미지, faststart MP4, 저비트레이트 MP4 를 생성 (프로세스 풀에서 실행)
+
+    - poster: 1초 지점(더 짧으면 첫 프레임)의 JPEG
+    - stream: moov 를 파일 앞으로 옮긴 MP4 (재인코딩 없이 복사, MP4 계열 원본만)
+    - rendition: 높이 options['rendition_height'] 이하의 H.264/AAC MP4 (원본보다 작을 때만)
+
+    Args:
+        options (dict): poster_width, rendition_height(0 이면 만들지 않음), rendition_crf,
+            rendition_maxrate, threads
+
+    Returns:
+        dict: {'poster': 파일명, 'stream': 파일명, 'rendition': [높이, 파일명]} (만들지 못한 항목은 None)
+    """
+    prefix = digest[:32]
+    threads = ['-threads', str(options['threads'])]
+    result = {'poster': None, 'stream': None, 'rendition': None}
+
+    poster = f"{prefix}_poster.jpg"
+    poster_path = os.path.join(output_dir, poster)
+    scale = f"scale='min({options['poster_width']},iw)':-2"
+    if os.path.exists(poster_path) or any(
+        run_ffmpeg(ffmpeg, ['-ss', offset, '-i', source_path, *threads, '-frames:v', '1', '-update', '1',
+                            '-vf', scale, '-q:v', '3'], poster_path)
+        for offset in ('1', '0')
+    ):
+        result['poster'] = poster
+
+    if source_path.lower().endswith(FASTSTART_EXTENSIONS):
+        stream = f"{prefix}_stream.mp4"
+        stream_path = os.path.join(output_dir, stream)
+        if os.path.exists(stream_path) or run_ffmpeg(
+            ffmpeg, ['-i', source_path, *threads, '-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy',
+                     '-movflags', '+faststart'], stream_path
+        ):
+            result['stream'] = stream
+
+    height = options['rendition_height']
+    if height:
+        rendition = f"{prefix}_{height}p.mp4"
+        rendition_path = os.path.join(output_dir, rendition)
+        maxrate = options['rendition_maxrate']
+        if os.path.exists(rendition_path) or run_ffmpeg(
+            ffmpeg, ['-i', source_path, *threads, '-map', '0:v:0', '-map', '0:a:0?',
+                     '-vf', f"scale=-2:'min({height},ih)'", '-c:v', 'libx264', '-preset', 'slow',
+                     '-crf', str(options['rendition_crf']), '-maxrate', maxrate, '-bufsize', maxrate,
+                     '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart'],
+            rendition_path
+        ):
+            if os.path.getsize(rendition_path) < os.path.getsize(source_path):
+                result['rendition'] = [height, rendition]
+            else:
+                os.remove(rendition_path)  # 원본이 이미 충분히 가볍다
+    return result
+
+
+class MediaUtils:
+    def __init__(self, config, static_root='./static'):
+        self.static_root = static_root
+        self.output_dir = config['PATH']
+        self.widths = sorted(config['WIDTHS'])
+        self.formats = [fmt for fmt in config['FORMATS'] if fmt in FORMAT_INFO]
+        self.quality = config['QUALITY']
+        self.workers = config['WORKERS'] or os.cpu_count()
+        self.ffmpeg = shutil.which(config.get('FFMPEG', 'ffmpeg'))
+        self.video_options = {
+            'poster_width': config.get('VIDEO_POSTER_WIDTH', 1080),
+            'rendition_height': config.get('VIDEO_RENDITION_HEIGHT', 720),
+            'rendition_crf': config.get('VIDEO_RENDITION_CRF', 28),
+            'rendition_maxrate': config.get('VIDEO_RENDITION_MAXRATE', '1500k'),
+            # 워커마다 ffmpeg 가 코어를 모두 쓰지 않도록 나눠준다
+            'threads': max(1, (os.cpu_count() or 1) // self.workers),
+        }
+        self.manifest_path = os.path.join(self.output_dir, 'manifest.json')
+        self.url_prefix = os.path.relpath(self.output_dir, static_root).replace(os.sep, '/')
+        self.manifest = self._load_manifest()
+        self.lock = threading.Lock()
+        self.executor = None
+        # 파생 이미지가 새로 생기면 호출 (렌더링된 페이지 캐시 비우기 등)
+        self.on_change = None
+        # 일괄 생성 중에는 manifest 를 마지막에 한 번만 저장
+        self.bulk = False
+
+        if Image is None:
+            logger.warning("⚠️ Pillow is not installed - image derivatives are disabled")
+        if self.ffmpeg is None:
+            logger.warning("⚠️ ffmpeg is not installed - video posters and renditions are disabled")
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        """manifest 를 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self.lock:
+            data = json.dumps(self.manifest, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix='.manifest_')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+
+    def source_path(self, category, filename):
+        return os.path.join(self.static_root, 'media', category, filename)
+
+    def is_image(self, filename):
+        return filename.lower().endswith(IMAGE_EXTENSIONS)
+
+    def is_video(self, filename):
+        return filename.lower().endswith(VIDEO_EXTENSIONS)
+
+    def submit(self, category, filename):
+        """
+        원본 하나의 파생 이미지(영상이면 포스터/재생용 파일) 생성을 프로세스 풀에 등록
+
+        Returns:
+            Future 또는 None (처리할 수 없는 파일이거나 이미 최신이면 None)
+        """
+        if self.is_image(filename):
+            if Image is None:
+                return None
+            field = 'variants'
+        elif self.is_video(filename):
+            if self.ffmpeg is None:
+                return None
+            field = 'video'
+        else:
+            return None
+
+        key = f"{category}/{filename}"
+        path = self.source_path(category, filename)
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ Media file not found: {path}")
+            return None
+
+        digest = file_digest(path)
+        entry = self.manifest.get(key)
+        if entry and entry['hash'] == digest:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        if field == 'video':
+            future = self._executor().submit(
+                build_video_derivatives, path, digest, self.output_dir, self.ffmpeg, self.video_options
+            )
+        else:
+            future = self._executor().submit(
+                build_derivatives, path, digest, self.output_dir, self.widths, self.formats, self.quality
+            )
+        future.add_done_callback(lambda f: self._record(key, digest, field, f))
+        return future
+
+    def _record(self, key, digest, field, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"❌ Error building derivatives for {key}: {e}")
+            return
+        with self.lock:
+            self.manifest[key] = {'hash': digest, field: result}
+        logger.info(f"🖼️ Built derivatives for {key}")
+        if not self.bulk:
+            self._save_manifest()
+        if self.on_change:
+            self.on_change()
+
+    def generate(self, items):
+        """
+        여러 원본의 파생 이미지를 병렬로 생성하고 manifest 저장
+
+        Args:
+            items (iterable): (분류, 파일명) 목록. 분류는 static/media 하위 폴더 이름
+
+        Returns:
+            int: 새로 처리한 원본 수
+        """
+        self.bulk = True
+        try:
+            futures = [future for future in (self.submit(category, filename) for category, filename in set(items)) if future]
+            wait(futures)
+        finally:
+            self.bulk = False
+        self._save_manifest()
+        return len(futures)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        self._save_manifest()
+
+    def srcsets(self, category, filename):
+        """
+        포맷별 srcset 문자열
+
+        Returns:
+            dict: 포맷 -> 'url 320w, url 640w' (파생 이미지가 없으면 빈 dict)
+        """
+        entry = self.manifest.get(f"{category}/{filename}")
+        if not entry or 'variants' not in entry:
+            return {}
+        return {
+            fmt: ', '.join(
+                f"{url_for('static', filename=f'{self.url_prefix}/{name}')} {width}w" for width, name in variants
+            )
+            for fmt, variants in entry['variants'].items()
+        }
+
+    def picture(self, category, filename, sizes='100vw', alt='', **attrs):
+        """
+        템플릿 헬퍼: 파생 이미지가 있으면 <picture> + srcset, 없으면 원본 <img>
+
+        예) {{ picture('profile_image', post.profile_image, sizes='32px') }}
+        """
+        src = url_for('static', filename=f'media/{category}/{filename}')
+        img_attrs = ''.join(f' {escape(key)}="{escape(value)}"' for key, value in attrs.items())
+        srcsets = self.srcsets(category, filename)
+        if not srcsets:
+            return Markup(f'<img src="{escape(src)}" alt="{escape(alt)}"{img_attrs}>')
+
+        sources = ''.join(
+            f'<source type="{FORMAT_INFO[fmt][1]}" srcset="{escape(srcset)}" sizes="{escape(sizes)}">'
+            for fmt, srcset in srcsets.items() if fmt != 'jpeg'
+        )
+        fallback = f' srcset="{escape(srcsets["jpeg"])}" sizes="{escape(sizes)}"' if 'jpeg' in srcsets else ''
+        return Markup(
+            f'<picture>{sources}<img src="{escape(src)}"{fallback} alt="{escape(alt)}"{img_attrs}></picture>'
+        )
+
+    def video_sources(self, category, filename):
+        """
+        영상의 포스터/재생 URL
+
+        Returns:
+            dict: {'poster': URL 또는 None, 'src': faststart MP4(없으면 원본) URL,
+                'type': src 의 MIME 타입, 'rendition': 저비트레이트 MP4 URL 또는 None}
+        """
+        entry = (self.manifest.get(f"{category}/{filename}") or {}).get('video') or {}
+
+        def derived_url(name):
+            return url_for('static', filename=f'{self.url_prefix}/{name}') if name else None
+
+        if entry.get('stream'):
+            src, mimetype = derived_url(entry['stream']), 'video/mp4'
+        else:
+            src = url_for('static', filename=f'media/{category}/{filename}')
+            mimetype = f"video/{filename.rsplit('.', 1)[-1].lower()}"
+        return {
+            'poster': derived_url(entry.get('poster')),
+            'src': src,
+            'type': mimetype,
+            'rendition': derived_url((entry.get('rendition') or [None, None])[1]),
+        }
+
+    def video(self, category, filename, rendition_media='(max-width: 768px)', **attrs):
+        """
+        템플릿 헬퍼: 포스터와 (작은 화면용) 저비트레이트 <source> 를 포함한 <video>
+
+        포스터가 있으면 preload="none" 으로 재생 전에는 영상을 받지 않는다.
+        값이 True 인 속성은 이름만 출력한다 (예: playsinline=True).
+
+        예) {{ video('post', media, playsinline=True, muted=True) }}
+        """
+        sources = self.video_sources(category, filename)
+        if sources['poster']:
+            attrs = {'poster': sources['poster'], 'preload': 'none', **attrs}
+        else:
+            attrs = {'preload': 'metadata', **attrs}
+        video_attrs = ''.join(
+            f' {escape(key)}' if value is True else f' {escape(key)}="{escape(value)}"'
+            for key, value in attrs.items() if value is not False
+        )
+        rendition = (
+            f'<source src="{escape(sources["rendition"])}" type="video/mp4" media="{escape(rendition_media)}">'
+            if sources['rendition'] else ''
+        )
+        return Markup(
+            f'<video{video_attrs}>{rendition}<source src="{escape(sources["src"])}" type="{escape(sources["type"])}">'
+            '브라우저가 비디오를 지원하지 않습니다.</video>'
+        )
+
+
+def referenced_media(firebase):
+    """Firestore 문서가 참조하는 (분류, 파일명) 목록"""
+    items = []
+    for post in firebase.get_collection_data('wedding_post', ignore_cache=True):
+        items += [('post', name) for name in post.get('post_image', [])]
+        if post.get('thumbnail'):
+            items.append(('post', post['thumbnail']))
+        if post.get('profile_image'):
+            items.append(('profile_image', post['profile_image']))
+    for story in firebase.get_collection_data('wedding_story', ignore_cache=True):
+        items += [('story', name) for name in story.get('story_media', [])]
+        if story.get('profile_image'):
+            items.append(('profile_image', story['profile_image']))
+    for message in firebase.get_collection_data('wedding_guestbook', ignore_cache=True):
+        if message.get('profile_image'):
+            items.append(('profile_image', message['profile_image']))
+    return items
+
+
+if __name__ == '__main__':
+    # Firestore 문서가 참조하는 모든 미디어의 파생 이미지를 미리 생성
+    #   python media.py
+    from logger import config_path
+    from utils import CacheUtils, FirebaseUtils
+    import time, toml
+
+    config = toml.load(config_path())
+    firebase = FirebaseUtils(CacheUtils(config['CACHE']), config['GLOBAL']['FIREBASE_KEY_PATH'])
+    media = MediaUtils(config['DERIVATIVE'])
+
+    started = time.perf_counter()
+    count = media.generate(referenced_media(firebase))
+    media.close()
+    logger.info(f"✅ Generated derivatives for {count} file(s) in {time.perf_counter() - started:.1f}s")
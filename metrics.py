@@ -0,0 +1,218 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading, time
+
+# Prometheus 텍스트 포맷 (GET /metrics 응답의 Content-Type)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 요청 지연 시간 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 요청 하나가 호출한 Firestore 작업 수 구간
+CALL_BUCKETS = (0, 1, 2, 3, 5, 10, 20)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """라벨별 누적 값 (예: 작업 횟수, 업로드 바이트)"""
+    TYPE = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    """
+    라벨별 분포 (구간별 개수 + 합계 + 개수)
+
+    observe 는 해당 구간 하나만 증가시키고, 누적 개수는 출력할 때 계산한다.
+    """
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        # 라벨 값 -> [구간별 개수..., +Inf 개수, 합계]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.bounds, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.bounds) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self):
+        with self.lock:
+            items = [(key, list(state)) for key, state in self.values.items()]
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float('inf'),), state[:-1]):
+                cumulative += count
+                yield f'{self.name}_bucket', _format_labels(
+                    self.labelnames, key, f'le="{_format_number(bound)}"'
+                ), cumulative
+            yield f'{self.name}_sum', _format_labels(self.labelnames, key), state[-1]
+            yield f'{self.name}_count', _format_labels(self.labelnames, key), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus 텍스트 포맷으로 출력"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    'weddinggram_requests_total', 'HTTP requests by route, method and status.', ('route', 'method', 'status')
+))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'weddinggram_request_duration_seconds', 'HTTP request latency by route.', ('route', 'method')
+))
+REQUEST_FIRESTORE_CALLS = REGISTRY.register(Histogram(
+    'weddinggram_request_firestore_calls', 'Firestore operations made while serving one request.',
+    ('route',), buckets=CALL_BUCKETS
+))
+REQUEST_FIRESTORE_SECONDS = REGISTRY.register(Histogram(
+    'weddinggram_request_firestore_seconds', 'Time spent in Firestore operations while serving one request.',
+    ('route',)
+))
+FIRESTORE_OPS = REGISTRY.register(Counter(
+    'weddinggram_firestore_operations_total', 'Firestore operations by type and collection.', ('op', 'collection')
+))
+FIRESTORE_LATENCY = REGISTRY.register(Histogram(
+    'weddinggram_firestore_operation_duration_seconds', 'Firestore operation latency by type.', ('op',)
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'weddinggram_cache_lookups_total', 'Collection cache lookups by result (hit, miss, stale, shared).',
+    ('collection', 'result')
+))
+PAGE_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'weddinggram_page_cache_lookups_total', 'Rendered page cache lookups by result (hit, miss).', ('result',)
+))
+UPLOADS = REGISTRY.register(Counter(
+    'weddinggram_uploads_total', 'File uploads by category and result (saved, duplicate, rejected).',
+    ('category', 'result')
+))
+UPLOAD_BYTES = REGISTRY.register(Counter(
+    'weddinggram_upload_bytes_total', 'Bytes received in file uploads by category.', ('category',)
+))
+
+
+class RequestStats:
+    """요청 하나의 시작 시각과 Firestore 호출 수/시간"""
+    __slots__ = ('started', 'firestore_calls', 'firestore_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.firestore_calls = 0
+        self.firestore_seconds = 0.0
+
+
+# 현재 요청의 RequestStats (요청 밖의 백그라운드 작업에서는 None)
+_current_request = ContextVar('request_stats', default=None)
+
+
+def begin_request():
+    """요청 시작 시 호출. asyncio.gather 로 나뉜 태스크도 같은 RequestStats 를 공유한다"""
+    stats = RequestStats()
+    _current_request.set(stats)
+    return stats
+
+
+def end_request(stats, route, method, status):
+    """요청 종료 시 호출. route 는 URL 규칙(예: /like/<post_id>)을 넘겨 라벨 수가 늘지 않게 한다"""
+    _current_request.set(None)
+    REQUESTS.inc(route=route, method=method, status=status)
+    REQUEST_LATENCY.observe(time.perf_counter() - stats.started, route=route, method=method)
+    REQUEST_FIRESTORE_CALLS.observe(stats.firestore_calls, route=route)
+    REQUEST_FIRESTORE_SECONDS.observe(stats.firestore_seconds, route=route)
+
+
+@contextmanager
+def firestore_op(op, collection):
+    """
+    Firestore 호출 하나의 횟수/시간을 기록 (요청 중이면 요청별 합계에도 더한다)
+
+    예) with metrics.firestore_op('stream', collection_name): ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        FIRESTORE_OPS.inc(op=op, collection=collection)
+        FIRESTORE_LATENCY.observe(elapsed, op=op)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.firestore_calls += 1
+            stats.firestore_seconds += elapsed
+
+
+@contextmanager
+def firestore_batch(collection, writes):
+    """
+    WriteBatch 커밋 시간을 기록하고, 커밋에 성공하면 담긴 쓰기를 종류별로 센다
+
+    Args:
+        writes (dict): 쓰기 종류(set / update / delete) -> 개수
+    """
+    with firestore_op('commit', collection):
+        yield
+    for op, count in writes.items():
+        FIRESTORE_OPS.inc(count, op=op, collection=collection)
+
+
+def render():
+    return REGISTRY.render()
@@ -0,0 +1,145 @@
+from datetime import datetime
+from logger import logger
+import json, os, sqlite3, threading, time, zlib
+
+# 스냅샷 포맷 버전. 저장 형식이 바뀌면 올려서 이전 스냅샷을 무시하게 한다
+# (2: 미반영 쓰기/증감분을 빼고, 저장 시각 대신 Firestore 에서 읽은 시각을 저장)
+SNAPSHOT_FORMAT = 2
+
+
+def _encode_value(value):
+    """JSON 으로 표현할 수 없는 Firestore 값 변환 (datetime 은 태그를 붙여 보존)"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    return str(value)
+
+
+def _decode_object(obj):
+    if '__datetime__' in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+def encode_docs(docs):
+    """문서 목록을 압축된 JSON 바이트로 변환"""
+    data = json.dumps(list(docs), ensure_ascii=False, separators=(',', ':'), default=_encode_value)
+    return zlib.compress(data.encode('utf-8'), 6)
+
+
+def decode_docs(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'), object_hook=_decode_object)
+
+
+class SnapshotStore:
+    """
+    컬렉션 캐시의 로컬 스냅샷 저장소 (SQLite)
+
+    - 캐시가 바뀐 컬렉션만 주기적으로 저장한다 (컬렉션당 한 행, 압축된 JSON).
+      Firestore 에 반영된 내용만 그 내용을 읽은 시각(saved_at 열)과 함께 저장해,
+      복원한 캐시는 원래 남은 유효 시간만큼만 유효하다.
+    - 시작 시 load() 로 캐시를 먼저 채워 첫 요청부터 Firestore 없이 응답하고,
+      Firestore 에 연결할 수 없을 때도 마지막 스냅샷으로 페이지를 렌더링한다.
+    """
+    def __init__(self, cachestore, config):
+        self.cachestore = cachestore
+        self.path = config['PATH']
+        self.interval = config['INTERVAL']
+        self.collections = config['COLLECTIONS']
+        # 컬렉션 -> 마지막으로 저장한 캐시 버전
+        self.saved_versions = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self.lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots ('
+                'collection TEXT PRIMARY KEY, format INTEGER NOT NULL, saved_at REAL NOT NULL, '
+                'count INTEGER NOT NULL, data BLOB NOT NULL)'
+            )
+
+    def load(self):
+        """
+        저장된 스냅샷으로 캐시를 채운다
+
+        Returns:
+            list: 복원한 컬렉션 이름 목록
+        """
+        started = time.perf_counter()
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT collection, format, saved_at, data FROM snapshots "
+                f"WHERE collection IN ({', '.join('?' * len(self.collections))})",
+                self.collections
+            ).fetchall()
+
+        loaded = []
+        for collection_name, snapshot_format, fetched_at, blob in rows:
+            if snapshot_format != SNAPSHOT_FORMAT:
+                logger.warning(f"⚠️ Ignoring snapshot of {collection_name} (format {snapshot_format})")
+                continue
+            try:
+                docs = decode_docs(blob)
+            except ValueError as e:
+                logger.error(f"❌ Error decoding snapshot of {collection_name}: {e}")
+                continue
+            self.cachestore.set_cache(collection_name, docs, fetched_at=fetched_at)
+            self.saved_versions[collection_name] = self.cachestore.export_cache(collection_name)[0]
+            loaded.append(collection_name)
+
+        if loaded:
+            elapsed = (time.perf_counter() - started) * 1000
+            logger.info(f"📦 Restored {', '.join(loaded)} from snapshot in {elapsed:.1f}ms")
+        return loaded
+
+    def save(self):
+        """
+        마지막 저장 이후 바뀐 컬렉션 캐시를 저장
+
+        Returns:
+            int: 저장한 컬렉션 수
+        """
+        saved = 0
+        for collection_name in self.collections:
+            exported = self.cachestore.export_cache(collection_name)
+            if exported is None:
+                continue
+            version, fetched_at, docs = exported
+            if self.saved_versions.get(collection_name) == version:
+                continue
+            try:
+                blob = encode_docs(docs)
+                with self.lock, self.conn:
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO snapshots (collection, format, saved_at, count, data) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (collection_name, SNAPSHOT_FORMAT, fetched_at, len(docs), blob)
+                    )
+                self.saved_versions[collection_name] = version
+                saved += 1
+                logger.debug(f"📦 Saved snapshot of {collection_name} ({len(docs)} docs, {len(blob)} bytes)")
+            except Exception as e:
+                logger.error(f"❌ Error saving snapshot of {collection_name}: {e}")
+        return saved
+
+    def _save_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.save()
+
+    def start(self):
+        """주기적 저장 스레드 시작"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._save_loop, name='snapshot-saver', daemon=True)
+            self.thread.start()
+
+    def close(self):
+        """저장 스레드를 멈추고 마지막으로 한 번 저장 (종료 시 호출)"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.save()
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,109 @@
+"""
+워커 시작 준비: Jinja 템플릿 바이트코드 캐시/미리 컴파일과 시작 단계별 진행 상황
+
+app.create_app() 이 단계(Firebase 연결, 템플릿 컴파일, 컬렉션 캐시/페이지 warm-up)를 백그라운드에서 실행하고,
+GET /ready 는 모든 단계가 끝나기 전까지 503 을 반환한다.
+"""
+from jinja2 import FileSystemBytecodeCache
+from logger import logger
+import os, threading, time
+
+
+def create_bytecode_cache(directory, name):
+    """
+    컴파일한 템플릿을 directory 에 저장하는 Jinja 바이트코드 캐시 (빈 값이면 None)
+
+    Args:
+        name (str): 파일 이름 접두사. Flask(동기)와 Quart(비동기 렌더링)는 컴파일 결과가 달라 따로 저장한다
+    """
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory, f"{name}_%s.cache")
+
+
+def precompile_templates(jinja_env, extensions=('html',)):
+    """
+    모든 템플릿을 미리 불러와 컴파일 (첫 요청이 템플릿 컴파일을 기다리지 않도록)
+
+    불러온 템플릿은 jinja_env 의 캐시에 남고, 바이트코드 캐시가 있으면 이전 실행에서 컴파일한 결과를 읽는다.
+
+    Returns:
+        int: 불러온 템플릿 수
+    """
+    names = jinja_env.list_templates(extensions=extensions)
+    for name in names:
+        jinja_env.get_template(name)
+    return len(names)
+
+
+class Readiness:
+    """
+    시작 단계별 진행 상황 (pending / running / done / failed, 소요 시간)
+
+    모든 단계가 끝나면 실패한 단계가 있어도 준비된 것으로 본다.
+    실패한 단계의 데이터는 요청이 들어올 때 평소처럼 다시 읽는다.
+    """
+    def __init__(self, steps):
+        self.step_names = list(steps)
+        self.started_at = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        """처음 상태로 (fork 한 자식에서 단계를 다시 실행할 때)"""
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.steps = {name: {'state': 'pending'} for name in self.step_names}
+        self.ready_at = None
+
+    @property
+    def ready(self):
+        return self.event.is_set()
+
+    def wait(self, timeout=None):
+        """준비될 때까지 대기 (timeout 안에 준비되면 True)"""
+        return self.event.wait(timeout)
+
+    def run(self, name, func, *args):
+        """
+        단계 하나를 실행하고 결과/소요 시간 기록 (예외는 기록만 하고 다음 단계로 넘어간다)
+
+        Returns:
+            func 의 반환값 (실패하면 None)
+        """
+        with self.lock:
+            self.steps[name] = {'state': 'running'}
+        started = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.steps[name] = {'state': 'failed', 'seconds': round(elapsed, 3), 'error': str(e)}
+            logger.error(f"❌ Startup step {name} failed after {elapsed:.2f}s: {e}")
+            return None
+
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.steps[name] = {'state': 'done', 'seconds': round(elapsed, 3)}
+        logger.info(f"🚀 Startup step {name} done in {elapsed:.2f}s")
+        return result
+
+    def skip(self, name):
+        with self.lock:
+            self.steps[name] = {'state': 'skipped'}
+
+    def finish(self):
+        self.ready_at = time.monotonic()
+        self.event.set()
+        logger.info(f"✅ Worker ready {self.ready_at - self.started_at:.2f}s after start")
+
+    def status(self):
+        """GET /ready 응답용 dict"""
+        with self.lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        return {
+            'ready': self.ready,
+            'seconds': round((self.ready_at or time.monotonic()) - self.started_at, 3),
+            'steps': steps,
+        }
@@ -12,6 +12,8 @@ class ExploreGrid {
         this.container = container;
         this.posts = posts;
         this.modal = new ExploreModal();
+        this.nextCursor = config.NEXT_CURSOR;
+        this.loading = false;
         
         this.initialize();
     }
@@ -21,8 +23,13 @@ class ExploreGrid {
             return;
         }
         
+        this.appendPosts(this.posts);
+        this.initializeLazyLoad();
+    }
+
+    appendPosts(posts) {
         const fragment = document.createDocumentFragment();
-        this.posts.forEach((post, index) => {
+        posts.forEach((post, index) => {
             const item = this.createExploreItem(post);
             fragment.appendChild(item);
         });
@@ -30,6 +37,51 @@ class ExploreGrid {
         this.container.appendChild(fragment);
     }
 
+    /**
+     * 그리드 끝이 화면에 가까워지면 다음 페이지를 불러온다
+     */
+    initializeLazyLoad() {
+        if (!this.nextCursor) return;
+
+        this.sentinel = document.createElement('div');
+        this.sentinel.className = 'explore_sentinel';
+        this.container.after(this.sentinel);
+
+        this.observer = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                this.loadMore();
+            }
+        }, { rootMargin: '400px' });
+        this.observer.observe(this.sentinel);
+    }
+
+    async loadMore() {
+        if (this.loading || !this.nextCursor) return;
+        this.loading = true;
+
+        try {
+            const response = await fetch(`/api/posts?view=explore&after=${encodeURIComponent(this.nextCursor)}`);
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error);
+            }
+
+            config.DERIVATIVES = { ...config.DERIVATIVES, ...result.derivatives };
+            this.posts.push(...result.posts);
+            this.appendPosts(result.posts);
+
+            this.nextCursor = result.next;
+            if (!this.nextCursor) {
+                this.observer.disconnect();
+                this.sentinel.remove();
+            }
+        } catch (error) {
+            console.error('Error:', error);
+        } finally {
+            this.loading = false;
+        }
+    }
+
     /**
      * 탐색 아이템 요소 생성
      */
@@ -95,16 +147,34 @@ class ExploreGrid {
             
         } else {
             item.innerHTML = `
-                <img class="img-fluid" 
-                     src="${config.STATIC_PATHS.POST}${post.thumbnail}" 
-                     loading="lazy" 
-                     alt="${post.name}'s post">
+                <picture>
+                    ${this.createSources(post.thumbnail)}
+                    <img class="img-fluid" 
+                         src="${config.STATIC_PATHS.POST}${post.thumbnail}" 
+                         loading="lazy" 
+                         alt="${post.name}'s post">
+                </picture>
             `;
         }
         
         item.addEventListener('click', () => this.modal.show(post));
         return item;
     }
+
+    /**
+     * 서버에서 생성한 파생 이미지(AVIF/WebP/JPEG)의 <source> 태그 생성
+     */
+    createSources(thumbnail) {
+        const srcsets = config.DERIVATIVES?.[thumbnail];
+        if (!srcsets) {
+            return '';
+        }
+
+        const types = { avif: 'image/avif', webp: 'image/webp', jpeg: 'image/jpeg' };
+        return Object.entries(srcsets)
+            .map(([format, srcset]) => `<source type="${types[format]}" srcset="${srcset}" sizes="34vw">`)
+            .join('');
+    }
 }
 
 /**
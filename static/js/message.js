@@ -3,7 +3,7 @@ class MessageManager {
     constructor() {
         this.deleteManager = new DeleteManager();
         this.modal = new MessageModal(this.deleteManager);
-        this.messageList = new MessageList();
+        this.messageList = new MessageList(this.deleteManager);
         this.initializeEventListeners();
     }
 
@@ -17,8 +17,63 @@ class MessageManager {
 
 /* 메시지 목록 관리 클래스 */
 class MessageList {
-    constructor() {
+    constructor(deleteManager) {
+        this.deleteManager = deleteManager;
         this.container = document.querySelector('.message_container');
+        this.nextCursor = config.NEXT_CURSOR;
+        this.loading = false;
+        this.initializeLazyLoad();
+    }
+
+    /**
+     * 목록 끝이 화면에 가까워지면 다음 페이지를 불러온다
+     */
+    initializeLazyLoad() {
+        if (!this.nextCursor) return;
+
+        this.sentinel = document.createElement('div');
+        this.sentinel.className = 'message_sentinel';
+        this.container.after(this.sentinel);
+
+        this.observer = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                this.loadMore();
+            }
+        }, { rootMargin: '200px' });
+        this.observer.observe(this.sentinel);
+    }
+
+    async loadMore() {
+        if (this.loading || !this.nextCursor) return;
+        this.loading = true;
+
+        try {
+            const response = await fetch(`/api/messages?after=${encodeURIComponent(this.nextCursor)}`);
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error);
+            }
+
+            const fragment = document.createDocumentFragment();
+            result.messages.forEach(message => {
+                // 방금 작성해서 이미 추가된 메시지는 건너뛴다
+                if (!this.container.querySelector(`.message[data-message-id="${message.id}"]`)) {
+                    fragment.appendChild(MessageList.createMessageElement(message));
+                }
+            });
+            this.container.appendChild(fragment);
+            this.deleteManager.attachDeleteListeners();
+
+            this.nextCursor = result.next;
+            if (!this.nextCursor) {
+                this.observer.disconnect();
+                this.sentinel.remove();
+            }
+        } catch (error) {
+            console.error('Error:', error);
+        } finally {
+            this.loading = false;
+        }
     }
 
     static createMessageElement(messageData) {
@@ -26,24 +81,41 @@ class MessageList {
         messageElement.className = 'message';
         messageElement.dataset.messageId = messageData.id;
         
-        messageElement.innerHTML = `
-            <div class="left">
-                <div class="message_profile">
-                    <img src="/static/media/profile_image/${messageData.profile_image}" alt="프로필 이미지">
-                </div>
-                <div class="message_info">
-                    <p class="name">${messageData.name}</p>
-                    <p class="p_message">${messageData.comment}</p>
-                </div>
-            </div>
-            <button type="button" class="btn btn-link delete-message p-0" style="color: #dc3545;">
-                <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" class="bi bi-trash" viewBox="0 0 16 16">
-                    <path d="M5.5 5.5A.5.5 0 0 1 6 6v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5zm2.5 0a.5.5 0 0 1 .5.5v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5zm3 .5a.5.5 0 0 0-1 0v6a.5.5 0 0 0 1 0V6z"></path>
-                    <path fill-rule="evenodd" d="M14.5 3a1 1 0 0 1-1 1H13v9a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V4h-.5a1 1 0 0 1-1-1V2a1 1 0 0 1 1-1H6a1 1 0 0 1 1-1h2a1 1 0 0 1 1 1h3.5a1 1 0 0 1 1 1v1zM4.118 4 4 4.059V13a1 1 0 0 0 1 1h6a1 1 0 0 0 1-1V4.059L11.882 4H4.118zM2.5 3V2h11v1h-11z"></path>
-                </svg>
-            </button>
+        // 방명록 내용은 손님이 입력한 값이므로 HTML 로 해석되지 않도록 textContent / 속성으로만 넣는다
+        const left = document.createElement('div');
+        left.className = 'left';
+
+        const profile = document.createElement('div');
+        profile.className = 'message_profile';
+        const image = document.createElement('img');
+        image.src = `/static/media/profile_image/${encodeURIComponent(messageData.profile_image)}`;
+        image.alt = '프로필 이미지';
+        profile.appendChild(image);
+
+        const info = document.createElement('div');
+        info.className = 'message_info';
+        const name = document.createElement('p');
+        name.className = 'name';
+        name.textContent = messageData.name;
+        const comment = document.createElement('p');
+        comment.className = 'p_message';
+        comment.textContent = messageData.comment;
+        info.append(name, comment);
+        left.append(profile, info);
+
+        const deleteButton = document.createElement('button');
+        deleteButton.type = 'button';
+        deleteButton.className = 'btn btn-link delete-message p-0';
+        deleteButton.style.color = '#dc3545';
+        deleteButton.innerHTML = `
+            <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" class="bi bi-trash" viewBox="0 0 16 16">
+                <path d="M5.5 5.5A.5.5 0 0 1 6 6v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5zm2.5 0a.5.5 0 0 1 .5.5v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5zm3 .5a.5.5 0 0 0-1 0v6a.5.5 0 0 0 1 0V6z"></path>
+                <path fill-rule="evenodd" d="M14.5 3a1 1 0 0 1-1 1H13v9a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V4h-.5a1 1 0 0 1-1-1V2a1 1 0 0 1 1-1H6a1 1 0 0 1 1-1h2a1 1 0 0 1 1 1h3.5a1 1 0 0 1 1 1v1zM4.118 4 4 4.059V13a1 1 0 0 0 1 1h6a1 1 0 0 0 1-1V4.059L11.882 4H4.118zM2.5 3V2h11v1h-11z"></path>
+            </svg>
         `;
 
+        messageElement.append(left, deleteButton);
+
         return messageElement;
     }
 
@@ -180,6 +252,9 @@ class DeleteManager {
 
     attachDeleteListeners() {
         document.querySelectorAll('.delete-message').forEach(button => {
+            // 페이지를 불러올 때마다 호출되므로 이미 등록된 버튼은 건너뛴다
+            if (button.dataset.listening) return;
+            button.dataset.listening = 'true';
             button.addEventListener('click', () => {
                 this.currentMessageId = button.closest('.message').dataset.messageId;
                 this.modal.show();
@@ -210,7 +285,7 @@ class DeleteManager {
                 this.modal.hide();
                 this.removeMessageElement();
             } else {
-                alert('비밀번호가 일치하지 않습니다.');
+                alert(response.status === 429 ? result.error : '비밀번호가 일치하지 않습니다.');
             }
         } catch (error) {
             console.error('Error:', error);
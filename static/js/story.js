@@ -118,8 +118,14 @@ function setupStoryClickHandler(container, stories) {
             
             // 현재 미디어 표시
             if (media.endsWith('.mp4')) {
-                storyContent.append(`<video playsinline class="img-fluid" style="pointer-events: none;">
-                    <source src="/static/media/story/${media}" type="video/mp4">
+                // media.py 로 만든 포스터/재생용 파일이 있으면 사용 (작은 화면은 저비트레이트 영상)
+                const sources = (typeof storyVideos !== 'undefined' && storyVideos[media]) || {};
+                const src = (sources.rendition && window.matchMedia('(max-width: 768px)').matches)
+                    ? sources.rendition
+                    : (sources.src || `/static/media/story/${media}`);
+                const poster = sources.poster ? ` poster="${sources.poster}"` : '';
+                storyContent.append(`<video playsinline class="img-fluid" style="pointer-events: none;"${poster}>
+                    <source src="${src}" type="video/mp4">
                 </video>`);
                 
                 const video = storyContent.find('video')[0];
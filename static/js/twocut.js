@@ -32,11 +32,20 @@ document.getElementById('fileInput').addEventListener('change', async (e) => {
         const formData = new FormData();
         formData.append('file', file);
 
+        // 서버 합성에 사용할 업로드 파일명 (실패하면 브라우저에서 합성)
+        const frame = currentFrame;
+        delete frame.dataset.filename;
+        delete frame.dataset.crop;
+
         try {
             const response = await fetch('/api/twocut', {
                 method: 'POST',
                 body: formData
             });
+            const result = await response.json();
+            if (result.success && result.filename) {
+                frame.dataset.filename = result.filename;
+            }
 
         } catch (error) {
             console.error('Error uploading image:', error);
@@ -72,6 +81,9 @@ document.getElementById('fileInput').addEventListener('change', async (e) => {
 
 // 크롭 완료
 document.getElementById('cropDone').addEventListener('click', async () => {
+    // 서버 합성용 크롭 영역 (원본 이미지 픽셀 기준)
+    currentFrame.dataset.crop = JSON.stringify(cropper.getData(true));
+
     const croppedCanvas = cropper.getCroppedCanvas();
     const photoImg = currentFrame.querySelector('.photo');
     photoImg.crossOrigin = "anonymous";
@@ -110,8 +122,55 @@ function closeCropModal() {
     document.getElementById('fileInput').value = '';
 }
 
+function downloadImage(href, extension) {
+    const link = document.createElement('a');
+    link.href = href;
+    const date = new Date().toISOString().slice(0,10);
+    link.download = `웨딩두컷_${date}.${extension}`;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+}
+
+// 서버에서 합성 (모든 칸의 사진이 업로드되었을 때만). 성공하면 true
+async function composeOnServer() {
+    const frames = [...document.querySelectorAll('.photo-frame')];
+    if (!frames.every(frame => frame.dataset.filename && frame.dataset.crop)) {
+        return false;
+    }
+
+    const photos = frames.map(frame => ({
+        filename: frame.dataset.filename,
+        frame: frame.dataset.frame,
+        crop: JSON.parse(frame.dataset.crop),
+    }));
+
+    try {
+        const response = await fetch('/api/twocut/compose', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ photos, format: 'png' })
+        });
+        const result = await response.json();
+        if (!result.success) {
+            console.error('Error composing image:', result.error);
+            return false;
+        }
+        downloadImage(result.url, 'png');
+        return true;
+    } catch (error) {
+        console.error('Error composing image:', error);
+        return false;
+    }
+}
+
 // 이미지 저장 기능
 document.getElementById('saveImage').addEventListener('click', async () => {
+    if (await composeOnServer()) {
+        return;
+    }
+
+    // 서버 합성을 쓸 수 없으면 브라우저에서 합성
     const photoBooth = document.querySelector('.photo-booth');
     const shutterButton = document.getElementById('saveImage');
     
@@ -126,14 +185,7 @@ document.getElementById('saveImage').addEventListener('click', async () => {
             scale: 2, // 해상도 조정
         });
 
-        const dataUrl = canvas.toDataURL('image/png');
-        const link = document.createElement('a');
-        link.href = dataUrl;
-        const date = new Date().toISOString().slice(0,10);
-        link.download = `웨딩두컷_${date}.png`;
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
+        downloadImage(canvas.toDataURL('image/png'), 'png');
 
     } catch (error) {
         // console.error('Error generating image:', error);
@@ -0,0 +1,155 @@
+from werkzeug.security import safe_join
+from logger import logger
+import gzip, hashlib, mimetypes, os, threading
+
+try:
+    import brotli
+except ImportError:  # brotli 가 없으면 .gz 만 만든다
+    brotli = None
+
+# 미리 압축해둘 텍스트 자산 확장자와 최소 크기 (작은 파일은 압축 이득보다 요청 헤더가 크다)
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.html')
+MIN_COMPRESS_SIZE = 1024
+
+# Accept-Encoding 우선순위 순서의 (인코딩, 압축 파일 접미사)
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def is_compressible(path):
+    return path.lower().endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+def build_precompressed(static_root):
+    """
+    static 폴더의 텍스트 자산마다 .gz (brotli 가 설치되어 있으면 .br 도) 파일을 생성
+
+    원본보다 새로운 압축 파일이 이미 있으면 건너뛴다.
+
+    Returns:
+        int: 새로 만든 압축 파일 수
+    """
+    built = 0
+    for directory, _, filenames in os.walk(static_root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if not is_compressible(path) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            source_mtime = os.path.getmtime(path)
+            data = None
+            for encoding, suffix in PRECOMPRESSED:
+                if encoding == 'br' and brotli is None:
+                    continue
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                compressed = brotli.compress(data, quality=11) if encoding == 'br' else \
+                    gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) >= len(data):
+                    continue  # 이미 압축된 내용이면 원본을 그대로 보낸다
+                tmp_path = f"{target}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(compressed)
+                os.replace(tmp_path, target)
+                built += 1
+    return built
+
+
+class StaticAssets:
+    """
+    static 파일의 URL 버전(fingerprint)과 응답 방식 결정
+
+    - url_for('static', ...) 에 ?v=<내용 해시> 를 붙여, 버전이 맞는 요청은 immutable 로 오래 캐시한다.
+      큰 파일(영상 등)은 내용 대신 수정 시각/크기로 버전을 만든다.
+    - 텍스트 자산은 build_precompressed 로 만들어둔 .br / .gz 가 있으면 그것을 보낸다.
+    - Range 요청(영상 탐색)은 원본 파일에 대해 send_file(conditional=True) 가 206 으로 응답한다.
+    """
+    def __init__(self, static_root, config):
+        self.static_root = os.path.abspath(static_root)
+        self.max_age = config['MAX_AGE']
+        self.hash_limit = config['HASH_LIMIT']
+        # 파일명 -> (수정 시각, 크기, 버전)
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def path(self, filename):
+        """static 폴더 밖을 가리키지 않는 실제 파일 경로 (없으면 None)"""
+        path = safe_join(self.static_root, filename)
+        return path if path and os.path.isfile(path) else None
+
+    def version(self, filename):
+        """파일 내용이 바뀌면 바뀌는 짧은 버전 문자열 (파일이 없으면 None)"""
+        path = self.path(filename)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        cached = self.versions.get(filename)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        if stat.st_size <= self.hash_limit:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b''):
+                    digest.update(chunk)
+        else:
+            digest = hashlib.sha256(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+        version = digest.hexdigest()[:12]
+        with self.lock:
+            self.versions[filename] = (stat.st_mtime_ns, stat.st_size, version)
+        return version
+
+    def url_defaults(self, endpoint, values):
+        """app.url_defaults 에 등록: static URL 에 버전 쿼리를 붙인다"""
+        if endpoint != 'static' or 'filename' not in values or 'v' in values:
+            return
+        version = self.version(values['filename'])
+        if version:
+            values['v'] = version
+
+    def resolve(self, filename, version, accept_encodings, ranged):
+        """
+        static 요청에 보낼 파일 결정
+
+        Args:
+            version (str): 요청 URL 의 v 쿼리 값
+            accept_encodings: werkzeug 의 Accept-Encoding 헤더 객체
+            ranged (bool): Range 요청 여부 (압축 파일은 Range 없이 보낼 때만 사용)
+
+        Returns:
+            tuple: (보낼 파일 경로, Content-Encoding 또는 None, MIME 타입, Cache-Control) 또는 None
+        """
+        path = self.path(filename)
+        if path is None:
+            return None
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        if version and version == self.version(filename):
+            cache_control = f"public, max-age={self.max_age}, immutable"
+        else:
+            # 버전 없는(또는 예전 버전) URL 은 매번 ETag 로 재검증
+            cache_control = 'no-cache'
+
+        if not ranged and is_compressible(path):
+            source_mtime = os.path.getmtime(path)
+            for encoding, suffix in PRECOMPRESSED:
+                compressed = path + suffix
+                if accept_encodings[encoding] and os.path.exists(compressed) \
+                        and os.path.getmtime(compressed) >= source_mtime:
+                    return compressed, encoding, mimetype, cache_control
+        return path, None, mimetype, cache_control
+
+
+if __name__ == '__main__':
+    # 배포 전에 static 텍스트 자산의 .gz / .br 를 미리 생성
+    #   python static_assets.py
+    from pathlib import Path
+    import time
+
+    started = time.perf_counter()
+    count = build_precompressed(Path(__file__).resolve().parent / 'static')
+    if brotli is None:
+        logger.warning("⚠️ brotli is not installed - only .gz files were built")
+    logger.info(f"✅ Built {count} precompressed file(s) in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,42 @@
+from pathlib import Path
+import os, sys, tempfile, toml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# 테스트가 저장소에 logs/, uploads/, static/media/ 를 만들지 않도록 로그 파일과 그 경로들을 임시 폴더로 바꾸고
+# Firestore 는 인메모리 클라이언트를 쓰는 설정으로 logger 와 app 을 불러온다
+_workdir = tempfile.mkdtemp(prefix='weddinggram_test_')
+_config = toml.load(ROOT / 'config.toml')
+_config['LOGGING'].update({'FILE': os.path.join(_workdir, 'app.log'), 'CONSOLE': False})
+_config['FIRESTORE']['BACKEND'] = 'fake'
+
+
+def _redirect_paths(section):
+    for key, value in section.items():
+        if isinstance(value, dict):
+            _redirect_paths(value)
+        elif isinstance(value, str) and value.startswith(('./uploads/', './static/media/')):
+            section[key] = os.path.join(_workdir, value[2:])
+
+
+_redirect_paths(_config)
+with open(os.path.join(_workdir, 'config.toml'), 'w') as f:
+    toml.dump(_config, f)
+os.environ.setdefault('WEDDINGGRAM_CONFIG', os.path.join(_workdir, 'config.toml'))
+
+
+import pytest
+from firestore_fake import FakeFirestoreClient
+from utils import CacheUtils, FirebaseUtils
+
+
+@pytest.fixture
+def db():
+    return FakeFirestoreClient()
+
+
+@pytest.fixture
+def firebase(db):
+    """인메모리 Firestore 를 주입한 FirebaseUtils (캐시 공유 없음)"""
+    return FirebaseUtils(CacheUtils({'EXPIRATION': 600}), None, db=db)
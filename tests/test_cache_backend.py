@@ -0,0 +1,57 @@
+"""SQLiteCacheBackend: 프로세스에서 처음 쓸 때 연결을 여는 공유 캐시"""
+import os, time
+import pytest
+from cache_backend import SQLiteCacheBackend
+
+
+@pytest.fixture
+def make_backend(tmp_path):
+    backends = []
+
+    def make():
+        backend = SQLiteCacheBackend({
+            'SHARED_PATH': str(tmp_path / 'shared.sqlite3'), 'SYNC_INTERVAL': 0.05, 'CHANGE_RETENTION': 60,
+        })
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        backend.close()
+
+
+def test_load_on_fresh_backend(make_backend):
+    backend = make_backend()
+    assert backend.load('wedding_post') is None
+    assert backend.pid == os.getpid()
+
+
+def test_invalidate_and_publish_on_fresh_backend(make_backend):
+    make_backend().invalidate('wedding_post')
+    make_backend().publish([('wedding_post', 'increment', 'p1', {'field': 'like', 'delta': 1})])
+
+
+def test_store_then_load_from_another_backend(make_backend):
+    fetched_at = time.time()
+    make_backend().store('wedding_post', [{'id': 'p1', 'like': 3}], fetched_at)
+    assert make_backend().load('wedding_post') == (fetched_at, [{'id': 'p1', 'like': 3}])
+
+
+def test_invalidate_hides_earlier_reads(make_backend):
+    writer, reader = make_backend(), make_backend()
+    writer.store('wedding_post', [{'id': 'p1'}], time.time() - 1)
+    writer.invalidate('wedding_post')
+    assert reader.load('wedding_post') is None
+
+
+def test_changes_reach_subscribers(make_backend):
+    received = []
+    sender, receiver = make_backend(), make_backend()
+    receiver.subscribe(received.extend)
+    receiver.start()
+    change = ('wedding_post', 'increment', 'p1', {'field': 'like', 'delta': 1})
+    sender.publish([change])
+    deadline = time.monotonic() + 2
+    while not received and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert received == [change]
@@ -0,0 +1,135 @@
+"""CacheUtils 의 컬렉션별 만료 (monotonic 시계, 지터, 미리 갱신)"""
+import time
+import pytest
+import utils
+from utils import CacheUtils
+
+DAY = 24 * 60 * 60
+
+
+class FakeClock:
+    """utils 모듈이 보는 time 대신 사용하는 시계 (monotonic / 벽시계를 따로 움직인다)"""
+    def __init__(self):
+        self.mono = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.mono
+
+    def time(self):
+        return self.wall
+
+    def advance(self, seconds):
+        self.mono += seconds
+        self.wall += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(utils, 'time', clock)
+    return clock
+
+
+def make_cache(**config):
+    return CacheUtils({'EXPIRATION': 600, 'JITTER': 0.0, 'REFRESH_AHEAD': 0.0, **config})
+
+
+def load(cache, name='wedding_post', fetched_at=None):
+    cache.set_cache(name, [{'id': 'a'}], fetched_at)
+
+
+def test_valid_until_ttl(clock):
+    cache = make_cache()
+    load(cache)
+    clock.advance(599)
+    assert cache.is_cache_valid('wedding_post')
+    clock.advance(2)
+    assert not cache.is_cache_valid('wedding_post')
+
+
+def test_entry_older_than_a_day_expires(clock):
+    cache = make_cache()
+    load(cache)
+    clock.advance(DAY + 1)
+    assert not cache.is_cache_valid('wedding_post')
+    # 하루 넘게 전에 읽은 결과(스냅샷 등)를 넣어도 바로 만료 상태
+    load(cache, fetched_at=clock.wall - DAY - 60)
+    assert not cache.is_cache_valid('wedding_post')
+
+
+def test_fetched_at_counts_toward_ttl(clock):
+    cache = make_cache()
+    load(cache, fetched_at=clock.wall - 500)
+    clock.advance(99)
+    assert cache.is_cache_valid('wedding_post')
+    clock.advance(2)
+    assert not cache.is_cache_valid('wedding_post')
+
+
+@pytest.mark.parametrize('jump', [-DAY, -3600, 3600, DAY])
+def test_wall_clock_jump_does_not_change_expiry(clock, jump):
+    cache = make_cache()
+    load(cache)
+    clock.wall += jump
+    clock.mono += 300
+    assert cache.is_cache_valid('wedding_post')
+    clock.mono += 301
+    assert not cache.is_cache_valid('wedding_post')
+
+
+def test_per_collection_ttl(clock):
+    cache = make_cache(TTL={'wedding_guestbook': 60, 'wedding_story': 3600})
+    for name in ('wedding_post', 'wedding_guestbook', 'wedding_story'):
+        load(cache, name)
+    assert cache.ttl('wedding_post') == 600
+
+    clock.advance(61)
+    assert not cache.is_cache_valid('wedding_guestbook')
+    assert cache.is_cache_valid('wedding_post')
+    clock.advance(540)
+    assert not cache.is_cache_valid('wedding_post')
+    assert cache.is_cache_valid('wedding_story')
+    clock.advance(3000)
+    assert not cache.is_cache_valid('wedding_story')
+
+
+def test_jitter_stays_within_bounds(clock):
+    cache = make_cache(JITTER=0.1)
+    lifetimes = []
+    for _ in range(500):
+        load(cache)
+        lifetimes.append(cache.cache_data['wedding_post'].expires_at - clock.mono)
+    assert all(540 <= lifetime <= 660 for lifetime in lifetimes)
+    # 모든 엔트리가 같은 순간에 만료되지 않도록 실제로 퍼져 있어야 한다
+    assert max(lifetimes) - min(lifetimes) > 60
+
+
+def test_refresh_ahead_claimed_once(clock):
+    cache = make_cache(REFRESH_AHEAD=0.2)
+    load(cache)
+    clock.advance(470)
+    assert not cache.claim_refresh_ahead('wedding_post')
+    clock.advance(20)
+    assert cache.claim_refresh_ahead('wedding_post')
+    assert not cache.claim_refresh_ahead('wedding_post')
+    assert cache.is_cache_valid('wedding_post')
+
+    # 다시 읽어 오면 다음 구간에서 한 번 더 맡을 수 있다
+    load(cache)
+    clock.advance(490)
+    assert cache.claim_refresh_ahead('wedding_post')
+    assert not cache.claim_refresh_ahead('wedding_post')
+
+
+def test_refresh_ahead_not_claimed_while_refreshing(clock):
+    cache = make_cache(REFRESH_AHEAD=0.2)
+    load(cache)
+    clock.advance(500)
+    assert cache.begin_refresh('wedding_post')
+    assert not cache.claim_refresh_ahead('wedding_post')
+    cache.end_refresh('wedding_post')
+    assert cache.claim_refresh_ahead('wedding_post')
@@ -0,0 +1,57 @@
+"""DELETE /api/messages/<id>: IP 별 삭제 시도 제한과 신뢰하는 프록시 수에 따른 클라이언트 IP"""
+import pytest
+from werkzeug.middleware.proxy_fix import ProxyFix
+import app as wsgi
+from utils import RateLimiter
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(wsgi, 'DeleteLimiter', RateLimiter(2, 60))
+    return wsgi.app.test_client()
+
+
+def delete(client, peer, forwarded_for=None):
+    headers = {'X-Forwarded-For': forwarded_for} if forwarded_for else {}
+    return client.delete('/api/messages/missing', json={'password': '1234'},
+                         headers=headers, environ_base={'REMOTE_ADDR': peer})
+
+
+def test_limit_returns_429_with_retry_after(client):
+    assert delete(client, '10.0.0.1').status_code == 404
+    assert delete(client, '10.0.0.1').status_code == 404
+    response = delete(client, '10.0.0.1')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '30'
+    assert response.get_json()['success'] is False
+    assert delete(client, '10.0.0.2').status_code == 404
+
+
+def test_spoofed_forwarded_for_is_ignored(client):
+    # TRUSTED_PROXIES = 0: 클라이언트가 보낸 X-Forwarded-For 로 제한을 피할 수 없다
+    assert wsgi.trusted_proxies == 0
+    assert delete(client, '10.0.0.1', '203.0.113.1').status_code == 404
+    assert delete(client, '10.0.0.1', '203.0.113.2').status_code == 404
+    assert delete(client, '10.0.0.1', '203.0.113.3').status_code == 429
+
+
+def test_trusted_proxy_uses_forwarded_client(client, monkeypatch):
+    # TRUSTED_PROXIES = 1 과 같은 구성: 프록시가 덧붙인 마지막 주소만 믿는다
+    monkeypatch.setattr(wsgi.app, 'wsgi_app', ProxyFix(wsgi.app.wsgi_app, x_for=1, x_proto=1, x_host=1))
+    assert delete(client, '10.0.0.1', '1.1.1.1, 203.0.113.7').status_code == 404
+    assert delete(client, '10.0.0.1', '2.2.2.2, 203.0.113.7').status_code == 404
+    assert delete(client, '10.0.0.1', '3.3.3.3, 203.0.113.7').status_code == 429
+    # 같은 프록시 뒤의 다른 클라이언트는 따로 센다
+    assert delete(client, '10.0.0.1', '203.0.113.8').status_code == 404
+
+
+def test_rate_limiter_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('utils.time.monotonic', lambda: now[0])
+    limiter = RateLimiter(2, 60)
+    assert limiter.hit('a') == (True, 0)
+    assert limiter.hit('a') == (True, 0)
+    assert limiter.hit('a') == (False, 30)
+    now[0] += 30
+    assert limiter.hit('a') == (True, 0)
+    assert limiter.hit('a')[0] is False
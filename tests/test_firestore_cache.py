@@ -0,0 +1,116 @@
+"""CacheUtils / FirebaseUtils: 스냅샷 리스너 동기화, 미반영 쓰기(pending)와 증감분(increments) 유지"""
+import pytest
+
+
+@pytest.fixture
+def guestbook(db):
+    for doc_id, name in (('m1', '하객1'), ('m2', '하객2')):
+        db.collection('guestbook').document(doc_id).set({'name': name})
+    return db.collection('guestbook')
+
+
+def names(firebase):
+    return {doc['id']: doc['name'] for doc in firebase.cachestore.get_cache('guestbook')}
+
+
+def test_listener_applies_changes(db, firebase, guestbook):
+    firebase.start_listeners(['guestbook'])
+    assert firebase.cachestore.is_listening('guestbook')
+    assert names(firebase) == {'m1': '하객1', 'm2': '하객2'}
+
+    guestbook.document('m3').set({'name': '하객3'})
+    guestbook.document('m1').update({'name': '신랑 친구'})
+    guestbook.document('m2').delete()
+    assert names(firebase) == {'m1': '신랑 친구', 'm3': '하객3'}
+
+    # 리스너가 맞춰 주는 동안에는 Firestore 를 다시 읽지 않는다
+    db.take_calls()
+    assert len(firebase.get_collection_data('guestbook')) == 2
+    assert not db.take_calls()
+
+
+def test_failed_snapshot_stops_listening(firebase, guestbook, monkeypatch):
+    firebase.start_listeners(['guestbook'])
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('bad change')
+
+    monkeypatch.setattr(firebase.cachestore, 'apply_snapshot_changes', broken)
+    guestbook.document('m3').set({'name': '하객3'})
+    assert not firebase.cachestore.is_listening('guestbook')
+    assert 'guestbook' not in firebase.watches
+
+
+def test_pending_write_confirmed_by_listener(firebase, guestbook):
+    cache = firebase.cachestore
+    firebase.start_listeners(['guestbook'])
+    cache.put_pending('guestbook', 'm3', 1, {'id': 'm3', 'name': '하객3'})
+    assert names(firebase)['m3'] == '하객3'
+    assert cache.has_overlay('guestbook')
+
+    guestbook.document('m3').set({'name': '하객3'})
+    assert not cache.has_overlay('guestbook')
+    assert names(firebase)['m3'] == '하객3'
+
+
+def test_pending_delete_wins_over_older_snapshot(firebase, guestbook):
+    cache = firebase.cachestore
+    firebase.start_listeners(['guestbook'])
+    cache.put_pending('guestbook', 'm1', 1, None)
+
+    # 삭제가 반영되기 전에 도착한 수정은 삭제를 되살리지 않는다
+    guestbook.document('m1').update({'name': '신랑 친구'})
+    assert 'm1' not in names(firebase)
+    assert cache.has_overlay('guestbook')
+
+    guestbook.document('m1').delete()
+    assert 'm1' not in names(firebase)
+    assert not cache.has_overlay('guestbook')
+
+
+def test_pending_write_survives_reload_until_cleared(firebase):
+    cache = firebase.cachestore
+    stored = [{'id': 'm1', 'name': '하객1'}]
+    cache.set_cache('guestbook', stored)
+    cache.put_pending('guestbook', 'm2', 1, {'id': 'm2', 'name': '하객2'})
+    cache.put_pending('guestbook', 'm1', 2, None)
+
+    cache.set_cache('guestbook', stored)
+    assert names(firebase) == {'m2': '하객2'}
+    assert cache.pending_count_delta('guestbook') == 0
+    # 저장용 내보내기에는 반영된 문서만 (재시작하면 방명록 로그가 미반영 쓰기를 다시 적용)
+    assert all(doc['id'] not in ('m1', 'm2') for doc in cache.export_cache('guestbook')[2])
+
+    # 순번이 다른 확인은 더 새 쓰기를 지우지 않는다
+    cache.clear_pending('guestbook', {'m2': 1, 'm1': 1})
+    cache.set_cache('guestbook', stored)
+    assert names(firebase) == {}
+
+    cache.clear_pending('guestbook', {'m1': 2})
+    assert not cache.has_overlay('guestbook')
+    cache.set_cache('guestbook', stored)
+    assert names(firebase) == {'m1': '하객1'}
+
+
+def test_increments_survive_reload_until_cleared(firebase):
+    cache = firebase.cachestore
+    stored = [{'id': 'p1', 'like': 2}]
+    cache.set_cache('wedding_post', stored)
+    cache.update_like_in_cache('wedding_post', 'p1', 5)
+
+    cache.set_cache('wedding_post', stored)
+    assert cache.get_document('wedding_post', 'p1')['like'] == 5
+    assert cache.export_cache('wedding_post')[2] == ({'id': 'p1', 'like': 2},)
+
+    cache.clear_increments('wedding_post', 'like', {'p1': 3})
+    assert not cache.has_overlay('wedding_post')
+    cache.set_cache('wedding_post', [{'id': 'p1', 'like': 5}])
+    assert cache.get_document('wedding_post', 'p1')['like'] == 5
+
+
+def test_increments_do_not_go_negative(firebase):
+    cache = firebase.cachestore
+    cache.set_cache('wedding_post', [{'id': 'p1', 'like': 1}])
+    cache.update_like_in_cache('wedding_post', 'p1', 0)
+    cache.set_cache('wedding_post', [{'id': 'p1', 'like': 0}])
+    assert cache.get_document('wedding_post', 'p1')['like'] == 0
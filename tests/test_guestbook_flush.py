@@ -0,0 +1,103 @@
+"""MessageUtils: 방명록 저장/삭제를 캐시에 먼저 반영하고 WriteBatch 로 모아서 Firestore 에 쓰기"""
+import pytest
+from utils import MessageUtils
+
+COLLECTION = MessageUtils.COLLECTION
+
+
+@pytest.fixture
+def guestbook(firebase, tmp_path):
+    guestbook = MessageUtils(firebase, {
+        'FLUSH_INTERVAL': 3600, 'BATCH_SIZE': 500, 'LOG': str(tmp_path / 'guestbook.log'),
+        'PASSWORD_HASH': 'pbkdf2:sha256:1000',
+    })
+    yield guestbook
+    guestbook.close()
+
+
+def on_commit(monkeypatch, db, action):
+    """다음 WriteBatch 들이 커밋되기 직전에 action 을 실행하도록 바꾼다"""
+    make_batch = db.batch
+
+    def batch():
+        batch = make_batch()
+        commit = batch.commit
+
+        def hooked():
+            action()
+            return commit()
+
+        batch.commit = hooked
+        return batch
+
+    monkeypatch.setattr(db, 'batch', batch)
+
+
+def stored(db, message_id):
+    return db.collection(COLLECTION).document(message_id).get().to_dict()
+
+
+def test_pending_set_confirmed_by_listener(db, firebase, guestbook):
+    firebase.start_listeners([COLLECTION])
+    ok, message = guestbook.save_message('하객', '축하해요', '1234')
+    assert ok
+    cached = firebase.cachestore.get_document(COLLECTION, message['id'])
+    assert cached['comment'] == '축하해요'
+    assert cached['password'] != '1234'
+    assert stored(db, message['id']) is None
+
+    assert guestbook.flush_messages() == 1
+    assert stored(db, message['id'])['comment'] == '축하해요'
+    assert not firebase.cachestore.has_overlay(COLLECTION)
+    assert not guestbook.pending
+    assert guestbook.flush_messages() == 0
+
+
+def test_delete_before_flush_cancels_set(db, firebase, guestbook):
+    ok, message = guestbook.save_message('하객', '축하해요', '1234')
+    assert guestbook.delete_message(message['id'], '틀림') == (False, '비밀번호가 일치하지 않습니다.')
+    assert guestbook.delete_message(message['id'], '1234') == (True, None)
+    assert firebase.cachestore.get_document(COLLECTION, message['id']) is None
+
+    db.take_calls()
+    assert guestbook.flush_messages() == 0
+    assert not db.take_calls()
+
+
+def test_delete_while_set_in_flight(db, firebase, guestbook, monkeypatch):
+    firebase.start_listeners([COLLECTION])
+    ok, message = guestbook.save_message('하객', '축하해요', '1234')
+    deleted = []
+    # 커밋 중인 저장은 취소할 수 없으니 삭제 작업이 뒤에 쌓여야 한다
+    on_commit(monkeypatch, db, lambda: deleted.append(guestbook.delete_message(message['id'], '1234')))
+
+    assert guestbook.flush_messages() == 1
+    assert deleted == [(True, None)]
+    assert stored(db, message['id']) is not None
+    # 리스너가 확인한 저장이 뒤에 쌓인 삭제를 되살리지 않는다
+    assert firebase.cachestore.get_document(COLLECTION, message['id']) is None
+    assert [op['op'] for op in guestbook.pending.values()] == ['delete']
+
+    monkeypatch.undo()
+    assert guestbook.flush_messages() == 1
+    assert stored(db, message['id']) is None
+    assert not firebase.cachestore.has_overlay(COLLECTION)
+
+
+def test_failed_batch_is_requeued(db, firebase, guestbook, monkeypatch):
+    ok, message = guestbook.save_message('하객', '축하해요', '1234')
+
+    def fail():
+        raise RuntimeError('deadline exceeded')
+
+    on_commit(monkeypatch, db, fail)
+    assert guestbook.flush_messages() == 0
+    assert stored(db, message['id']) is None
+    assert [op['id'] for op in guestbook.pending.values()] == [message['id']]
+    assert not guestbook.inflight
+    assert firebase.cachestore.get_document(COLLECTION, message['id'])['comment'] == '축하해요'
+
+    monkeypatch.undo()
+    assert guestbook.flush_messages() == 1
+    assert stored(db, message['id'])['comment'] == '축하해요'
+    assert not guestbook.pending
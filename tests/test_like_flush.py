@@ -0,0 +1,54 @@
+"""PostUtils: 좋아요 증감분을 모아 Firestore 에 반영 (firestore.Increment 배치)"""
+import pytest
+from utils import PostUtils
+
+
+@pytest.fixture
+def posts(db, firebase):
+    for post_id in ('a', 'b'):
+        db.collection('wedding_post').document(post_id).set({'order': 1, 'like': 0})
+    firebase.get_collection_data('wedding_post')
+    posts = PostUtils(firebase, {'FLUSH_INTERVAL': 3600, 'FLUSH_THRESHOLD': 1000})
+    yield posts
+    posts.close()
+
+
+def likes(db, post_id):
+    return db.collection('wedding_post').document(post_id).get().to_dict()['like']
+
+
+def test_flush_applies_deltas(db, firebase, posts):
+    assert posts.update_like_count('a', True) == (True, 1)
+    assert posts.update_like_count('b', True) == (True, 1)
+    assert posts.update_like_count('b', True) == (True, 2)
+    assert posts.flush_likes() == 2
+    assert likes(db, 'a') == 1 and likes(db, 'b') == 2
+    assert not firebase.cachestore.has_overlay('wedding_post')
+    assert posts.flush_likes() == 0
+
+
+def test_deleted_post_does_not_block_others(db, firebase, posts):
+    posts.update_like_count('a', True)
+    posts.update_like_count('b', True)
+    db.collection('wedding_post').document('a').delete()
+
+    assert posts.flush_likes() == 2
+    assert likes(db, 'b') == 1
+    # 삭제된 게시물의 증감분은 버리고 다시 시도하지 않는다
+    assert posts.pending_likes == {}
+    assert not firebase.cachestore.has_overlay('wedding_post')
+
+
+def test_failed_flush_is_retried(db, firebase, posts, monkeypatch):
+    posts.update_like_count('a', True)
+    posts.update_like_count('b', True)
+    get_document_ref = firebase.get_document_ref
+    monkeypatch.setattr(firebase, 'get_document_ref', lambda *args: (None, '연결 실패'))
+
+    assert posts.flush_likes() == 0
+    assert posts.pending_likes == {'a': 1, 'b': 1}
+    assert firebase.cachestore.get_document('wedding_post', 'a')['like'] == 1
+
+    monkeypatch.setattr(firebase, 'get_document_ref', get_document_ref)
+    assert posts.flush_likes() == 2
+    assert likes(db, 'a') == 1 and likes(db, 'b') == 1
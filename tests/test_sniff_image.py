@@ -0,0 +1,67 @@
+"""sniff_image / FileUtils: 디코딩 없이 헤더에서 이미지 형식과 픽셀 크기 판별"""
+import io, struct
+import pytest
+from werkzeug.datastructures import FileStorage
+from utils import FileUtils, sniff_image
+
+
+def segment(marker, payload):
+    return b'\xff' + bytes([marker]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def jpeg(width, height, app_segments=0):
+    """APP1 세그먼트(각 약 64KB)를 SOF 앞에 붙인 최소 JPEG"""
+    body = b'\xff\xd8'
+    body += segment(0xE0, b'JFIF\x00' + bytes(9))
+    for _ in range(app_segments):
+        body += segment(0xE1, b'Exif\x00\x00' + bytes(65527))
+    body += segment(0xC0, b'\x08' + struct.pack('>HH', height, width) + b'\x01\x01\x11\x00')
+    body += segment(0xDA, b'\x01\x01\x00\x00\x3f\x00') + b'\x00' * 16 + b'\xff\xd9'
+    return body
+
+
+@pytest.fixture
+def files(tmp_path):
+    return FileUtils({
+        'PATHS': {'TMP': str(tmp_path / 'tmp')},
+        'MAX_SIZE': {'PROFILE': 1024 * 1024},
+        'ALLOWED_EXTENSIONS': {'IMAGE': ['jpg', 'jpeg', 'png', 'gif']},
+        'ALLOWED_TYPES': {'IMAGE': ['image/jpeg', 'image/png', 'image/gif']},
+        'MAX_PIXELS': 50_000_000,
+    })
+
+
+def upload(data, filename='photo.jpg'):
+    return FileStorage(stream=io.BytesIO(data), filename=filename, content_type='image/jpeg')
+
+
+def test_small_jpeg_from_head():
+    assert sniff_image(jpeg(640, 480)) == ('image/jpeg', 640, 480)
+
+
+def test_truncated_head_has_no_dimensions():
+    assert sniff_image(jpeg(640, 480, app_segments=1)[:4096]) == ('image/jpeg', None, None)
+
+
+def test_png_and_gif():
+    png = b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', 32, 16)
+    assert sniff_image(png) == ('image/png', 32, 16)
+    assert sniff_image(b'GIF89a' + struct.pack('<HH', 8, 4)) == ('image/gif', 8, 4)
+
+
+def test_large_exif_jpeg_is_read_past_64kb(files):
+    data = jpeg(4000, 3000, app_segments=3)
+    assert len(data) > 3 * 65536
+    file = upload(data)
+    assert files._sniff_file(file) == ('image/jpeg', 4000, 3000)
+    assert file.stream.tell() == 0
+    assert files.validate_file(file, 'IMAGE', 'PROFILE') == (True, file)
+
+
+def test_jpeg_without_sof_is_rejected(files):
+    data = b'\xff\xd8' + segment(0xE1, bytes(65527)) + b'\xff\xd9'
+    assert files.validate_file(upload(data), 'IMAGE', 'PROFILE') == (False, '손상된 이미지 파일입니다.')
+
+
+def test_oversized_frame_is_rejected(files):
+    assert files.validate_file(upload(jpeg(60000, 60000)), 'IMAGE', 'PROFILE') == (False, '이미지 해상도가 너무 큽니다.')
@@ -0,0 +1,244 @@
+from concurrent.futures import ProcessPoolExecutor
+from flask import url_for
+from logger import logger
+import hashlib, json, os, tempfile, threading
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+except ImportError:  # Pillow 가 없으면 서버 합성 없이 브라우저 합성만 사용
+    Image = None
+
+# 출력 포맷 -> (Pillow 포맷, 확장자)
+OUTPUT_FORMATS = {
+    'png': ('PNG', 'png'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+# 워커 프로세스별 디코딩된 프레임 캐시: 경로 -> (수정 시각, RGB 이미지, 알파 마스크)
+_frame_cache = {}
+_font_cache = {}
+
+
+def load_frame(path):
+    """프레임 PNG 를 디코딩해 RGB 와 알파 마스크로 나눠 캐시 (파일이 바뀌면 다시 읽는다)"""
+    mtime = os.path.getmtime(path)
+    cached = _frame_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with Image.open(path) as frame:
+            frame = frame.convert('RGBA')
+            frame.load()
+        cached = (mtime, frame.convert('RGB'), frame.getchannel('A'))
+        _frame_cache[path] = cached
+    return cached[1], cached[2]
+
+
+def load_font(path, size):
+    key = (path, size)
+    if key not in _font_cache:
+        _font_cache[key] = ImageFont.truetype(path, size)
+    return _font_cache[key]
+
+
+def warm_worker(frame_paths):
+    """워커 프로세스 시작 시 프레임을 미리 디코딩 (ProcessPoolExecutor initializer)"""
+    for path in frame_paths:
+        load_frame(path)
+
+
+def clip_box(crop, size):
+    """(x, y, 너비, 높이) 크롭 영역을 이미지 안으로 자른 (left, top, right, bottom)"""
+    x, y, crop_width, crop_height = crop
+    left, top = max(0, x), max(0, y)
+    right, bottom = min(size[0], x + crop_width), min(size[1], y + crop_height)
+    if right <= left or bottom <= top:
+        raise ValueError('crop area is outside of the image')
+    return left, top, right, bottom
+
+
+def compose_twocut(cells, output_path, layout, output_format, quality):
+    """
+    잘라낸 사진을 프레임에 합성해 한 장의 웨딩두컷 이미지를 만든다 (프로세스 풀에서 실행)
+
+    Args:
+        cells (list): [(원본 경로, (x, y, 너비, 높이), 프레임 경로), ...] 위에서부터 순서대로
+        output_path (str): 저장할 경로
+        layout (dict): PADDING, GAP, BACKGROUND, FOOTER_HEIGHT, FOOTER, FONT, FONT_SIZES, TEXT_COLORS
+    """
+    frames = [load_frame(frame_path) for _, _, frame_path in cells]
+    cell_width = max(frame.width for frame, _ in frames)
+    padding, gap = layout['PADDING'], layout['GAP']
+    width = cell_width + padding * 2
+    height = padding * 2 + sum(frame.height for frame, _ in frames) + gap * (len(frames) - 1) + layout['FOOTER_HEIGHT']
+    sheet = Image.new('RGB', (width, height), layout['BACKGROUND'])
+
+    top = padding
+    for (source_path, crop, _), (frame, mask) in zip(cells, frames):
+        with Image.open(source_path) as source:
+            # 크롭 좌표는 EXIF 회전을 적용한 원본 기준 (Cropper.getData)
+            rotated = source.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+            oriented_size = source.size[::-1] if rotated else source.size
+            box = clip_box(crop, oriented_size)
+            # JPEG 는 크롭 영역이 프레임 크기 이상으로 남는 만큼만 줄여서 디코딩
+            ratio = min(1.0, max(frame.width / max(1, box[2] - box[0]), frame.height / max(1, box[3] - box[1])))
+            requested = (round(oriented_size[0] * ratio), round(oriented_size[1] * ratio))
+            source.draft('RGB', requested[::-1] if rotated else requested)
+            photo = ImageOps.exif_transpose(source).convert('RGB')
+
+        scale = photo.width / oriented_size[0]
+        photo = photo.resize((frame.width, frame.height), Image.LANCZOS, box=tuple(value * scale for value in box))
+        # 프레임의 불투명한 부분만 사진 위에 덮는다
+        photo.paste(frame, (0, 0), mask)
+        sheet.paste(photo, (padding + (cell_width - frame.width) // 2, top))
+        top += frame.height + gap
+
+    font_path = layout.get('FONT')
+    if font_path and os.path.exists(font_path) and layout['FOOTER_HEIGHT']:
+        draw = ImageDraw.Draw(sheet)
+        y = top - gap + padding // 2
+        for text, size, color in zip(layout['FOOTER'], layout['FONT_SIZES'], layout['TEXT_COLORS']):
+            font = load_font(font_path, size)
+            draw.text((width // 2, y), text, font=font, fill=color, anchor='ma')
+            y += int(size * 1.5)
+
+    pil_format, _ = OUTPUT_FORMATS[output_format]
+    directory = os.path.dirname(output_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.twocut_')
+    with os.fdopen(fd, 'wb') as f:
+        if pil_format == 'JPEG':
+            sheet.save(f, pil_format, quality=quality, optimize=True)
+        else:
+            sheet.save(f, pil_format, compress_level=3)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+class TwocutCompositor:
+    """
+    웨딩두컷 서버 합성기
+
+    - 합성은 프로세스 풀에서 실행하고, 워커마다 디코딩된 프레임과 알파 마스크를 메모리에 유지한다.
+    - 결과 파일 이름은 입력(원본, 크롭 영역, 프레임, 포맷)의 해시라서 같은 요청은 다시 합성하지 않는다.
+    """
+    def __init__(self, config, source_dir, static_root='./static'):
+        self.source_dir = source_dir
+        self.output_dir = config['PATH']
+        self.frames = {key: os.path.join(static_root, path) for key, path in config['FRAMES'].items()}
+        self.layout = config['LAYOUT']
+        self.default_format = config['FORMAT']
+        self.quality = config['QUALITY']
+        self.timeout = config['TIMEOUT']
+        self.workers = config['WORKERS'] or os.cpu_count()
+        self.url_prefix = os.path.relpath(self.output_dir, static_root).replace(os.sep, '/')
+        self.lock = threading.Lock()
+        self.executor = None
+
+        if Image is None:
+            logger.warning("⚠️ Pillow is not installed - server-side two-cut compositing is disabled")
+
+    def _executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=warm_worker, initargs=(list(self.frames.values()),)
+                )
+            return self.executor
+
+    def parse_cells(self, photos):
+        """
+        요청의 사진 목록을 합성 입력으로 변환
+
+        Args:
+            photos (list): [{'filename': 업로드된 파일명, 'frame': 프레임 키, 'crop': {x, y, width, height}}, ...]
+
+        Returns:
+            tuple: (성공 여부, 성공 시 [(원본 경로, 크롭 영역, 프레임 키), ...] / 실패 시 에러 메시지)
+        """
+        if not isinstance(photos, list) or not 1 <= len(photos) <= len(self.frames):
+            return False, f'사진은 1장 이상 {len(self.frames)}장 이하여야 합니다.'
+
+        cells = []
+        for photo in photos:
+            filename = str(photo.get('filename', ''))
+            # 업로드 폴더 밖의 파일은 읽지 않는다
+            if not filename or os.path.basename(filename) != filename:
+                return False, '잘못된 파일 이름입니다.'
+            source_path = os.path.join(self.source_dir, filename)
+            if not os.path.isfile(source_path):
+                return False, '업로드된 사진을 찾을 수 없습니다.'
+
+            frame_key = str(photo.get('frame', ''))
+            if frame_key not in self.frames:
+                return False, '알 수 없는 프레임입니다.'
+
+            try:
+                crop = photo['crop']
+                crop = tuple(round(float(crop[key])) for key in ('x', 'y', 'width', 'height'))
+            except (KeyError, TypeError, ValueError):
+                return False, '크롭 영역이 올바르지 않습니다.'
+            if crop[2] <= 0 or crop[3] <= 0:
+                return False, '크롭 영역이 올바르지 않습니다.'
+
+            cells.append((source_path, crop, frame_key))
+        return True, cells
+
+    def output_name(self, cells, output_format):
+        """입력과 프레임/레이아웃 설정이 같으면 같은 파일 이름"""
+        key = json.dumps({
+            'cells': [
+                [os.path.basename(source_path), crop, frame_key, os.path.getmtime(self.frames[frame_key])]
+                for source_path, crop, frame_key in cells
+            ],
+            'format': output_format,
+            'quality': self.quality,
+            'layout': self.layout,
+        }, sort_keys=True, ensure_ascii=False)
+        return f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.{OUTPUT_FORMATS[output_format][1]}"
+
+    def compose(self, photos, output_format=None):
+        """
+        웨딩두컷 합성 (같은 입력으로 이미 만든 결과가 있으면 그대로 사용)
+
+        Returns:
+            tuple: (성공 여부, 성공 시 결과 파일명 / 실패 시 에러 메시지)
+        """
+        if Image is None:
+            return False, '서버 합성을 사용할 수 없습니다.'
+
+        output_format = output_format or self.default_format
+        if output_format not in OUTPUT_FORMATS:
+            return False, '지원하지 않는 이미지 형식입니다.'
+
+        success, cells = self.parse_cells(photos)
+        if not success:
+            return False, cells
+
+        filename = self.output_name(cells, output_format)
+        output_path = os.path.join(self.output_dir, filename)
+        if os.path.exists(output_path):
+            logger.debug(f"✅ Two-cut cache hit: {filename}")
+            return True, filename
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        jobs = [(source_path, crop, self.frames[frame_key]) for source_path, crop, frame_key in cells]
+        try:
+            self._executor().submit(
+                compose_twocut, jobs, output_path, self.layout, output_format, self.quality
+            ).result(timeout=self.timeout)
+        except ValueError as e:
+            logger.warning(f"⚠️ Invalid two-cut request: {e}")
+            return False, '크롭 영역이 올바르지 않습니다.'
+        except Exception as e:
+            logger.error(f"❌ Error composing two-cut: {e}")
+            return False, '사진 합성 중 오류가 발생했습니다.'
+
+        logger.info(f"📸 Composed two-cut {filename}")
+        return True, filename
+
+    def url(self, filename):
+        return url_for('static', filename=f'{self.url_prefix}/{filename}')
+
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
@@ -1,69 +1,785 @@
-from datetime import datetime
-import firebase_admin
-from firebase_admin import firestore, credentials
+from datetime import datetime, timezone
 from logger import logger
-import os
+from cache_backend import CacheBackend
+from journal import ProcessJournal
+import metrics
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import generate_password_hash, check_password_hash
+import asyncio, gzip, hashlib, hmac, io, itertools, json, os, random, shutil, struct, tempfile, threading, time
+
+try:
+    import brotli
+except ImportError:  # brotli 는 선택 의존성
+    brotli = None
+
+
+class CollectionCache:
+    """
+    컬렉션 하나의 캐시 엔트리
+
+    - index: 문서 id -> 문서 dict (좋아요 등 단건 갱신을 O(1)로 처리)
+    - snapshot: 읽기용 불변 tuple. 변경 시 None 으로 비우고 다음 읽기에서 다시 만든다 (copy-on-write)
+    - refreshing: 한 스레드만 Firestore 에서 다시 읽도록 하는 single-flight 플래그
+    - version: 내용이 바뀔 때마다 증가 (뷰 재생성 여부 판단에 사용)
+    - pending: 아직 Firestore 에 반영되지 않은 쓰기 (문서 id -> (순번, 문서 또는 삭제면 None))
+    - increments: 아직 Firestore 에 반영되지 않은 필드 증감분 (문서 id -> {필드: 증감분}, 좋아요 등)
+    - fetched_at: 데이터를 읽은 시각 (epoch 초, 다른 프로세스가 읽은 결과와 비교할 때 사용)
+    - expires_at / refresh_at: 만료 시각과 백그라운드 미리 갱신을 시작할 시각 (time.monotonic 기준)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refreshed = threading.Condition(self.lock)
+        self.index = {}
+        self.snapshot = None
+        self.version = 0
+        self.loaded = False
+        self.fetched_at = None
+        self.expires_at = 0.0
+        self.refresh_at = float('inf')
+        self.refreshing = False
+        self.pending = {}
+        self.increments = {}
+
+    def get_snapshot(self):
+        """락을 잡은 상태에서 호출. 읽기용 tuple 을 반환"""
+        if self.snapshot is None:
+            self.snapshot = tuple(self.index.values())
+        return self.snapshot
+
+    def stamp(self, fetched_at, ttl, jitter, refresh_ahead):
+        """
+        락을 잡은 상태에서 호출. 읽은 시각으로 만료/미리 갱신 시각을 정한다
+
+        벽시계는 읽은 시각과의 차이(나이)를 구할 때만 쓰고, 만료 판단은 monotonic 시계로 한다
+        (시스템 시각이 바뀌어도 만료가 당겨지거나 미뤄지지 않도록).
+
+        Args:
+            fetched_at (float): 데이터를 읽은 시각 (epoch 초)
+            ttl (float): 유효 시간 (초)
+            jitter (float): 유효 시간을 ±jitter 비율만큼 무작위로 늘리거나 줄인다 (동시 만료 방지)
+            refresh_ahead (float): 유효 시간의 마지막 이 비율 구간에 들어오면 백그라운드에서 미리 갱신
+        """
+        self.fetched_at = fetched_at
+        age = max(0.0, time.time() - fetched_at)
+        ttl *= 1 + random.uniform(-jitter, jitter)
+        self.expires_at = time.monotonic() - age + ttl
+        self.refresh_at = self.expires_at - ttl * refresh_ahead
+
+    def touch(self):
+        """락을 잡은 상태에서 호출. 내용이 바뀌었음을 기록"""
+        self.snapshot = None
+        self.version += 1
+
+    def apply_pending(self):
+        """락을 잡은 상태에서 호출. Firestore 에서 다시 읽은 index 위에 미반영 쓰기를 덮어쓴다"""
+        for doc_id, (_, doc) in self.pending.items():
+            if doc is None:
+                self.index.pop(doc_id, None)
+            else:
+                self.index[doc_id] = doc
+        for doc_id, fields in self.increments.items():
+            self.increment(doc_id, fields)
+
+    def increment(self, doc_id, fields):
+        """락을 잡은 상태에서 호출. 문서의 숫자 필드에 증감분을 더한다 (0 미만으로 내려가지 않는다)"""
+        doc = self.index.get(doc_id)
+        if doc is None:
+            return False
+        # 기존 스냅샷을 읽는 스레드가 있으므로 dict 를 복사해서 교체
+        self.index[doc_id] = {
+            **doc, **{field: max(0, doc.get(field, 0) + delta) for field, delta in fields.items()}
+        }
+        return True
+
+    def add_increment(self, doc_id, field, delta):
+        """락을 잡은 상태에서 호출. 미반영 증감분을 누적 (0 이 되면 제거)"""
+        fields = self.increments.setdefault(doc_id, {})
+        fields[field] = fields.get(field, 0) + delta
+        if not fields[field]:
+            del fields[field]
+            if not fields:
+                del self.increments[doc_id]
 
 
 class CacheUtils:
-    def __init__(self, config):
+    def __init__(self, config, backend=None):
+        # 기본 유효 시간(초)과 컬렉션별 유효 시간 ([CACHE.TTL])
         self.cache_expiration = config['EXPIRATION']
-        self.cache_data = {"WEDDING_POST": {"data": None, "timestamp": None},
-                      "WEDDING_STORY": {"data": None, "timestamp": None},
-                      "WEDDING_GUESTBOOK": {"data": None, "timestamp": None}}
+        self.ttls = dict(config.get('TTL', {}))
+        self.jitter = config.get('JITTER', 0.0)
+        self.refresh_ahead = config.get('REFRESH_AHEAD', 0.0)
+        self.cache_data = {}
+        self._entries_lock = threading.Lock()
+        # 스냅샷 리스너로 동기화 중인 컬렉션 (만료 검사 없이 항상 유효)
+        self.listening = set()
+        # 뷰 이름 -> (컬렉션 이름, 생성 함수) / 뷰 이름 -> (컬렉션 버전, 결과 tuple)
+        self.views = {}
+        self.view_data = {}
+        # 뷰 이름 -> (정렬 필드, 조건 목록) / 뷰 이름 -> (뷰 tuple, 문서 id -> 위치)
+        self.view_queries = {}
+        self.view_positions = {}
+        # 다른 워커와 캐시를 공유하는 백엔드 (기본은 공유 없음). 이 프로세스에서 생긴 쓰기를
+        # 다른 워커에 알리고, 다른 워커의 쓰기는 apply_remote_changes 로 받는다
+        self.backend = backend or CacheBackend()
+        # 다른 워커의 미반영 쓰기와 구분하기 위한 이 프로세스의 쓰기 식별자 접두어 (프로세스마다 새로 만든다)
+        self.pid = None
+        self.writer_id = None
+        self.backend.subscribe(self.apply_remote_changes)
+
+    def _check_process(self):
+        """
+        이 프로세스에서 처음 쓸 때 쓰기 식별자를 만들고 공유 백엔드를 시작하는 메서드
+
+        fork 한 자식(워커, 프로세스 풀)이 부모의 식별자를 그대로 쓰면 다른 워커의 쓰기를 자기 것으로 착각한다.
+        """
+        pid = os.getpid()
+        if self.pid == pid:
+            return
+        self.writer_id = f"{pid}:{os.urandom(4).hex()}"
+        self.pid = pid
+        self.backend.start()
+
+    def _entry(self, collection_name):
+        """컬렉션 캐시 엔트리를 반환 (없으면 생성)"""
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            with self._entries_lock:
+                entry = self.cache_data.setdefault(collection_name, CollectionCache())
+        return entry
+
+    def view_version(self, view_name):
+        """
+        뷰의 원본 컬렉션 버전 (페이지 캐시 키)
+
+        페이지는 사용하는 뷰들의 버전 tuple 로 캐시하므로, 다른 컬렉션이 바뀌어도 다시 렌더링하지 않는다.
+        """
+        collection_name, _ = self.views[view_name]
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return 0
+        with entry.lock:
+            return entry.version
+
+    def ttl(self, collection_name):
+        """컬렉션의 유효 시간 (초)"""
+        return self.ttls.get(collection_name, self.cache_expiration)
+
+    def _stamp(self, entry, collection_name, fetched_at):
+        """락을 잡은 상태에서 호출"""
+        entry.stamp(fetched_at, self.ttl(collection_name), self.jitter, self.refresh_ahead)
+
+    def has_cache(self, collection_name):
+        """만료 여부와 관계없이 캐시된 데이터가 있는지 확인하는 메서드"""
+        entry = self.cache_data.get(collection_name)
+        return entry is not None and entry.loaded
 
     def is_cache_valid(self, collection_name):
         """캐시가 유효한지 확인하는 메서드"""
-        if collection_name not in self.cache_data:
+        self._check_process()
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
             return False  # 없는 컬렉션이면 False
-    
-        cache = self.cache_data[collection_name]
-        if cache['data'] is None or cache['timestamp'] is None:
-            return False
-        
-        now = datetime.now()
-        if (now - cache['timestamp']).seconds > self.cache_expiration:
+
+        with entry.lock:
+            if not entry.loaded:
+                return False
+
+            if collection_name in self.listening:
+                return True
+
+            return time.monotonic() < entry.expires_at
+
+    def claim_refresh_ahead(self, collection_name):
+        """
+        만료가 가까워 백그라운드에서 미리 갱신할 때인지 확인하는 메서드
+
+        True 를 받은 호출자가 갱신을 맡는다 (다음 갱신 전까지 한 번만 True).
+        """
+        entry = self.cache_data.get(collection_name)
+        if entry is None or collection_name in self.listening:
             return False
-        return True
+        with entry.lock:
+            if not entry.loaded or entry.refreshing or time.monotonic() < entry.refresh_at:
+                return False
+            entry.refresh_at = float('inf')
+            return True
     
     def get_cache(self, collection_name):
-        """캐시된 데이터를 가져오는 메서드"""
-        return self.cache_data[collection_name]['data']
+        """캐시된 데이터를 가져오는 메서드 (불변 tuple, 캐시가 없으면 None)"""
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return None
+        with entry.lock:
+            return entry.get_snapshot() if entry.loaded else None
+
+    def get_document(self, collection_name, doc_id):
+        """캐시에서 문서 하나를 id 로 조회하는 메서드"""
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return None
+        with entry.lock:
+            return entry.index.get(doc_id)
     
-    def set_cache(self, collection_name, data):
-        """캐시를 설정하는 메서드"""
-        self.cache_data[collection_name] = {
-            'data': data,
-            'timestamp': datetime.now()
-        }
+    def set_cache(self, collection_name, data, fetched_at=None):
+        """
+        캐시를 설정하는 메서드
+
+        Args:
+            fetched_at (float, optional): 데이터를 읽은 시각 (epoch 초, 기본은 지금). 로컬 스냅샷이나
+                다른 워커가 읽은 결과를 넣을 때는 그 시각을 넘겨, 남은 유효 시간만큼만 유효하게 한다
+        """
+        entry = self._entry(collection_name)
+        index = {doc['id']: doc for doc in data}
+        with entry.lock:
+            entry.index = index
+            entry.apply_pending()
+            entry.touch()
+            entry.loaded = True
+            self._stamp(entry, collection_name, fetched_at or time.time())
+
+    def export_cache(self, collection_name):
+        """
+        캐시를 저장하기 위해 Firestore 에 반영된 내용만 버전, 읽은 시각과 함께 읽는 메서드
+
+        미반영 쓰기(pending)는 빼고 미반영 증감분(increments)은 되돌린다.
+        재시작하면 방명록 로그 등이 다시 적용하므로, 포함해 저장하면 두 번 반영된다.
+
+        Returns:
+            tuple: (컬렉션 버전, 읽은 시각 epoch 초, 문서 tuple). 캐시가 없으면 None
+        """
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return None
+        with entry.lock:
+            if not entry.loaded:
+                return None
+            if not entry.pending and not entry.increments:
+                return entry.version, entry.fetched_at, entry.get_snapshot()
+
+            docs = []
+            for doc_id, doc in entry.index.items():
+                if doc_id in entry.pending:
+                    continue
+                fields = entry.increments.get(doc_id)
+                if fields:
+                    doc = {**doc, **{field: doc.get(field, 0) - delta for field, delta in fields.items()}}
+                docs.append(doc)
+            return entry.version, entry.fetched_at, tuple(docs)
     
     def invalidate_cache(self, collection_name):
         """캐시를 무효화하는 메서드"""
-        self.cache_data[collection_name] = {
-            'data': None,
-            'timestamp': None
-        }
-    
+        entry = self._entry(collection_name)
+        with entry.lock:
+            entry.index = {}
+            entry.touch()
+            entry.loaded = False
+            entry.fetched_at = None
+            entry.expires_at = 0.0
+            entry.refresh_at = float('inf')
+
+    def begin_refresh(self, collection_name):
+        """
+        컬렉션 갱신 권한을 얻는 메서드 (single-flight)
+
+        Returns:
+            bool: True 면 호출한 스레드가 갱신을 맡고, 끝나면 end_refresh 를 호출해야 한다
+        """
+        entry = self._entry(collection_name)
+        with entry.lock:
+            if entry.refreshing:
+                return False
+            entry.refreshing = True
+            return True
+
+    def end_refresh(self, collection_name):
+        """갱신 완료를 알리고 대기 중인 스레드를 깨우는 메서드"""
+        entry = self._entry(collection_name)
+        with entry.lock:
+            entry.refreshing = False
+            entry.refreshed.notify_all()
+
+    def wait_for_refresh(self, collection_name, timeout=None):
+        """다른 스레드의 갱신이 끝날 때까지 대기하는 메서드"""
+        entry = self._entry(collection_name)
+        with entry.lock:
+            entry.refreshed.wait_for(lambda: not entry.refreshing, timeout)
+
+    def is_listening(self, collection_name):
+        """스냅샷 리스너가 캐시를 동기화하고 있는지 확인하는 메서드"""
+        return collection_name in self.listening and self.is_cache_valid(collection_name)
+
+    def stop_listening(self, collection_name):
+        """
+        리스너 동기화를 해제하는 메서드 (이후에는 만료/개수 검사 방식으로 동작)
+
+        리스너가 더 이상 맞춰 주지 않는 캐시는 만료시켜, 다음 조회에서 전체를 다시 읽는다.
+        """
+        self.listening.discard(collection_name)
+        entry = self.cache_data.get(collection_name)
+        if entry is not None:
+            with entry.lock:
+                entry.expires_at = 0.0
+
+    def apply_snapshot_changes(self, collection_name, changes, initial=False):
+        """
+        스냅샷 리스너의 문서 변경분(ADDED / MODIFIED / REMOVED)을 캐시에 반영하는 메서드
+
+        Args:
+            initial (bool): 리스너의 첫 스냅샷 여부. 첫 스냅샷은 전체 문서가 ADDED 로 전달되므로
+                기존 캐시를 대체하고, 이후 스냅샷은 변경분만 반영한다.
+        """
+        entry = self._entry(collection_name)
+        with entry.lock:
+            if initial:
+                entry.index = {}  # 초기 스냅샷은 기존 (만료 방식) 캐시를 대체
+
+            for change in changes:
+                doc = change.document
+                removed = change.type.name == 'REMOVED'
+                pending = entry.pending.get(doc.id)
+                if pending:
+                    if (pending[1] is None) != removed:
+                        continue  # 아직 반영되지 않은 쓰기가 더 최신
+                    del entry.pending[doc.id]  # 서버에서 확인된 쓰기
+                if removed:
+                    entry.index.pop(doc.id, None)
+                else:
+                    doc_data = doc.to_dict()
+                    doc_data['id'] = doc.id
+                    entry.index[doc.id] = doc_data
+
+            if initial:
+                entry.apply_pending()
+            entry.touch()
+            entry.loaded = True
+            self._stamp(entry, collection_name, time.time())
+            self.listening.add(collection_name)
+
+    def put_pending(self, collection_name, doc_id, seq, doc):
+        """
+        아직 Firestore 에 반영되지 않은 쓰기를 캐시에 바로 반영하는 메서드 (낙관적 갱신)
+
+        Firestore 에서 컬렉션을 다시 읽어도 clear_pending 전까지는 이 쓰기가 유지된다.
+
+        Args:
+            seq (int): 쓰기 순번 (clear_pending 에서 같은 쓰기인지 확인)
+            doc (dict): 저장할 문서. None 이면 삭제
+        """
+        entry = self._entry(collection_name)
+        with entry.lock:
+            entry.pending[doc_id] = (seq, doc)
+            if doc is None:
+                entry.index.pop(doc_id, None)
+            else:
+                entry.index[doc_id] = doc
+            entry.touch()
+        self._publish([(collection_name, 'pending', doc_id, {'token': self._write_token(seq), 'doc': doc})])
+
+    def drop_pending(self, collection_name, doc_id):
+        """Firestore 에 보내기 전에 취소된 추가를 캐시에서 제거하는 메서드"""
+        entry = self._entry(collection_name)
+        with entry.lock:
+            entry.pending.pop(doc_id, None)
+            entry.index.pop(doc_id, None)
+            entry.touch()
+        self._publish([(collection_name, 'drop', doc_id, {})])
+
+    def clear_pending(self, collection_name, committed):
+        """
+        Firestore 에 반영된 쓰기를 미반영 목록에서 제거하는 메서드
+
+        Args:
+            committed (dict): 문서 id -> 반영된 쓰기 순번 (그 사이 새 쓰기가 있으면 유지)
+        """
+        entry = self._entry(collection_name)
+        with entry.lock:
+            for doc_id, seq in committed.items():
+                pending = entry.pending.get(doc_id)
+                if pending and pending[0] == seq:
+                    del entry.pending[doc_id]
+        self._invalidate_shared(collection_name)
+        self._publish([
+            (collection_name, 'committed', doc_id, {'token': self._write_token(seq)})
+            for doc_id, seq in committed.items()
+        ])
+
+    def pending_count_delta(self, collection_name):
+        """미반영 쓰기 때문에 캐시 문서 수가 Firestore 와 다른 만큼 (추가 +1, 삭제 -1)"""
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return 0
+        with entry.lock:
+            return sum(-1 if doc is None else 1 for _, doc in entry.pending.values())
+
+    def has_overlay(self, collection_name):
+        """Firestore 에 아직 반영되지 않은 쓰기나 증감분이 캐시에 있는지 확인하는 메서드"""
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return False
+        with entry.lock:
+            return bool(entry.pending or entry.increments)
+
     def update_like_in_cache(self, collection_name, post_id, new_like_count):
-        """특정 문서의 좋아요 수를 캐시에 업데이트하는 메서드"""
-        if collection_name in self.cache_data:
-            data_list = self.cache_data[collection_name]['data']
-            if data_list:
-                # 해당 post_id를 가진 게시물 찾기
-                post = next((post for post in data_list if post['id'] == post_id), None)
-                if post:
-                    post['like'] = new_like_count
+        """
+        특정 문서의 좋아요 수를 캐시에 업데이트하는 메서드
 
-class FirebaseUtils:
-    def __init__(self, cachestore, key_path):
+        바뀐 만큼은 Firestore 에 반영될 때까지(clear_increments) 미반영 증감분으로 남겨,
+        그 사이 컬렉션을 다시 읽어도 유지되고 다른 워커에도 증감분으로 전달된다.
+        """
+        entry = self.cache_data.get(collection_name)
+        if entry is None:
+            return
+        with entry.lock:
+            post = entry.index.get(post_id)
+            if not post:
+                return
+            delta = new_like_count - post.get('like', 0)
+            # 기존 스냅샷을 읽는 스레드가 있으므로 dict 를 복사해서 교체
+            entry.index[post_id] = {**post, 'like': new_like_count}
+            entry.add_increment(post_id, 'like', delta)
+            entry.touch()
+        if delta:
+            self._publish([(collection_name, 'increment', post_id, {'field': 'like', 'delta': delta})])
+
+    def clear_increments(self, collection_name, field, flushed):
+        """
+        Firestore 에 반영된 증감분을 미반영 목록에서 빼는 메서드
+
+        Args:
+            flushed (dict): 문서 id -> 반영된 증감분
+        """
+        entry = self._entry(collection_name)
+        with entry.lock:
+            for doc_id, delta in flushed.items():
+                entry.add_increment(doc_id, field, -delta)
+        self._invalidate_shared(collection_name)
+        self._publish([
+            (collection_name, 'flushed', doc_id, {'field': field, 'delta': delta})
+            for doc_id, delta in flushed.items()
+        ])
+
+    def _write_token(self, seq):
+        """쓰기 순번을 워커 사이에서 겹치지 않는 식별자로 변환"""
+        self._check_process()
+        return f"{self.writer_id}:{seq}"
+
+    def _invalidate_shared(self, collection_name):
+        """쓰기가 Firestore 에 반영되었으니 그 전에 읽은 공유 컬렉션은 쓰지 않도록 표시"""
+        if not self.backend.shared:
+            return
+        try:
+            self.backend.invalidate(collection_name)
+        except Exception as e:
+            logger.error(f"❌ Error invalidating shared {collection_name}: {e}")
+
+    def _publish(self, changes):
+        """이 프로세스에서 생긴 캐시 변경을 다른 워커에 알린다 (실패해도 로컬 캐시는 유지)"""
+        if not self.backend.shared or not changes:
+            return
+        try:
+            self.backend.publish(changes)
+        except Exception as e:
+            logger.error(f"❌ Error publishing cache changes: {e}")
+
+    def apply_remote_changes(self, changes):
+        """
+        다른 워커가 보낸 캐시 변경을 반영하는 메서드
+
+        - pending / drop / committed: 방명록처럼 Firestore 반영 전에 캐시에 넣은 쓰기.
+          이 워커의 미반영 쓰기와 같은 방식으로 유지되다가, 보낸 워커가 커밋하면 해제된다.
+        - increment / flushed: 좋아요 같은 필드 증감분과 그 반영 완료
+        """
+        for collection_name, op, doc_id, payload in changes:
+            entry = self._entry(collection_name)
+            with entry.lock:
+                if op == 'pending':
+                    doc = payload['doc']
+                    entry.pending[doc_id] = (payload['token'], doc)
+                    if doc is None:
+                        entry.index.pop(doc_id, None)
+                    else:
+                        entry.index[doc_id] = doc
+                elif op == 'drop':
+                    entry.pending.pop(doc_id, None)
+                    entry.index.pop(doc_id, None)
+                elif op == 'committed':
+                    pending = entry.pending.get(doc_id)
+                    if pending and pending[0] == payload['token']:
+                        del entry.pending[doc_id]
+                    continue  # 캐시 내용은 바뀌지 않는다
+                elif op == 'increment':
+                    entry.add_increment(doc_id, payload['field'], payload['delta'])
+                    entry.increment(doc_id, {payload['field']: payload['delta']})
+                elif op == 'flushed':
+                    entry.add_increment(doc_id, payload['field'], -payload['delta'])
+                    continue
+                else:
+                    logger.warning(f"⚠️ Unknown cache change: {op}")
+                    continue
+                entry.touch()
+        logger.debug(f"🔄 Applied {len(changes)} cache change(s) from other workers")
+
+    def share_collection(self, collection_name, docs, fetched_at):
+        """
+        Firestore 에서 읽은 컬렉션을 다른 워커와 공유하는 메서드
+
+        Args:
+            fetched_at (float): 읽기 시작한 시각 (time.time())
+        """
+        if not self.backend.shared:
+            return
+        try:
+            self.backend.store(collection_name, docs, fetched_at)
+        except Exception as e:
+            logger.error(f"❌ Error sharing {collection_name}: {e}")
+
+    def load_shared(self, collection_name):
+        """
+        다른 워커가 이 워커의 캐시보다 나중에 (만료 시간 안에) 읽어 공유한 컬렉션이 있으면 캐시에 적용
+
+        Returns:
+            bool: 공유된 컬렉션으로 캐시를 채웠으면 True (Firestore 를 읽지 않아도 된다)
+        """
+        if not self.backend.shared:
+            return False
+        try:
+            shared = self.backend.load(collection_name)
+        except Exception as e:
+            logger.error(f"❌ Error loading shared {collection_name}: {e}")
+            return False
+        if shared is None:
+            return False
+
+        fetched_at, docs = shared
+        entry = self.cache_data.get(collection_name)
+        local_fetched_at = entry.fetched_at if entry is not None and entry.fetched_at else 0
+        if fetched_at <= local_fetched_at or time.time() - fetched_at > self.ttl(collection_name):
+            return False
+        self.set_cache(collection_name, docs, fetched_at=fetched_at)
+        return True
+
+    def close(self):
+        self.backend.close()
+
+    def register_view(self, view_name, collection_name, builder, order_by=None, filters=()):
+        """
+        컬렉션에서 파생되는 뷰를 등록하는 메서드
+
+        Args:
+            view_name (str): 뷰 이름
+            collection_name (str): 원본 컬렉션 이름
+            builder (callable): 문서 tuple 을 받아 뷰 tuple 을 만드는 함수
+            order_by (str, optional): 뷰의 정렬 기준 필드. 지정하면 캐시가 비어 있을 때
+                Firestore 쿼리로 한 페이지씩 읽을 수 있다 (FirebaseUtils.get_page)
+            filters (iterable, optional): 뷰에 해당하는 Firestore 조건 (필드, 연산자, 값) 목록
+        """
+        self.views[view_name] = (collection_name, builder)
+        self.view_data.pop(view_name, None)
+        if order_by:
+            self.view_queries[view_name] = (order_by, tuple(filters))
+
+    def get_view(self, view_name):
+        """
+        뷰 데이터를 가져오는 메서드 (불변 tuple)
+
+        원본 컬렉션의 버전이 바뀐 경우에만 다시 생성하고, 그 외에는 저장된 결과를 그대로 반환한다.
+        """
+        self._check_process()
+        collection_name, builder = self.views[view_name]
+        entry = self._entry(collection_name)
+        with entry.lock:
+            if not entry.loaded:
+                return ()
+            version = entry.version
+            snapshot = entry.get_snapshot()
+
+        cached = self.view_data.get(view_name)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        view = tuple(builder(snapshot))
+        self.view_data[view_name] = (version, view)
+        return view
+
+    def get_view_page(self, view_name, after=None, limit=20):
+        """
+        뷰를 커서 기준으로 잘라 반환하는 메서드
+
+        Args:
+            after (str, optional): 이전 페이지의 마지막 문서 id. None 이면 첫 페이지
+            limit (int): 페이지 크기
+
+        Returns:
+            tuple: (문서 tuple, 다음 페이지 커서 또는 None)
+        """
+        view = self.get_view(view_name)
+        start = 0
+        if after is not None:
+            # 문서 id -> 뷰 내 위치 (뷰가 다시 만들어질 때만 새로 계산)
+            cached = self.view_positions.get(view_name)
+            if cached is None or cached[0] is not view:
+                cached = (view, {doc['id']: position for position, doc in enumerate(view)})
+                self.view_positions[view_name] = cached
+            position = cached[1].get(after)
+            if position is None:
+                return (), None  # 커서 문서가 삭제된 경우
+            start = position + 1
+
+        page = view[start:start + limit]
+        next_cursor = page[-1]['id'] if page and start + limit < len(view) else None
+        return page, next_cursor
+
+class CachedPage:
+    """렌더링된 페이지 본문과 미리 압축해둔 본문, ETag"""
+    def __init__(self, version, body):
+        self.version = version
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.gzip = gzip.compress(body, compresslevel=9)
+        self.br = brotli.compress(body) if brotli else None
+
+    def etag(self, encoding=None):
+        """인코딩별로 다른 강한 ETag 값 (따옴표 제외)"""
+        return f"{self.digest}-{encoding}" if encoding else self.digest
+
+    def etags(self):
+        return [self.etag(), self.etag('gzip'), self.etag('br')]
+
+    def negotiate(self, if_none_match, accept_encodings):
+        """
+        요청 헤더에 맞는 응답 선택 (Flask / Quart 요청 모두 같은 werkzeug 헤더 객체를 사용)
+
+        Returns:
+            tuple: (상태 코드, Content-Encoding 또는 None, 본문)
+        """
+        if any(if_none_match.contains(etag) for etag in self.etags()):
+            return 304, None, b''
+        if self.br is not None and accept_encodings['br']:
+            return 200, 'br', self.br
+        if accept_encodings['gzip']:
+            return 200, 'gzip', self.gzip
+        return 200, None, self.body
+
+
+class PageCache:
+    def __init__(self, config):
+        self.max_age = config['MAX_AGE']
+        self.pages = {}
+
+    def get(self, route, version):
+        """데이터 버전이 같은 캐시된 페이지를 반환 (없으면 None)"""
+        page = self.pages.get(route)
+        if page is not None and page.version == version:
+            metrics.PAGE_CACHE_LOOKUPS.inc(result='hit')
+            return page
+        metrics.PAGE_CACHE_LOOKUPS.inc(result='miss')
+        return None
+
+    def put(self, route, version, body):
+        """렌더링한 페이지를 압축해 저장하고 반환 (라우트별로 최신 버전 하나만 유지)"""
+        page = CachedPage(version, body.encode('utf-8') if isinstance(body, str) else body)
+        self.pages[route] = page
+        return page
+
+    def clear(self):
+        self.pages.clear()
+
+
+# Firebase Admin SDK 는 불러오는 데만 수백 ms 가 걸려, 처음 Firestore 를 사용할 때 불러오고 초기화한다
+_firebase_lock = threading.Lock()
+
+def initialize_firebase(key_path):
+    """Firebase Admin SDK 기본 앱 초기화 (이미 초기화되어 있으면 그대로, 동기/비동기 클라이언트 공용)"""
+    import firebase_admin
+    from firebase_admin import credentials
+
+    with _firebase_lock:
         try:
             firebase_admin.get_app()
         except ValueError:
-            cred = credentials.Certificate(key_path)
-            firebase_admin.initialize_app(cred)
-            firebase_admin.get_app()
+            firebase_admin.initialize_app(credentials.Certificate(key_path))
+
+
+class FirebaseUtils:
+    def __init__(self, cachestore, key_path, db=None):
+        """
+        Args:
+            key_path (str): 서비스 계정 키 파일 (db 를 주지 않으면 처음 self.db 를 사용할 때 초기화)
+            db: 사용할 Firestore 클라이언트 (fake 등)
+        """
         self.cachestore = cachestore
-        self.db = firestore.client()
+        self.key_path = key_path
+        self._db = db
+        self._db_lock = threading.Lock()
+        self.watches = {}
+
+    @property
+    def db(self):
+        """Firestore 클라이언트 (처음 사용할 때 생성)"""
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    from firebase_admin import firestore
+
+                    initialize_firebase(self.key_path)
+                    self._db = firestore.client()
+        return self._db
+
+    def connect(self):
+        """Firestore 클라이언트를 미리 생성 (첫 요청이 SDK 초기화를 기다리지 않도록)"""
+        return self.db
+
+    def start_listeners(self, collection_names):
+        """
+        컬렉션별 on_snapshot 리스너를 등록해 캐시를 실시간으로 동기화
+
+        리스너가 동작하는 동안 get_collection_data 는 Firestore 호출 없이 캐시만 읽는다.
+        """
+        for collection_name in collection_names:
+            if collection_name in self.watches:
+                continue
+            try:
+                # initial: 첫 스냅샷 대기 중 / failed: 동기화에 실패해 해제된 리스너
+                state = {'initial': True, 'failed': False}
+                watch = self.db.collection(collection_name).on_snapshot(
+                    self._make_snapshot_callback(collection_name, state)
+                )
+                if state['failed']:
+                    watch.unsubscribe()  # 첫 스냅샷부터 실패 (등록 중에 콜백이 호출된 경우)
+                    continue
+                self.watches[collection_name] = watch
+                logger.info(f"👂 Listening to {collection_name}")
+            except Exception as e:
+                logger.error(f"❌ Error starting listener for {collection_name}: {e}")
+
+    def stop_listeners(self):
+        """등록된 스냅샷 리스너를 모두 해제"""
+        for collection_name, watch in list(self.watches.items()):
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logger.error(f"❌ Error stopping listener for {collection_name}: {e}")
+            self.cachestore.stop_listening(collection_name)
+        self.watches.clear()
+
+    def _make_snapshot_callback(self, collection_name, state):
+        def on_snapshot(col_snapshot, changes, read_time):
+            if state['failed']:
+                return  # 해제 중인 리스너에 늦게 도착한 스냅샷
+            try:
+                self.cachestore.apply_snapshot_changes(collection_name, changes, initial=state['initial'])
+                state['initial'] = False
+                logger.debug(f"🔄 Synced {len(changes)} change(s) for {collection_name}")
+            except Exception as e:
+                # 변경분 하나라도 놓친 리스너는 다시 믿을 수 없으니 해제하고 개수 검사 방식으로 되돌린다
+                logger.error(f"❌ Error applying snapshot for {collection_name}: {e}")
+                state['failed'] = True
+                self.cachestore.stop_listening(collection_name)
+                watch = self.watches.pop(collection_name, None)
+                if watch is not None:
+                    # 리스너 스레드 안에서 해제하면 자기 자신을 기다릴 수 있어 별도 스레드에서
+                    threading.Thread(target=watch.unsubscribe, name='unsubscribe', daemon=True).start()
+        return on_snapshot
 
     def get_document_ref(self, collection_name, doc_id=None):
         """
@@ -92,70 +808,607 @@ class FirebaseUtils:
         """컬렉션의 문서 개수를 반환"""
         try:
             # count() 메서드를 사용하여 문서 개수만 조회
-            count = self.db.collection(collection_name).count().get()[0][0].value
+            with metrics.firestore_op('count', collection_name):
+                count = self.db.collection(collection_name).count().get()[0][0].value
             return count
         except Exception as e:
             logger.error(f"Error getting collection count: {e}")
             return None
 
+    def _fetch_collection(self, collection_name):
+        """컬렉션 전체 문서를 Firestore 에서 읽어 리스트로 반환"""
+        doc_list = []
+        with metrics.firestore_op('stream', collection_name):
+            for doc in self.db.collection(collection_name).stream():
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                doc_list.append(doc_data)
+        return doc_list
+
+    def _refresh_collection(self, collection_name, lookup=True):
+        """
+        컬렉션 캐시를 갱신하고 최신 스냅샷을 반환
+
+        갱신은 한 스레드만 수행하고(single-flight), 나머지 스레드는 이전 스냅샷을 받는다.
+        이전 스냅샷이 없으면(첫 적재) 갱신이 끝날 때까지 기다린다.
+
+        Args:
+            lookup (bool): 요청의 캐시 조회로 기록할지 여부 (미리 갱신은 조회가 아니다)
+        """
+        if self.cachestore.begin_refresh(collection_name):
+            return self._reload_collection(collection_name, lookup)
+
+        if self.cachestore.has_cache(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='stale')
+            logger.info(f"⏳ Serving stale {collection_name} while another request refreshes it")
+        else:
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='miss')
+            self.cachestore.wait_for_refresh(collection_name)
+        return self.cachestore.get_cache(collection_name) or ()
+
+    def _reload_collection(self, collection_name, lookup):
+        """begin_refresh 로 갱신을 맡은 스레드에서 호출. 컬렉션을 다시 읽어 캐시에 넣고 스냅샷을 반환"""
+        try:
+            # 다른 워커가 방금 Firestore 에서 읽어 공유한 결과가 있으면 그것을 사용
+            if self.cachestore.load_shared(collection_name):
+                if lookup:
+                    metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='shared')
+                logger.info(f"🤝 Loaded {collection_name} from the shared cache")
+                return self.cachestore.get_cache(collection_name)
+
+            if lookup:
+                metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='miss')
+            fetched_at = time.time()
+            doc_list = self._fetch_collection(collection_name)
+            self.cachestore.set_cache(collection_name, doc_list)
+            self.cachestore.share_collection(collection_name, doc_list, fetched_at)
+            logger.info(f"💾 Cached {len(doc_list)} items for {collection_name}")
+            return self.cachestore.get_cache(collection_name)
+        finally:
+            self.cachestore.end_refresh(collection_name)
+
+    def refresh_stale(self, collection_name):
+        """
+        만료된 컬렉션을 백그라운드 스레드에서 다시 읽는다 (요청은 만료된 캐시로 바로 응답)
+
+        이미 다른 스레드가 갱신 중이면 아무것도 하지 않는다 (single-flight).
+
+        Returns:
+            Thread 또는 None
+        """
+        if not self.cachestore.begin_refresh(collection_name):
+            return None
+
+        def refresh():
+            try:
+                logger.info(f"🔄 Refreshing stale {collection_name} in the background")
+                self._reload_collection(collection_name, lookup=False)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not refresh stale {collection_name}: {e}")
+
+        thread = threading.Thread(target=refresh, name='cache-refresh-stale', daemon=True)
+        thread.start()
+        return thread
+
+    def refresh_ahead(self, collection_name):
+        """
+        만료가 가까워진 컬렉션을 백그라운드 스레드에서 미리 다시 읽는다
+
+        요청은 기존 캐시로 바로 응답하고, 갱신이 끝나면 새 만료 시각이 정해지므로
+        자주 읽히는 컬렉션은 만료되어 요청이 Firestore 를 기다리는 일이 없다.
+
+        Returns:
+            Thread 또는 None (아직 미리 갱신할 때가 아니면 None)
+        """
+        if not self.cachestore.claim_refresh_ahead(collection_name):
+            return None
+
+        def refresh():
+            try:
+                logger.info(f"🔄 Refreshing {collection_name} ahead of expiry")
+                self._refresh_collection(collection_name, lookup=False)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not refresh {collection_name} ahead of expiry: {e}")
+
+        thread = threading.Thread(target=refresh, name='cache-refresh-ahead', daemon=True)
+        thread.start()
+        return thread
+
+    def reconcile_in_background(self, collection_names):
+        """
+        스냅샷에서 복원한 캐시를 백그라운드에서 Firestore 와 맞춘다
+
+        갱신 중에는 single-flight 로 요청이 복원된 캐시를 그대로 받고,
+        Firestore 에 연결할 수 없으면 복원된 캐시를 계속 사용한다.
+        """
+        def reconcile():
+            for collection_name in collection_names:
+                try:
+                    self._refresh_collection(collection_name)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not reconcile {collection_name} with Firebase, serving snapshot: {e}")
+
+        thread = threading.Thread(target=reconcile, name='cache-reconcile', daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _sort_docs(docs, sort_by, ascending):
+        """캐시를 건드리지 않도록 정렬된 새 리스트를 반환"""
+        if sort_by and docs:
+            return sorted(docs, key=lambda x: x.get(sort_by), reverse=not ascending)
+        return docs
+
+    def get_view(self, view_name):
+        """
+        CacheUtils 에 등록된 뷰를 반환
+
+        원본 컬렉션의 캐시를 평소처럼 확인/갱신한 뒤, 미리 계산된 뷰를 돌려준다.
+        """
+        collection_name, _ = self.cachestore.views[view_name]
+        self.get_collection_data(collection_name)
+        return self.cachestore.get_view(view_name)
+
+    def get_page(self, view_name, after=None, limit=20):
+        """
+        뷰의 한 페이지를 반환 (커서 기반 페이지네이션)
+
+        캐시가 있으면 미리 계산된 뷰를 자른다. 만료된 캐시도 그대로 자르고(미반영 쓰기/증감분 포함),
+        갱신은 백그라운드에서 한 스레드만 한다 (페이지마다 Firestore 를 읽지 않는다).
+        캐시가 아직 없고 미반영 쓰기도 없으면(시작 직후) 컬렉션 전체를 읽지 않고
+        Firestore order_by + start_after + limit 쿼리로 한 페이지만 읽는다.
+
+        Args:
+            view_name (str): CacheUtils 에 등록된 뷰 이름
+            after (str, optional): 이전 페이지의 마지막 문서 id. None 이면 첫 페이지
+            limit (int): 페이지 크기
+
+        Returns:
+            tuple: (문서 list, 다음 페이지 커서 또는 None)
+        """
+        collection_name, _ = self.cachestore.views[view_name]
+        if self.cachestore.is_cache_valid(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='hit')
+            self.refresh_ahead(collection_name)
+        elif self.cachestore.has_cache(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='stale')
+            self.refresh_stale(collection_name)
+        elif view_name in self.cachestore.view_queries and not self.cachestore.has_overlay(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='miss')
+            return self._query_page(view_name, collection_name, after, limit)
+        else:
+            # 쿼리로 표현할 수 없는 뷰는 컬렉션을 불러온 뒤 자른다
+            self.get_collection_data(collection_name)
+        page, next_cursor = self.cachestore.get_view_page(view_name, after, limit)
+        return list(page), next_cursor
+
+    @staticmethod
+    def _view_query(collection_ref, view_query):
+        """뷰와 같은 조건/순서의 Firestore 쿼리"""
+        order_by, filters = view_query
+        from firebase_admin import firestore
+
+        query = collection_ref
+        for field, op, value in filters:
+            query = query.where(filter=firestore.FieldFilter(field, op, value))
+        return query.order_by(order_by)
+
+    def _query_page(self, view_name, collection_name, after, limit):
+        collection_ref = self.db.collection(collection_name)
+        query = self._view_query(collection_ref, self.cachestore.view_queries[view_name])
+
+        if after is not None:
+            with metrics.firestore_op('get', collection_name):
+                cursor = collection_ref.document(after).get()
+            if not cursor.exists:
+                return [], None  # 커서 문서가 삭제된 경우
+            query = query.start_after(cursor)
+
+        # 다음 페이지가 있는지 알기 위해 한 개 더 읽는다
+        docs = []
+        with metrics.firestore_op('stream', collection_name):
+            for doc in query.limit(limit + 1).stream():
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                docs.append(doc_data)
+
+        next_cursor = docs[limit - 1]['id'] if len(docs) > limit else None
+        logger.info(f"📄 Queried a page of {view_name} from Firebase ({min(len(docs), limit)} docs)")
+        return docs[:limit], next_cursor
+
     def get_collection_data(self, collection_name, sort_by=None, ascending=True, ignore_cache=False):
         try:
+            if ignore_cache:
+                return self._sort_docs(self._fetch_collection(collection_name), sort_by, ascending)
+
+            # 0. 리스너가 동기화 중이면 Firestore 호출 없이 캐시 반환
+            if self.cachestore.is_listening(collection_name):
+                metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='hit')
+                return self._sort_docs(self.cachestore.get_cache(collection_name), sort_by, ascending)
+
             # 1. 캐시가 유효한지 확인
-            if not ignore_cache and self.cachestore.is_cache_valid(collection_name):
+            if self.cachestore.is_cache_valid(collection_name):
                 cached_data = self.cachestore.get_cache(collection_name)
                 # 2. Firebase의 현재 문서 개수 확인
                 current_count = self.get_collection_count(collection_name)
                 cached_count = len(cached_data) if cached_data else 0
+                # 아직 Firestore 에 반영되지 않은 쓰기만큼 보정
+                cached_count -= self.cachestore.pending_count_delta(collection_name)
                 
                 # 3. 개수가 같으면 캐시 데이터 사용
                 if current_count is not None and current_count == cached_count:
+                    metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='hit')
                     logger.info(f"✅ Cache HIT for {collection_name} - Count match ({current_count})")
-                    
-                    # 캐시된 데이터 정렬
-                    if sort_by and cached_data:
-                        cached_data.sort(key=lambda x: x.get(sort_by), reverse=not ascending)
-                    return cached_data
+                    self.refresh_ahead(collection_name)
+                    return self._sort_docs(cached_data, sort_by, ascending)
                 else:
                     logger.info(f"⚠️ Cache INVALIDATED for {collection_name} - Count mismatch (cache: {cached_count}, current: {current_count})")
             
-            # 4. 캐시가 유효하지 않거나 개수가 다른 경우 전체 데이터 조회
-            query = self.db.collection(collection_name)
+            # 4. 캐시가 유효하지 않거나 개수가 다른 경우 전체 데이터 조회 (한 스레드만)
+            return self._sort_docs(self._refresh_collection(collection_name), sort_by, ascending)
             
-            docs = query.stream()
-            doc_list = []
-            
-            for doc in docs:
+        except Exception as e:
+            logger.error(f"❌ Error in get_collection_data: {e}")
+            # 에러 발생 시 만료된 캐시라도 반환
+            if self.cachestore.has_cache(collection_name):
+                cached_data = self.cachestore.get_cache(collection_name)
+                metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='stale')
+                logger.warning(f"⚠️ Returning cached data due to error")
+                return self._sort_docs(cached_data, sort_by, ascending)
+            return []
+        
+
+class AsyncFirebaseUtils:
+    """
+    Firestore AsyncClient 로 캐시를 채우는 FirebaseUtils 의 비동기 버전 (ASGI 모드, asgi.py)
+
+    CacheUtils 와 single-flight 플래그를 FirebaseUtils 와 공유하므로, 스냅샷 복원/리스너 등
+    백그라운드 스레드가 채운 캐시를 그대로 사용한다.
+    """
+    def __init__(self, cachestore, key_path, db=None):
+        self.cachestore = cachestore
+        self.key_path = key_path
+        self._db = db
+        self._db_lock = threading.Lock()
+        # 실행 중인 미리 갱신 태스크 (완료 전에 가비지 컬렉션되지 않도록 참조를 유지)
+        self.background_tasks = set()
+
+    @property
+    def db(self):
+        """Firestore AsyncClient (처음 사용할 때 생성)"""
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    from firebase_admin import firestore_async
+
+                    initialize_firebase(self.key_path)
+                    self._db = firestore_async.client()
+        return self._db
+
+    async def get_collection_count(self, collection_name):
+        """컬렉션의 문서 개수를 반환"""
+        try:
+            with metrics.firestore_op('count', collection_name):
+                result = await self.db.collection(collection_name).count().get()
+            return result[0][0].value
+        except Exception as e:
+            logger.error(f"Error getting collection count: {e}")
+            return None
+
+    async def _fetch_collection(self, collection_name):
+        doc_list = []
+        with metrics.firestore_op('stream', collection_name):
+            async for doc in self.db.collection(collection_name).stream():
                 doc_data = doc.to_dict()
                 doc_data['id'] = doc.id
                 doc_list.append(doc_data)
-            
-            # 정렬이 요청된 경우
-            if sort_by and doc_list:
-                doc_list.sort(key=lambda x: x.get(sort_by), reverse=not ascending)
-            
-            # 캐시 업데이트
-            if not ignore_cache:
-                self.cachestore.set_cache(collection_name, doc_list)
-                logger.info(f"💾 Cached {len(doc_list)} items for {collection_name}")
-            
-            return doc_list
-            
-        except Exception as e:
-            logger.error(f"❌ Error in get_collection_data: {e}")
-            # 에러 발생 시 캐시된 데이터라도 반환
+        return doc_list
+
+    async def _refresh_collection(self, collection_name, lookup=True):
+        """FirebaseUtils._refresh_collection 과 같은 single-flight 갱신 (첫 적재 대기는 이벤트 루프 밖에서)"""
+        if self.cachestore.begin_refresh(collection_name):
+            return await self._reload_collection(collection_name, lookup)
+
+        if self.cachestore.has_cache(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='stale')
+            logger.info(f"⏳ Serving stale {collection_name} while another request refreshes it")
+        else:
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='miss')
+            await asyncio.to_thread(self.cachestore.wait_for_refresh, collection_name)
+        return self.cachestore.get_cache(collection_name) or ()
+
+    async def _reload_collection(self, collection_name, lookup):
+        """FirebaseUtils._reload_collection 의 비동기 버전"""
+        try:
+            if await asyncio.to_thread(self.cachestore.load_shared, collection_name):
+                if lookup:
+                    metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='shared')
+                logger.info(f"🤝 Loaded {collection_name} from the shared cache")
+                return self.cachestore.get_cache(collection_name)
+
+            if lookup:
+                metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='miss')
+            fetched_at = time.time()
+            doc_list = await self._fetch_collection(collection_name)
+            self.cachestore.set_cache(collection_name, doc_list)
+            await asyncio.to_thread(self.cachestore.share_collection, collection_name, doc_list, fetched_at)
+            logger.info(f"💾 Cached {len(doc_list)} items for {collection_name}")
+            return self.cachestore.get_cache(collection_name)
+        finally:
+            self.cachestore.end_refresh(collection_name)
+
+    def _run_in_background(self, coro):
+        """이벤트 루프의 태스크로 실행 (완료 전에 가비지 컬렉션되지 않도록 참조를 유지)"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    def refresh_stale(self, collection_name):
+        """
+        FirebaseUtils.refresh_stale 의 비동기 버전
+
+        Returns:
+            Task 또는 None
+        """
+        if not self.cachestore.begin_refresh(collection_name):
+            return None
+
+        async def refresh():
+            try:
+                logger.info(f"🔄 Refreshing stale {collection_name} in the background")
+                await self._reload_collection(collection_name, lookup=False)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not refresh stale {collection_name}: {e}")
+
+        return self._run_in_background(refresh())
+
+    def refresh_ahead(self, collection_name):
+        """
+        FirebaseUtils.refresh_ahead 의 비동기 버전 (이벤트 루프의 태스크로 미리 갱신)
+
+        Returns:
+            Task 또는 None
+        """
+        if not self.cachestore.claim_refresh_ahead(collection_name):
+            return None
+
+        async def refresh():
+            try:
+                logger.info(f"🔄 Refreshing {collection_name} ahead of expiry")
+                await self._refresh_collection(collection_name, lookup=False)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not refresh {collection_name} ahead of expiry: {e}")
+
+        return self._run_in_background(refresh())
+
+    async def get_collection_data(self, collection_name):
+        """FirebaseUtils.get_collection_data 와 같은 캐시 확인 순서 (정렬 옵션 없음)"""
+        try:
+            if self.cachestore.is_listening(collection_name):
+                metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='hit')
+                return self.cachestore.get_cache(collection_name)
+
             if self.cachestore.is_cache_valid(collection_name):
                 cached_data = self.cachestore.get_cache(collection_name)
+                current_count = await self.get_collection_count(collection_name)
+                cached_count = len(cached_data) if cached_data else 0
+                cached_count -= self.cachestore.pending_count_delta(collection_name)
+
+                if current_count is not None and current_count == cached_count:
+                    metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='hit')
+                    logger.info(f"✅ Cache HIT for {collection_name} - Count match ({current_count})")
+                    self.refresh_ahead(collection_name)
+                    return cached_data
+                logger.info(f"⚠️ Cache INVALIDATED for {collection_name} - Count mismatch (cache: {cached_count}, current: {current_count})")
+
+            return await self._refresh_collection(collection_name)
+
+        except Exception as e:
+            logger.error(f"❌ Error in get_collection_data: {e}")
+            if self.cachestore.has_cache(collection_name):
+                metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='stale')
                 logger.warning(f"⚠️ Returning cached data due to error")
-                return cached_data
+                return self.cachestore.get_cache(collection_name)
             return []
-        
+
+    async def get_views(self, view_names):
+        """
+        여러 뷰를 한 번에 반환 (원본 컬렉션들의 캐시 확인/갱신을 asyncio.gather 로 동시에 수행)
+
+        Returns:
+            dict: 뷰 이름 -> 뷰 tuple
+        """
+        collection_names = {self.cachestore.views[view_name][0] for view_name in view_names}
+        await asyncio.gather(*(self.get_collection_data(name) for name in collection_names))
+        return {view_name: self.cachestore.get_view(view_name) for view_name in view_names}
+
+    async def get_page(self, view_name, after=None, limit=20):
+        """FirebaseUtils.get_page 의 비동기 버전"""
+        collection_name, _ = self.cachestore.views[view_name]
+        if self.cachestore.is_cache_valid(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='hit')
+            self.refresh_ahead(collection_name)
+        elif self.cachestore.has_cache(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='stale')
+            self.refresh_stale(collection_name)
+        elif view_name in self.cachestore.view_queries and not self.cachestore.has_overlay(collection_name):
+            metrics.CACHE_LOOKUPS.inc(collection=collection_name, result='miss')
+            collection_ref = self.db.collection(collection_name)
+            query = FirebaseUtils._view_query(collection_ref, self.cachestore.view_queries[view_name])
+            if after is not None:
+                with metrics.firestore_op('get', collection_name):
+                    cursor = await collection_ref.document(after).get()
+                if not cursor.exists:
+                    return [], None
+                query = query.start_after(cursor)
+
+            docs = []
+            with metrics.firestore_op('stream', collection_name):
+                async for doc in query.limit(limit + 1).stream():
+                    doc_data = doc.to_dict()
+                    doc_data['id'] = doc.id
+                    docs.append(doc_data)
+            next_cursor = docs[limit - 1]['id'] if len(docs) > limit else None
+            logger.info(f"📄 Queried a page of {view_name} from Firebase ({min(len(docs), limit)} docs)")
+            return docs[:limit], next_cursor
+        else:
+            await self.get_collection_data(collection_name)
+        page, next_cursor = self.cachestore.get_view_page(view_name, after, limit)
+        return list(page), next_cursor
+
+
+# 확장자 -> 실제 파일 시그니처로 판별한 MIME 타입
+EXTENSION_MIME_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+}
+
+# 크기 정보가 담긴 JPEG SOF 마커 (DHT/JPG/DAC 제외)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_dimensions(stream):
+    """
+    JPEG 세그먼트 길이를 따라 건너뛰며 SOF 마커의 픽셀 크기를 찾음
+
+    EXIF/ICC 같은 세그먼트는 읽지 않고 seek 로 넘기므로 앞부분 세그먼트가 아무리 커도
+    마커 헤더만 읽는다. 스트림 위치는 호출한 쪽에서 되돌린다.
+
+    Args:
+        stream: seek 가능한 JPEG 바이너리 스트림
+
+    Returns:
+        tuple: (너비, 높이). SOF 전에 파일이 끝나거나 구조가 깨졌으면 (None, None)
+    """
+    stream.seek(2)
+    while True:
+        marker = stream.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None, None  # 파일 끝이거나 마커가 아니면 손상된 파일
+        code = marker[1]
+        if code == 0xFF:
+            stream.seek(-1, io.SEEK_CUR)  # 채움 바이트
+            continue
+        if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+            continue  # 길이 없는 마커
+        if code in (0xD9, 0xDA):
+            return None, None  # SOF 없이 이미지 끝/스캔 데이터에 도달
+        header = stream.read(2)
+        if len(header) < 2:
+            return None, None
+        length = struct.unpack('>H', header)[0]
+        if length < 2:
+            return None, None
+        if code in JPEG_SOF_MARKERS:
+            frame = stream.read(5)
+            if len(frame) < 5:
+                return None, None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return width, height
+        stream.seek(length - 2, io.SEEK_CUR)
+
+
+def sniff_image(head):
+    """
+    파일 앞부분의 시그니처로 이미지 형식과 픽셀 크기를 판별 (디코딩 없이 헤더만 읽는다)
+
+    Returns:
+        tuple: (MIME 타입 또는 None, 너비, 높이). 헤더에서 크기를 찾지 못하면 너비/높이는 None
+    """
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        if len(head) >= 24 and head[12:16] == b'IHDR':
+            width, height = struct.unpack('>II', head[16:24])
+            return 'image/png', width, height
+        return 'image/png', None, None
+
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        if len(head) >= 10:
+            width, height = struct.unpack('<HH', head[6:10])
+            return 'image/gif', width, height
+        return 'image/gif', None, None
+
+    if head.startswith(b'\xff\xd8\xff'):
+        width, height = jpeg_dimensions(io.BytesIO(head))
+        return 'image/jpeg', width, height
+
+    return None, None, None
+
+
+class HashingSpool:
+    """
+    업로드 본문을 임시 파일에 쓰면서 크기와 sha256 을 함께 계산하는 파일 객체
+
+    werkzeug 의 multipart 파서가 이 객체에 직접 쓰므로 본문은 디스크에 한 번만 기록되고,
+    최대 크기를 넘는 순간 나머지를 받지 않고 413 으로 중단한다.
+    """
+    def __init__(self, directory, max_size):
+        os.makedirs(directory, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=directory, prefix='.upload_', delete=False)
+        self.path = self.file.name
+        self.max_size = max_size
+        self.size = 0
+        self.hash = hashlib.sha256()
+        self.committed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise RequestEntityTooLarge()
+        self.hash.update(data)
+        return self.file.write(data)
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+    def commit(self, final_path):
+        """임시 파일을 최종 경로로 원자적으로 이동 (같은 내용이 이미 있으면 버린다)"""
+        self.file.close()
+        if os.path.exists(final_path):
+            os.remove(self.path)
+            self.committed = True
+            return False
+        os.replace(self.path, final_path)
+        self.committed = True
+        return True
+
+    def close(self):
+        """요청이 끝날 때 호출된다. 최종 경로로 옮기지 않은 임시 파일은 삭제"""
+        self.file.close()
+        if not self.committed and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
 
 class FileUtils:
+    # 업로드 스트림을 복사할 때 사용하는 청크 크기
+    CHUNK_SIZE = 64 * 1024
+
     def __init__(self, config):
         self.upload_paths = config['PATHS']
         self.upload_max_size = config['MAX_SIZE']
         self.allowed_extension = config['ALLOWED_EXTENSIONS']
         self.allowed_type = config['ALLOWED_TYPES']
+        self.max_pixels = config['MAX_PIXELS']
+
+    def max_upload_size(self):
+        """업로드 분류 중 가장 큰 허용 크기"""
+        return max(self.upload_max_size.values())
+
+    def open_spool(self):
+        """multipart 파서가 파일 본문을 기록할 HashingSpool 생성"""
+        return HashingSpool(self.upload_paths['TMP'], self.max_upload_size())
+
+    def check_content_length(self, content_length, category):
+        """요청 본문을 읽기 전에 Content-Length 로 크기를 검사"""
+        if content_length and content_length > self.upload_max_size[category] + self.CHUNK_SIZE:
+            logger.error(f"❌ Content-Length exceeds {self.upload_max_size[category] / 1024}KB: {content_length} bytes")
+            return False, f"파일 크기는 {self.upload_max_size[category] / 1024}KB 이하여야 합니다."
+        return True, None
 
     def validate_file(self, file, file_type, category):
         """파일 검증"""
@@ -170,97 +1423,327 @@ class FileUtils:
                 logger.error("❌ File has no valid stream")
                 return False, '파일 스트림이 유효하지 않습니다.'
             
-            # 파일 크기 검사
-            file.seek(0, os.SEEK_END)
-            size = file.tell()
-            file.seek(0)
+            # 파일 크기 검사 (HashingSpool 이 아니면 upload_file 에서 복사하면서 검사)
+            size = getattr(file.stream, 'size', 0)
             if size > self.upload_max_size[category]:
                 logger.error(f"❌ File size exceeds {self.upload_max_size[category] / 1024}KB: {size} bytes")
                 return False, f"파일 크기는 {self.upload_max_size[category] / 1024}KB 이하여야 합니다."
             
             # 파일 형식 검사
-            if not '.' in file.filename and \
-                file.filename.rsplit('.', 1)[1].lower() in self.allowed_extension[file_type]:
+            extension = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
+            if extension not in self.allowed_extension[file_type]:
                 allowed_extensions = ', '.join(self.allowed_extension[file_type]).upper()
                 logger.error(f"❌ File type is not allowed: {file.filename}")
                 return False, f'{allowed_extensions} 형식의 파일만 업로드 가능합니다.'
             
-            # MIME 타입 검사
-            if file.content_type not in self.allowed_type[file_type]:
-                logger.error(f"❌ Invalid MIME type: {file.content_type}")
+            # MIME 타입 검사 (클라이언트가 보낸 content_type 대신 실제 시그니처로 판별)
+            started = time.perf_counter()
+            mime_type, width, height = self._sniff_file(file)
+            elapsed_us = (time.perf_counter() - started) * 1e6
+
+            if mime_type not in self.allowed_type[file_type]:
+                logger.error(f"❌ Invalid file signature: {file.filename} (sniffed: {mime_type}, sent: {file.content_type})")
                 return False, '지원하지 않는 파일 형식입니다.'
+            if mime_type != EXTENSION_MIME_TYPES.get(extension):
+                # 브라우저는 이미지 형식을 내용으로 판별하므로 확장자 불일치는 기록만 한다
+                logger.warning(f"⚠️ Extension does not match signature: {file.filename} ({mime_type})")
 
+            # 디코딩 전에 헤더의 픽셀 크기로 손상 파일/압축 폭탄 차단
+            if not width or not height:
+                logger.error(f"❌ Could not read image dimensions: {file.filename}")
+                return False, '손상된 이미지 파일입니다.'
+            if width * height > self.max_pixels:
+                logger.error(f"❌ Image dimensions too large: {width}x{height}")
+                return False, '이미지 해상도가 너무 큽니다.'
+
+            logger.debug(f"🔍 Validated {mime_type} {width}x{height} in {elapsed_us:.0f}µs")
             return True, file
             
         except Exception as e:
             logger.error(f"❌ Error validating file: {e}")
             return False, '파일 검증 중 오류가 발생했습니다.'
 
-    def upload_file(self, file, upload_category):
-        """파일 업로드"""
+    def _sniff_file(self, file):
+        """
+        파일 앞부분만 읽어 형식과 크기를 판별
+
+        대부분 첫 4KB 로 충분하고, EXIF 가 큰 JPEG 만 스트림에서 세그먼트를 건너뛰며 SOF 를 찾는다.
+        """
+        stream = file.stream
+        stream.seek(0)
+        try:
+            head = stream.read(4096)
+            mime_type, width, height = sniff_image(head)
+            if mime_type == 'image/jpeg' and width is None and len(head) == 4096:
+                width, height = jpeg_dimensions(stream)
+            return mime_type, width, height
+        finally:
+            stream.seek(0)
+
+    def _spool_stream(self, stream, upload_category):
+        """HashingSpool 이 아닌 스트림을 청크 단위로 복사하면서 크기/해시 계산"""
+        spool = HashingSpool(self.upload_paths['TMP'], self.upload_max_size[upload_category])
+        try:
+            while True:
+                chunk = stream.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        return spool
+
+    def upload_file(self, file, upload_category, publish_dir=None):
+        """
+        파일 업로드
+
+        본문은 임시 파일에 한 번만 기록된 뒤 내용 해시 이름으로 업로드 폴더에 원자적으로 이동한다.
+        같은 내용의 파일이 이미 있으면 새로 저장하지 않는다.
+
+        Args:
+            file (FileStorage): 업로드 파일
+            upload_category (str): 업로드 분류 (PROFILE / TWOCUT)
+            publish_dir (str, optional): 하드링크(불가능하면 복사)로 함께 공개할 static 폴더
+
+        Returns:
+            tuple: (성공 여부, 저장된 파일명 또는 에러 메시지)
+        """
+        spool = None
         try:
-            # 안전한 파일명 생성
-            original_filename = file.filename
             # 파일 확장자 추출
-            file_ext = os.path.splitext(original_filename)[1]
-            # 현재 시간과 원본 파일명에서 확장자를 제외한 부분으로 새 파일명 생성
-            filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.path.splitext(original_filename)[0]}{file_ext}"
+            file_ext = os.path.splitext(file.filename)[1].lower()
+
+            spool = file.stream if isinstance(file.stream, HashingSpool) else \
+                self._spool_stream(file.stream, upload_category)
+            metrics.UPLOAD_BYTES.inc(spool.size, category=upload_category)
+            if spool.size > self.upload_max_size[upload_category]:
+                metrics.UPLOADS.inc(category=upload_category, result='rejected')
+                logger.error(f"❌ File size exceeds {self.upload_max_size[upload_category] / 1024}KB: {spool.size} bytes")
+                return False, f"파일 크기는 {self.upload_max_size[upload_category] / 1024}KB 이하여야 합니다."
+
+            # 내용 해시로 파일명 생성 (같은 파일은 같은 이름)
+            filename = f"{spool.hexdigest()[:32]}{file_ext}"
             
             # 업로드 폴더 생성
-            if not os.path.exists(self.upload_paths[upload_category]):
-                os.makedirs(self.upload_paths[upload_category])
+            os.makedirs(self.upload_paths[upload_category], exist_ok=True)
             
             # 파일 저장
             file_path = os.path.join(self.upload_paths[upload_category], filename)
-            file.save(file_path)
-            logger.info(f"✅ Saved file: {filename}\nto: {file_path}")
+            if spool.commit(file_path):
+                metrics.UPLOADS.inc(category=upload_category, result='saved')
+                logger.info(f"✅ Saved file: {filename}\nto: {file_path}")
+            else:
+                metrics.UPLOADS.inc(category=upload_category, result='duplicate')
+                logger.info(f"♻️ Duplicate upload, reusing: {file_path}")
+
+            if publish_dir:
+                self.publish_file(file_path, publish_dir)
             
             return True, filename
         
+        except RequestEntityTooLarge:
+            metrics.UPLOADS.inc(category=upload_category, result='rejected')
+            logger.error(f"❌ File size exceeds {self.upload_max_size[upload_category] / 1024}KB")
+            return False, f"파일 크기는 {self.upload_max_size[upload_category] / 1024}KB 이하여야 합니다."
+
         except Exception as e:
             logger.error(f"❌ Error processing file: {e}")
             return False, '파일 업로드 중 오류가 발생했습니다.'
 
+        finally:
+            if spool is not None and spool is not file.stream:
+                spool.close()
+
+    def archive_file(self, filename, upload_category):
+        """업로드된 파일을 날짜별 보관 폴더에 하드링크로 보관 (다른 파일시스템이면 복사)"""
+        file_path = os.path.join(self.upload_paths[upload_category], filename)
+        archive_dir = os.path.join(self.upload_paths['ARCHIVE'], upload_category.lower(), datetime.now().strftime('%Y%m%d'))
+        return self.publish_file(file_path, archive_dir)
+
+    def publish_file(self, file_path, publish_dir):
+        """업로드된 파일을 static 폴더에 하드링크로 공개 (다른 파일시스템이면 복사)"""
+        os.makedirs(publish_dir, exist_ok=True)
+        dest_path = os.path.join(publish_dir, os.path.basename(file_path))
+        if os.path.exists(dest_path):
+            return dest_path
+        try:
+            os.link(file_path, dest_path)
+        except OSError:
+            # 임시 파일에 복사한 뒤 이동해 반쯤 쓰인 파일이 노출되지 않도록 한다
+            fd, tmp_path = tempfile.mkstemp(dir=publish_dir, prefix='.publish_')
+            os.close(fd)
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+        return dest_path
+
 
 class MessageUtils:
-    def __init__(self, firebase):
+    # Firestore WriteBatch 한 번에 넣을 수 있는 최대 작업 수
+    BATCH_LIMIT = 500
+    COLLECTION = 'wedding_guestbook'
+
+    def __init__(self, firebase, config):
+        """
+        방명록 쓰기를 모아서 Firestore 에 반영하는 write-behind 버퍼
+
+        - 저장/삭제는 캐시에 바로 반영하고 (작성자가 즉시 확인), flush 주기마다 WriteBatch 로 커밋한다.
+        - 반영 전 작업은 프로세스별 append-only 로그(JSON Lines, journal.ProcessJournal)에 기록해,
+          재시작 시 (끝난 워커의 로그까지) 다시 반영한다.
+        - 로그 복구와 flush 스레드는 프로세스에서 처음 쓸 때 시작한다 (start).
+        """
         self.firebase = firebase
+        self.flush_interval = config['FLUSH_INTERVAL']
+        self.batch_size = min(config['BATCH_SIZE'], self.BATCH_LIMIT)
+        self.log_path = config['LOG']
+        # 비밀번호 해시 방식과 비용 (werkzeug 형식, 예: "scrypt:16384:8:1", "pbkdf2:sha256:600000")
+        self.password_method = config.get('PASSWORD_HASH', 'scrypt:16384:8:1')
+        # 순번 -> {'seq', 'op': 'set' | 'delete', 'id', 'data'} (순번 순서 = 적용 순서)
+        self.pending = {}
+        # 커밋 중인 작업 순번 (이미 전송 중인 추가는 취소할 수 없다)
+        self.inflight = set()
+        self.seq = itertools.count(1)
+        self.log = ProcessJournal(self.log_path)
+        # flush 스레드를 시작한 프로세스
+        self.pid = None
+        self.flusher = None
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        """
+        이 프로세스에서 처음 쓸 때 끝난 워커들의 로그를 복구하고 flush 스레드를 시작
+
+        fork 한 자식(gunicorn --preload 워커)에는 부모의 스레드가 없고 부모의 락이 잠긴 채일 수 있어
+        락/이벤트를 새로 만든다. 부모가 쌓아둔 작업은 부모의 로그에 있으니 자식에서는 비운다.
+        """
+        if self.pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.pid == os.getpid():
+                return
+            self.lock = threading.Lock()
+            self.flush_requested = threading.Event()
+            self.stopped = threading.Event()
+            self.pending = {}
+            self.inflight = set()
+            self._replay_log()
+            self.flusher = threading.Thread(target=self._flush_loop, name='guestbook-flusher', daemon=True)
+            self.flusher.start()
+            self.pid = os.getpid()
+
+    def _replay_log(self):
+        """
+        끝난 프로세스들의 로그에서 반영되지 않은 작업을 가져와 캐시에 다시 적용
+
+        가져온 작업은 이 프로세스의 순번으로 다시 매겨 자기 로그에 옮겨 적은 뒤, 원래 로그를 지운다.
+        """
+        pending = {}
+        for records in self.log.sweep():
+            remaining = {}
+            for record in records:
+                if 'committed' in record:
+                    for seq in record['committed']:
+                        remaining.pop(seq, None)
+                else:
+                    remaining[record['seq']] = record
+            for _, op in sorted(remaining.items()):
+                op['seq'] = next(self.seq)
+                pending[op['seq']] = op
+                self.log.append(op)
+
+        for seq, op in sorted(pending.items()):
+            self.pending[seq] = op
+            self.firebase.cachestore.put_pending(self.COLLECTION, op['id'], seq, self._cache_doc(op))
+        if pending:
+            logger.info(f"♻️ Recovered {len(pending)} unflushed guestbook write(s)")
+
+    def _write_log(self, record):
+        """락을 잡은 상태에서 호출"""
+        self.log.append(record)
+
+    @staticmethod
+    def _cache_doc(op):
+        """작업을 캐시에 넣을 문서로 변환 (삭제면 None)"""
+        if op['op'] == 'delete':
+            return None
+        doc = dict(op['data'])
+        doc['timestamp'] = datetime.fromisoformat(doc['timestamp'])
+        return doc
+
+    def hash_password(self, password):
+        """salt 를 붙인 비밀번호 해시 (방식/비용/salt 가 해시 문자열에 함께 저장된다)"""
+        return generate_password_hash(password, method=self.password_method)
+
+    @staticmethod
+    def check_password(stored, password):
+        """
+        저장된 비밀번호(해시 또는 해시 도입 전의 평문)와 일치하는지 상수 시간으로 비교
+        """
+        if not stored or not isinstance(password, str):
+            return False
+        if stored.startswith(('scrypt:', 'pbkdf2:')) and stored.count('$') == 2:
+            return check_password_hash(stored, password)
+        return hmac.compare_digest(stored.encode(), password.encode())
 
     def save_message(self, name, comment, password, profile_image='default.jpg'):
         """
-        메시지 데이터를 Firebase에 저장
-        
+        메시지를 캐시에 바로 저장하고, Firestore 반영은 다음 flush 에 맡긴다
+
+        비밀번호는 salt 를 붙인 해시로만 저장한다.
+
         Returns:
             tuple: (성공 여부, 성공 시 메시지 데이터 / 실패 시 에러 메시지)
         """
+        self.start()
         try:
-            doc_ref, error = self.firebase.get_document_ref('wedding_guestbook')
+            # 문서 ID 는 클라이언트에서 발급되므로 Firestore 호출이 없다
+            doc_ref, error = self.firebase.get_document_ref(self.COLLECTION)
             if error:
                 return False, error
-            
+
             message_data = {
                 'id': doc_ref.id,
                 'profile_image': profile_image,
                 'name': name,
                 'comment': comment,
-                'password': password,
-                'timestamp': firestore.SERVER_TIMESTAMP
+                'password': self.hash_password(password),
             }
-            
-            doc_ref.set(message_data)
-            
-            # timestamp는 클라이언트에서 표시할 필요가 없으므로 제거
-            message_data.pop('timestamp', None)
-            logger.info(f"✅ Saved message to Firebase\nid: {message_data['id']}\nname: {message_data['name']} \ncomment: {message_data['comment']}")
+            # 작성 순서가 재시작/재시도와 무관하도록 접수 시각을 timestamp 로 저장
+            op_data = dict(message_data, timestamp=datetime.now(timezone.utc).isoformat())
+
+            with self.lock:
+                seq = next(self.seq)
+                op = {'seq': seq, 'op': 'set', 'id': doc_ref.id, 'data': op_data}
+                self._write_log(op)
+                self.pending[seq] = op
+                self.firebase.cachestore.put_pending(self.COLLECTION, doc_ref.id, seq, self._cache_doc(op))
+                pending_count = len(self.pending)
+
+            if pending_count >= self.batch_size:
+                self.flush_requested.set()
+
+            logger.info(f"✅ Queued message for Firebase\nid: {message_data['id']}\nname: {message_data['name']} \ncomment: {message_data['comment']}")
             return True, message_data
-            
+
         except Exception as e:
             logger.error(f"❌ Error saving message to Firebase: {e}")
             return False, '메시지 저장 중 오류가 발생했습니다.'
-    
+
+    def _get_message(self, message_id):
+        """캐시에서 메시지를 찾고, 캐시가 비어 있으면 컬렉션을 한 번 불러온다"""
+        cachestore = self.firebase.cachestore
+        message = cachestore.get_document(self.COLLECTION, message_id)
+        if message is None and not cachestore.has_cache(self.COLLECTION):
+            self.firebase.get_collection_data(self.COLLECTION)
+            message = cachestore.get_document(self.COLLECTION, message_id)
+        return message
+
     def delete_message(self, message_id, password):
         """
         메시지 삭제
+
+        아직 Firestore 에 보내지 않은 메시지면 저장 작업을 취소하고, 아니면 삭제 작업을 쌓아둔다.
+        비밀번호는 캐시의 해시와 비교하므로 틀린 비밀번호는 Firestore 호출 없이 거절된다.
         
         Args:
             message_id (str): 삭제할 메시지 ID
@@ -269,23 +1752,34 @@ class MessageUtils:
         Returns:
             tuple: (성공 여부, 에러 메시지 또는 None)
         """
+        self.start()
         try:
-            doc_ref, error = self.firebase.get_document_ref('wedding_guestbook', message_id)
-            if error:
-                return False, error
-                
-            doc = doc_ref.get()
-            if not doc.exists:
+            message_data = self._get_message(message_id)
+            if message_data is None:
                 return False, '메시지를 찾을 수 없습니다.'
                 
-            message_data = doc.to_dict()
-            
             # 비밀번호 확인
-            if message_data.get('password') != password:
+            if not self.check_password(message_data.get('password'), password):
                 return False, '비밀번호가 일치하지 않습니다.'
-                
-            # 메시지 삭제
-            doc_ref.delete()
+
+            with self.lock:
+                queued = next(
+                    (op for op in self.pending.values()
+                     if op['id'] == message_id and op['op'] == 'set' and op['seq'] not in self.inflight),
+                    None
+                )
+                if queued:
+                    # 저장 전에 삭제된 메시지는 Firestore 에 보낼 필요가 없다
+                    del self.pending[queued['seq']]
+                    self._write_log({'committed': [queued['seq']]})
+                    self.firebase.cachestore.drop_pending(self.COLLECTION, message_id)
+                else:
+                    seq = next(self.seq)
+                    op = {'seq': seq, 'op': 'delete', 'id': message_id, 'data': None}
+                    self._write_log(op)
+                    self.pending[seq] = op
+                    self.firebase.cachestore.put_pending(self.COLLECTION, message_id, seq, None)
+
             logger.info(f"🗑️ Deleted message from Firebase\nid: {message_data['id']}\nname: {message_data['name']} \ncomment: {message_data['comment']}")
             return True, None
             
@@ -293,14 +1787,174 @@ class MessageUtils:
             logger.error(f"❌ Error deleting message: {e}")
             return False, f'메시지 삭제 중 오류가 발생했습니다: {str(e)}'
 
+    def flush_messages(self):
+        """
+        쌓아둔 저장/삭제 작업을 WriteBatch 로 Firestore 에 반영
+
+        Returns:
+            int: 반영한 작업 수 (실패한 작업은 그대로 남겨 다음 주기에 다시 시도)
+        """
+        self.start()
+        with self.lock:
+            ops = [self.pending[seq] for seq in sorted(self.pending)]
+            self.inflight.update(op['seq'] for op in ops)
+        if not ops:
+            return 0
+
+        flushed = 0
+        try:
+            for start in range(0, len(ops), self.batch_size):
+                chunk = ops[start:start + self.batch_size]
+                batch = self.firebase.db.batch()
+                writes = {}
+                for op in chunk:
+                    doc_ref, error = self.firebase.get_document_ref(self.COLLECTION, op['id'])
+                    if error:
+                        raise RuntimeError(error)
+                    if op['op'] == 'delete':
+                        batch.delete(doc_ref)
+                        writes['delete'] = writes.get('delete', 0) + 1
+                    else:
+                        batch.set(doc_ref, self._cache_doc(op))
+                        writes['set'] = writes.get('set', 0) + 1
+                with metrics.firestore_batch(self.COLLECTION, writes):
+                    batch.commit()
+                flushed += len(chunk)
+
+                seqs = [op['seq'] for op in chunk]
+                with self.lock:
+                    self._write_log({'committed': seqs})
+                    for seq in seqs:
+                        self.pending.pop(seq, None)
+                        self.inflight.discard(seq)
+                    if not self.pending:
+                        self.log.rewrite([])  # 남은 작업이 없으면 (자기) 로그를 비운다
+                self.firebase.cachestore.clear_pending(self.COLLECTION, {op['id']: op['seq'] for op in chunk})
+            logger.info(f"💾 Flushed {flushed} guestbook write(s)")
+            return flushed
+
+        except Exception as e:
+            logger.error(f"❌ Error flushing guestbook writes: {e}")
+            return flushed
+
+        finally:
+            with self.lock:
+                self.inflight.difference_update(op['seq'] for op in ops)
+
+    def _flush_loop(self):
+        while not self.stopped.is_set():
+            self.flush_requested.wait(self.flush_interval)
+            self.flush_requested.clear()
+            self.flush_messages()
+
+    def close(self):
+        """flush 스레드를 멈추고 남은 작업을 모두 반영 (종료 시 호출, 실패한 작업은 로그에 남는다)"""
+        if self.pid != os.getpid():
+            return  # 이 프로세스에서 시작하지 않았다
+        self.stopped.set()
+        self.flush_requested.set()
+        self.flusher.join()
+        self.flush_messages()
+        self.log.close()
+        self.pid = None
+
+
+class RateLimiter:
+    """
+    키(클라이언트 IP 등)별 토큰 버킷: window 초 동안 최대 limit 번까지 허용
+
+    버킷은 window / limit 초마다 하나씩 다시 채워진다. 가득 찬 버킷은 max_keys 를 넘으면 정리한다.
+    """
+    def __init__(self, limit, window, max_keys=10000):
+        self.limit = limit
+        self.rate = limit / window
+        self.max_keys = max_keys
+        # 키 -> [남은 토큰 수, 마지막 갱신 시각(monotonic)]
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key):
+        """
+        요청 한 번을 기록
+
+        Returns:
+            tuple: (허용 여부, 거절 시 다시 시도할 수 있을 때까지의 초)
+        """
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = self.buckets[key] = [self.limit, now]
+            else:
+                bucket[0] = min(self.limit, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1:
+                return False, (1 - bucket[0]) / self.rate
+            bucket[0] -= 1
+            return True, 0
+
+    def _prune(self, now):
+        """락을 잡은 상태에서 호출: 다시 가득 찼을 버킷을 지운다"""
+        full = [
+            key for key, (tokens, updated) in self.buckets.items()
+            if tokens + (now - updated) * self.rate >= self.limit
+        ]
+        for key in full:
+            del self.buckets[key]
+
 
 class PostUtils:
-    def __init__(self, firebase):
+    # Firestore WriteBatch 한 번에 넣을 수 있는 최대 작업 수
+    BATCH_LIMIT = 500
+
+    def __init__(self, firebase, config):
         self.firebase = firebase
+        self.flush_interval = config['FLUSH_INTERVAL']
+        self.flush_threshold = config['FLUSH_THRESHOLD']
+        # 게시물 id -> 아직 Firestore 에 반영하지 않은 좋아요 증감분
+        self.pending_likes = {}
+        self.lock = threading.Lock()
+        # flush 스레드를 시작한 프로세스 (처음 쓸 때 시작)
+        self.pid = None
+        self.flusher = None
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        """
+        이 프로세스에서 처음 쓸 때 flush 스레드를 시작
+
+        fork 한 자식은 락/이벤트를 새로 만들고, 부모가 모아둔 증감분은 부모가 반영하므로 비운다.
+        """
+        if self.pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.pid == os.getpid():
+                return
+            self.lock = threading.Lock()
+            self.flush_requested = threading.Event()
+            self.stopped = threading.Event()
+            self.pending_likes = {}
+            self.flusher = threading.Thread(target=self._flush_loop, name='like-flusher', daemon=True)
+            self.flusher.start()
+            self.pid = os.getpid()
+
+    def _get_post(self, post_id):
+        """캐시에서 게시물을 찾고, 캐시가 비어 있으면 컬렉션을 한 번 불러온다"""
+        cachestore = self.firebase.cachestore
+        post = cachestore.get_document('wedding_post', post_id)
+        if post is None and not cachestore.has_cache('wedding_post'):
+            self.firebase.get_collection_data('wedding_post')
+            post = cachestore.get_document('wedding_post', post_id)
+        return post
 
     def update_like_count(self, post_id, is_adding):
         """
         게시물 좋아요 수 업데이트
+
+        캐시의 좋아요 수를 바로 갱신해 응답하고, 증감분은 모아두었다가
+        flush 주기 또는 임계치에 도달하면 firestore.Increment 로 한 번에 반영한다.
         
         Args:
             post_id (str): 게시물 ID
@@ -309,25 +1963,130 @@ class PostUtils:
         Returns:
             tuple: (성공 여부, 좋아요 수 또는 에러 메시지)
         """
+        self.start()
         try:
-            doc_ref, error = self.firebase.get_document_ref('wedding_post', post_id)
-            if error:
-                return False, error
-                
-            doc = doc_ref.get()
-            if not doc.exists:
+            if self._get_post(post_id) is None:
                 return False, '게시물을 찾을 수 없습니다.'
-            
-            current_likes = doc.to_dict().get('like', 0)
-            new_likes = max(0, current_likes + (1 if is_adding else -1))
-            
-            doc_ref.update({
-                'like': new_likes
-            })
-            
-            logger.info(f"✅ Updated like count for post {post_id}: {new_likes}")
+
+            with self.lock:
+                # 같은 게시물에 대한 동시 클릭이 서로 덮어쓰지 않도록 락 안에서 읽고 갱신
+                post = self.firebase.cachestore.get_document('wedding_post', post_id)
+                if post is None:
+                    return False, '게시물을 찾을 수 없습니다.'
+                current_likes = post.get('like', 0)
+                new_likes = max(0, current_likes + (1 if is_adding else -1))
+                self.pending_likes[post_id] = self.pending_likes.get(post_id, 0) + (new_likes - current_likes)
+                self.firebase.cachestore.update_like_in_cache('wedding_post', post_id, new_likes)
+                pending_count = len(self.pending_likes)
+
+            if pending_count >= self.flush_threshold:
+                self.flush_requested.set()
+
+            logger.debug(f"✅ Updated like count for post {post_id}: {new_likes}")
             return True, new_likes
             
         except Exception as e:
             logger.error(f"❌ Error updating like count: {e}")
-            return False, str(e)
\ No newline at end of file
+            return False, str(e)
+
+    def flush_likes(self):
+        """
+        모아둔 좋아요 증감분을 WriteBatch + firestore.Increment 로 Firestore 에 반영
+
+        배치는 하나라도 실패하면 전체가 적용되지 않으므로, 실패한 배치는 게시물별로 다시 반영한다.
+        삭제된 게시물의 증감분은 버린다.
+
+        Returns:
+            int: 처리한 게시물 수 (삭제되어 버린 것 포함. 반영하지 못한 증감분은 다시 쌓아두고 다음 주기에 시도)
+        """
+        with self.lock:
+            pending, self.pending_likes = self.pending_likes, {}
+        pending = {post_id: delta for post_id, delta in pending.items() if delta}
+        if not pending:
+            return 0
+
+        items = list(pending.items())
+        flushed = 0
+        retry = []
+        for start in range(0, len(items), self.BATCH_LIMIT):
+            chunk = items[start:start + self.BATCH_LIMIT]
+            try:
+                self._commit_likes(chunk)
+                done, failed = chunk, []
+            except Exception as e:
+                logger.warning(f"⚠️ Like batch of {len(chunk)} post(s) failed ({e}), updating post by post")
+                done, failed = self._update_likes_each(chunk)
+            flushed += len(done)
+            if done:
+                self.firebase.cachestore.clear_increments('wedding_post', 'like', dict(done))
+            if failed:
+                # 게시물별 반영도 실패하면 (연결 문제 등) 남은 배치까지 다음 주기에 다시 시도
+                retry = failed + items[start + len(chunk):]
+                break
+
+        if retry:
+            with self.lock:
+                for post_id, delta in retry:
+                    self.pending_likes[post_id] = self.pending_likes.get(post_id, 0) + delta
+            logger.error(f"❌ Error flushing like counts, {len(retry)} post(s) will be retried")
+        if flushed:
+            logger.info(f"💾 Flushed like deltas for {flushed} post(s)")
+        return flushed
+
+    def _commit_likes(self, chunk):
+        """(게시물 id, 증감분) 목록을 WriteBatch 하나로 반영"""
+        from firebase_admin import firestore
+
+        batch = self.firebase.db.batch()
+        for post_id, delta in chunk:
+            doc_ref, error = self.firebase.get_document_ref('wedding_post', post_id)
+            if error:
+                raise RuntimeError(error)
+            batch.update(doc_ref, {'like': firestore.Increment(delta)})
+        with metrics.firestore_batch('wedding_post', {'update': len(chunk)}):
+            batch.commit()
+
+    def _update_likes_each(self, chunk):
+        """
+        실패한 배치의 증감분을 게시물별로 반영
+
+        삭제된 게시물(NotFound)의 증감분은 버리고 처리한 것으로 본다.
+        다른 오류가 나면 그 게시물부터는 반영하지 않는다.
+
+        Returns:
+            tuple: (처리한 (게시물 id, 증감분) list, 다시 시도할 list)
+        """
+        from firebase_admin import firestore
+        from google.api_core.exceptions import NotFound
+
+        done = []
+        for position, (post_id, delta) in enumerate(chunk):
+            doc_ref, error = self.firebase.get_document_ref('wedding_post', post_id)
+            try:
+                if error:
+                    raise RuntimeError(error)
+                with metrics.firestore_op('update', 'wedding_post'):
+                    doc_ref.update({'like': firestore.Increment(delta)})
+            except NotFound:
+                logger.warning(f"⚠️ Dropping {delta:+d} like(s) for deleted post {post_id}")
+            except Exception as e:
+                logger.error(f"❌ Error updating like count of {post_id}: {e}")
+                return done, list(chunk[position:])
+            done.append((post_id, delta))
+        return done, []
+
+    def _flush_loop(self):
+        while not self.stopped.is_set():
+            self.flush_requested.wait(self.flush_interval)
+            self.flush_requested.clear()
+            self.flush_likes()
+
+    def close(self):
+        """flush 스레드를 멈추고 남은 증감분을 모두 반영 (종료 시 호출)"""
+        if self.pid != os.getpid():
+            return  # 이 프로세스에서 시작하지 않았다
+        self.stopped.set()
+        self.flush_requested.set()
+        self.flusher.join()
+        self.flush_likes()
+        self.pid = None